@@ -1,26 +1,67 @@
+import base64
+import csv
+import hashlib
+import io
+import json
 import os
+import threading
+import time
+from datetime import date, datetime, timedelta
 from functools import wraps
 
-from dotenv import load_dotenv
-from flask import Flask, request, session, jsonify, render_template, redirect, url_for
+from flask import (
+    Blueprint, Flask, Response, current_app, g, request, session, jsonify, render_template, redirect, url_for,
+    stream_with_context,
+)
+from werkzeug.security import safe_join
 
-from db import call_sp
+import compress
+import db
+import fastjson
+from cache import TTLCache
+from db import call_sp, call_sp_many, call_sp_multi, call_sp_rows, stream_sp
+from events import Notifier, broker_from_env
+from metrics import registry as metrics
 
-load_dotenv()
+# .env is loaded once, by db.py on import (above)
 
 # =========================================================
 # App + Template/Static paths (fix TemplateNotFound)
 # =========================================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-app = Flask(
-    __name__,
-    template_folder=os.path.join(BASE_DIR, "templates"),
-    static_folder=os.path.join(BASE_DIR, "static"),
+# every route/hook lives on this blueprint; create_app() (bottom) builds the Flask app
+bp = Blueprint("srms", __name__)
+
+# Per-user context/profile cache for /api/me (invalidated on profile edits + role approvals, in every worker)
+user_cache = TTLCache(
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", "2048")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
 )
 
-# مهم: حط أي secret في .env أفضل
-app.secret_key = os.getenv("FLASK_SECRET", "change-me-please")
+# Change events for the live streams; shared with the other worker processes when EVENTS_DIR is set
+notifier = Notifier(broker_from_env())
+
+
+def _on_role_request(event):
+    # runs in every worker: an approval changes that user's role, so drop their cached /api/me
+    if (event or {}).get("type") != "approved":
+        return
+    user_id = event.get("UserID")
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate_if(lambda key, _: key[0] == user_id)
+
+
+def _on_user_changed(event):
+    # runs in every worker: a profile edit drops that user's cached /api/me
+    event = event or {}
+    invalidate_user(event.get("UserID"), event.get("StudentID"))
+
+
+notifier.listen("role_requests", _on_role_request)
+notifier.listen("users", _on_user_changed)
 
 
 # =========================================================
@@ -42,7 +83,7 @@ def login_required(view_func):
     @wraps(view_func)
     def wrapper(*args, **kwargs):
         if "user" not in session:
-            return redirect(url_for("login_page"))
+            return redirect(url_for("srms.login_page"))
         return view_func(*args, **kwargs)
 
     return wrapper
@@ -54,7 +95,7 @@ def role_required(*allowed_roles):
         def wrapper(*args, **kwargs):
             u = session.get("user")
             if not u:
-                return redirect(url_for("login_page"))
+                return redirect(url_for("srms.login_page"))
             if u.get("Role") not in allowed_roles:
                 return redirect(role_redirect(u.get("Role", "Guest")))
             return view_func(*args, **kwargs)
@@ -64,6 +105,520 @@ def role_required(*allowed_roles):
     return decorator
 
 
+# =========================================================
+# Keyset pagination (?limit=&cursor=  or  ?limit=&after_id=)
+# =========================================================
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"after_id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> int:
+    """
+    Raises ValueError on anything that is not a cursor we issued.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        after_id = json.loads(raw)["after_id"]
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if not isinstance(after_id, int):
+        raise ValueError("Invalid cursor.")
+    return after_id
+
+
+def page_args(args=None):
+    """
+    Returns (after_id, limit) from the query string (or from args, e.g. a /api/batch op).
+    Raises ValueError for bad input.
+    """
+    args = request.args if args is None else args
+    cursor = str(args.get("cursor") or "").strip()
+    after_id = str(args.get("after_id") or "").strip()
+    limit = str(args.get("limit") or "").strip()
+
+    if cursor:
+        after = decode_cursor(cursor)
+    elif after_id:
+        if not after_id.isdigit():
+            raise ValueError("after_id must be a number.")
+        after = int(after_id)
+    else:
+        after = None
+
+    if limit:
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValueError("limit must be a positive number.")
+        size = min(int(limit), MAX_PAGE_SIZE)
+    else:
+        size = DEFAULT_PAGE_SIZE
+
+    return after, size
+
+
+def paged(rows: list, id_col: str, limit: int):
+    """
+    rows were fetched with limit + 1 so we know if another page exists.
+    Returns (page_rows, next_cursor or None).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1][id_col])
+
+
+# =========================================================
+# Listing responses: ?format=columnar
+# {"columns": [...], "rows": [[...], ...], "next_cursor": ...}
+# column names go out once instead of once per row, encoded by fastjson
+# =========================================================
+def wants_columnar() -> bool:
+    return request.args.get("format") == "columnar"
+
+
+def listing_response(key: str, result: db.ResultSet, id_col: str = None, limit: int = None):
+    """
+    result = call_sp_rows(...). With limit, it was fetched with limit + 1 (see paged).
+    Default shape: {key: [ {col: value}, ... ], "next_cursor": ...}
+    """
+    rows, next_cursor = result.rows, None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][result.columns.index(id_col)])
+
+    if wants_columnar():
+        body = {"columns": result.columns, "rows": rows}
+        if limit is not None:
+            body["next_cursor"] = next_cursor
+        return Response(fastjson.dumps(body), mimetype="application/json")
+
+    body = {key: db.ResultSet(result.columns, rows).dicts()}
+    if limit is not None:
+        body["next_cursor"] = next_cursor
+    return jsonify(body)
+
+
+# =========================================================
+# Streaming exports (NDJSON / CSV) on top of stream_sp
+# =========================================================
+def _csv_value(v):
+    if v is None:
+        return ""
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, bool):
+        return int(v)
+    return v
+
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def export_format() -> str:
+    """?format= of an export (default ndjson). Raises ValueError for anything else."""
+    fmt = (request.args.get("format") or "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}.")
+    return fmt
+
+
+def export_response(rows, fmt: str, filename: str):
+    """
+    fmt = export_format(). rows = stream_sp(...) generator. The first next() runs the SP here,
+    inside the view, so access errors still become a normal 400.
+    """
+    columns = next(rows)
+
+    if fmt == "csv":
+        def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(columns)
+            for i, r in enumerate(rows, 1):
+                writer.writerow([_csv_value(v) for v in r])
+                if i % 500 == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+            yield buf.getvalue()
+
+        mimetype = "text/csv"
+    else:
+        def generate():
+            for r in rows:
+                yield current_app.json.dumps(dict(zip(columns, r))) + "\n"
+
+        mimetype = "application/x-ndjson"
+
+    resp = Response(stream_with_context(generate()), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return resp
+
+
+# =========================================================
+# Bulk attendance (shared by Instructor / TA / Admin routes)
+# =========================================================
+MAX_ROSTER_SIZE = 2000
+
+
+def record_attendance_batch(u: dict):
+    """
+    Body: {course_id, records: [{student_id, status}, ...]}
+    One sp_RecordAttendanceBatch call (roster sent as a TVP).
+    """
+    data = request.get_json(force=True) or {}
+    course_id = data.get("course_id")
+    records = data.get("records")
+
+    if not isinstance(course_id, int):
+        return jsonify({"error": "course_id must be an integer."}), 400
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "records must be a non-empty list."}), 400
+    if len(records) > MAX_ROSTER_SIZE:
+        return jsonify({"error": f"records is limited to {MAX_ROSTER_SIZE} rows per request."}), 400
+
+    roster = []
+    for i, rec in enumerate(records):
+        student_id = rec.get("student_id") if isinstance(rec, dict) else None
+        status = rec.get("status") if isinstance(rec, dict) else None
+        if not isinstance(student_id, int) or not isinstance(status, bool):
+            return jsonify({"error": f"records[{i}]: student_id must be an integer and status true/false."}), 400
+        roster.append((i, student_id, status))
+
+    try:
+        rows = call_sp("dbo.sp_RecordAttendanceBatch", (u["Role"], u["UserID"], course_id, roster))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    errors = [
+        {"index": r["RowNo"], "student_id": r["StudentID"], "error": r["Error"]}
+        for r in rows
+        if not r["Recorded"]
+    ]
+    if len(rows) > len(errors):
+        attendance_changed(course_id)
+    return jsonify({"ok": True, "recorded": len(rows) - len(errors), "errors": errors})
+
+
+# =========================================================
+# Attendance deltas (?since_id=) + live stream (Server-Sent Events)
+# - both run sp_ViewAttendanceSince as the signed-in user, so clearance
+#   and TA course assignment are enforced by the DB on every read
+# =========================================================
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "5"))       # DB re-check when nothing woke us
+LIVE_STREAM_MAX_AGE = float(os.getenv("LIVE_STREAM_MAX_AGE", "300"))  # then the browser reconnects
+LIVE_MAX_STREAMS = int(os.getenv("LIVE_MAX_STREAMS", "2"))            # per process (each holds a thread)
+LIVE_BATCH_SIZE = 500
+
+_live_slots = threading.BoundedSemaphore(LIVE_MAX_STREAMS)
+
+
+def attendance_changed(course_id: int):
+    notifier.publish(f"attendance:{course_id}")
+
+
+def _since_arg(value) -> int:
+    value = str(value or "").strip()
+    if not value.isdigit():
+        raise ValueError("since_id must be a number.")
+    return int(value)
+
+
+def attendance_delta(u: dict, student_id, course_id):
+    """
+    ?since_id=N: only rows with AttendanceID > N, oldest first.
+    Returns {attendance: [...], last_id, more}; ask again with since_id=last_id.
+    """
+    try:
+        since_id = _since_arg(request.args.get("since_id"))
+        _, limit = page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = call_sp_rows(
+            "dbo.sp_ViewAttendanceSince",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], since_id, student_id, course_id, limit + 1),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = result.rows[:limit]
+    last_id = rows[-1][result.columns.index("AttendanceID")] if rows else since_id
+    more = len(result.rows) > limit
+
+    if wants_columnar():
+        body = {"columns": result.columns, "rows": rows, "last_id": last_id, "more": more}
+        return Response(fastjson.dumps(body), mimetype="application/json")
+    return jsonify({
+        "attendance": db.ResultSet(result.columns, rows).dicts(),
+        "last_id": last_id,
+        "more": more,
+    })
+
+
+def attendance_stream(u: dict):
+    """
+    text/event-stream of newly recorded attendance for one course (?course_id=, optional ?student_id=).
+    Starts after Last-Event-ID (browser reconnect), else ?since_id=, else the newest row now.
+    Each event: id = last AttendanceID, data = {columns, rows} (oldest first).
+    """
+    course_id = request.args.get("course_id")
+    student_id = request.args.get("student_id")
+    if not course_id or not course_id.isdigit():
+        return jsonify({"error": "course_id must be a number."}), 400
+    course_id = int(course_id)
+    student_id = int(student_id) if student_id and student_id.isdigit() else None
+
+    params = (u["Role"], u["UserID"], u["ClearanceLevel"])
+    try:
+        start = request.headers.get("Last-Event-ID") or request.args.get("since_id")
+        if start is not None:
+            since_id = _since_arg(start)
+        else:
+            tip = call_sp_rows("dbo.sp_ViewAttendance", params + (student_id, course_id, None, 1))
+            since_id = tip.rows[0][tip.columns.index("AttendanceID")] if tip else 0
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not _live_slots.acquire(blocking=False):
+        resp = jsonify({"error": "Too many live streams, try again shortly."})
+        resp.headers["Retry-After"] = "10"
+        return resp, 503
+
+    def generate(since_id=since_id):
+        topic = f"attendance:{course_id}"
+        seen = notifier.version(topic)
+        deadline = time.monotonic() + LIVE_STREAM_MAX_AGE
+        yield "retry: 3000\n\n"
+        try:
+            while time.monotonic() < deadline:
+                result = call_sp_rows(
+                    "dbo.sp_ViewAttendanceSince",
+                    params + (since_id, student_id, course_id, LIVE_BATCH_SIZE),
+                )
+                if result:
+                    since_id = result.rows[-1][result.columns.index("AttendanceID")]
+                    data = fastjson.dumps({"columns": result.columns, "rows": result.rows}).decode()
+                    yield f"id: {since_id}\nevent: attendance\ndata: {data}\n\n"
+                    if len(result) == LIVE_BATCH_SIZE:
+                        continue  # more backlog waiting
+                else:
+                    yield ": ping\n\n"
+                seen = notifier.wait(topic, seen, max(0.0, min(LIVE_POLL_SECONDS, deadline - time.monotonic())))
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: pass events through unbuffered
+    resp.call_on_close(_live_slots.release)
+    return resp
+
+
+# =========================================================
+# Attendance summaries (shared by Student / TA / Instructor routes)
+# =========================================================
+def attendance_summary(u: dict):
+    """
+    Present/absent counts, rate, streaks and last seen per student + course
+    (Needs FIX SP: sp_ViewAttendanceSummary, reads ATTENDANCE_ROLLUP).
+    One row per pair, so the cost doesn't grow with the number of sessions.
+    """
+    try:
+        student_id = _int_arg(request.args, "student_id")
+        course_id = _int_arg(request.args, "course_id")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp(
+            "dbo.sp_ViewAttendanceSummary",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"summary": rows})
+
+
+# =========================================================
+# Bulk grades (shared by Instructor / Admin routes)
+# =========================================================
+MAX_GRADE_IMPORT_SIZE = 5000
+
+
+def _grade_import_rows():
+    """
+    Accepts JSON {records: [{student_id, course_id, grade}, ...]}
+    or a text/csv body with header: student_id,course_id,grade
+    Returns list of (row_no, student_id, course_id, grade). Raises ValueError.
+    """
+    if request.mimetype == "text/csv":
+        reader = csv.DictReader(io.StringIO(request.get_data(as_text=True)))
+        records = []
+        for i, rec in enumerate(reader):
+            try:
+                records.append({
+                    "student_id": int(rec.get("student_id") or ""),
+                    "course_id": int(rec.get("course_id") or ""),
+                    "grade": float(rec.get("grade") or ""),
+                })
+            except ValueError:
+                raise ValueError(f"CSV row {i + 1}: student_id, course_id and grade must be numbers.")
+    else:
+        data = request.get_json(force=True) or {}
+        records = data.get("records")
+
+    if not isinstance(records, list) or not records:
+        raise ValueError("records must be a non-empty list.")
+    if len(records) > MAX_GRADE_IMPORT_SIZE:
+        raise ValueError(f"records is limited to {MAX_GRADE_IMPORT_SIZE} rows per request.")
+
+    rows = []
+    for i, rec in enumerate(records):
+        rec = rec if isinstance(rec, dict) else {}
+        student_id = rec.get("student_id")
+        course_id = rec.get("course_id")
+        grade = rec.get("grade")
+        if not isinstance(student_id, int) or not isinstance(course_id, int):
+            raise ValueError(f"records[{i}]: student_id and course_id must be integers.")
+        if not isinstance(grade, (int, float)):
+            raise ValueError(f"records[{i}]: grade must be a number.")
+        rows.append((i, student_id, course_id, float(grade)))
+    return rows
+
+
+def import_grades_batch(u: dict):
+    """
+    One sp_InsertGradeBatch call: the whole batch is encrypted under one key-open.
+    """
+    try:
+        rows = _grade_import_rows()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = call_sp("dbo.sp_InsertGradeBatch", (u["Role"], u["UserID"], u["ClearanceLevel"], rows))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    errors = [
+        {"index": r["RowNo"], "student_id": r["StudentID"], "course_id": r["CourseID"], "error": r["Error"]}
+        for r in result
+        if not r["Inserted"]
+    ]
+    return jsonify({"ok": True, "inserted": len(result) - len(errors), "errors": errors})
+
+
+def publish_course_grades(u: dict):
+    data = request.get_json(force=True) or {}
+    course_id = data.get("course_id")
+    publish = data.get("publish")
+
+    if not isinstance(course_id, int):
+        return jsonify({"error": "course_id must be an integer."}), 400
+    if not isinstance(publish, bool):
+        return jsonify({"error": "publish must be true/false."}), 400
+
+    try:
+        rows = call_sp("dbo.sp_PublishCourseGrades", (u["Role"], course_id, publish))
+        return jsonify({"ok": True, "updated": rows[0]["Updated"] if rows else 0})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def course_grade_stats(u: dict):
+    """
+    Per-course aggregates maintained by trg_GRADES_Stats (no per-row decrypt).
+    Courses with fewer than 3 grades are left out by the SP (inference control).
+    """
+    course_id = request.args.get("course_id")
+    if course_id is not None:
+        try:
+            course_id = int(course_id)
+        except ValueError:
+            return jsonify({"error": "course_id must be an integer."}), 400
+
+    try:
+        rows = call_sp("dbo.sp_ViewCourseGradeStats", (u["Role"], course_id))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"stats": grade_stats_rows(rows)})
+
+
+def grade_stats_rows(rows: list) -> list:
+    stats = []
+    for r in rows:
+        stats.append({
+            "CourseID": r["CourseID"],
+            "RecordsCount": r["RecordsCount"],
+            "AvgGrade": r["AvgGrade"],
+            "MinGrade": r["MinGrade"],
+            "MaxGrade": r["MaxGrade"],
+            # histogram[i] = grades in [10*i, 10*i + 10), last bucket includes 100
+            "histogram": [r[f"Hist{i}"] for i in range(10)],
+        })
+    return stats
+
+
+# =========================================================
+# Public (non-secret) cache policy
+# =========================================================
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "300"))   # browser max-age for the public catalog
+CATALOG_RECHECK = float(os.getenv("CATALOG_RECHECK", "30"))  # how often we poll the DB catalog version
+
+_catalog = {"version": None, "etag": None, "courses": None, "checked_at": 0.0}
+_catalog_lock = threading.Lock()
+
+
+def public_cache(max_age: int):
+    """
+    Marks a view's response as cacheable (see add_security_headers).
+    Ignored on secret endpoints, which always keep no-store.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            g.public_max_age = max_age
+            return view_func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def public_catalog(role: str):
+    """
+    Returns (etag, courses). Memoized per process; re-checks the DB-side
+    catalog version (Needs FIX SP: sp_Guest_CatalogVersion) every CATALOG_RECHECK
+    seconds and only re-runs sp_Guest_ViewPublicCourses when it changed.
+    """
+    now = time.monotonic()
+    with _catalog_lock:
+        if _catalog["courses"] is not None and now - _catalog["checked_at"] < CATALOG_RECHECK:
+            return _catalog["etag"], _catalog["courses"]
+        cached_version = _catalog["version"]
+
+    rows = call_sp("dbo.sp_Guest_CatalogVersion", (role,))
+    version = rows[0]["Version"] if rows else None
+
+    if version is not None and version == cached_version:
+        with _catalog_lock:
+            _catalog["checked_at"] = now
+            return _catalog["etag"], _catalog["courses"]
+
+    courses = call_sp("dbo.sp_Guest_ViewPublicCourses", (role,))
+    etag = f"courses-v{version}"
+    with _catalog_lock:
+        _catalog.update(version=version, etag=etag, courses=courses, checked_at=now)
+    return etag, courses
+
+
 def is_secret_endpoint(path: str) -> bool:
     """
     Used for BONUS: prevent caching / exporting on secret panels.
@@ -77,24 +632,86 @@ def is_secret_endpoint(path: str) -> bool:
         or "/instructor/attendance" in p
         or "/api/student/grades" in p
         or "/api/student/attendance" in p
+        or "/api/student/overview" in p
         or "/api/ta/attendance" in p
         or "/api/instructor/grades" in p
         or "/api/instructor/attendance" in p
         or "/api/admin/grades" in p
         or "/api/admin/attendance" in p
+        or "/api/batch" in p
     )
 
 
+# =========================================================
+# Static assets: content-hash URLs + long-lived caching
+# url_for('static', filename=...) adds ?v=<hash of the file>. A request
+# with the current hash is cached for a year (immutable); any other
+# version must revalidate, so an edited file is picked up right away.
+# =========================================================
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+_static_digests = {}  # filename -> (mtime_ns, size, digest)
+_static_digests_lock = threading.Lock()
+
+
+def static_digest(filename: str):
+    """
+    First 12 hex chars of the file's sha256 (None if it is not under static/).
+    Re-hashed only when the file's mtime or size changes.
+    """
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    cached = _static_digests.get(filename)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    with _static_digests_lock:
+        _static_digests[filename] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+@bp.app_url_defaults
+def add_static_digest(endpoint, values):
+    if endpoint == "static" and "v" not in values:
+        digest = static_digest(values.get("filename", ""))
+        if digest:
+            values["v"] = digest
+
+
+def is_fingerprinted_static() -> bool:
+    v = request.args.get("v")
+    return bool(v) and v == static_digest((request.view_args or {}).get("filename", ""))
+
+
 # =========================================================
 # BONUS: GUI Flow Restrictions (headers)
 # - blocks saving/caching/printing in browsers (best effort)
 # =========================================================
-@app.after_request
+@bp.after_app_request
 def add_security_headers(response):
-    # Always avoid caching for safety
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    public_max_age = g.get("public_max_age")
+    if request.endpoint == "static":
+        # CSS / JS / images only; no-cache still lets the browser revalidate with the ETag
+        if response.status_code in (200, 304) and is_fingerprinted_static():
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+    elif public_max_age is not None and not is_secret_endpoint(request.path) and response.status_code in (200, 304):
+        # Unclassified data only (views opt in with @public_cache)
+        response.headers["Cache-Control"] = f"public, max-age={public_max_age}"
+    else:
+        # Always avoid caching for safety
+        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
     response.headers["X-Content-Type-Options"] = "nosniff"
 
     # Stronger restrictions for Secret panels (Grades/Attendance)
@@ -116,18 +733,116 @@ def add_security_headers(response):
     return response
 
 
+# =========================================================
+# Response compression (gzip, or brotli when installed)
+# - JSON and HTML bodies of at least COMPRESS_MIN_SIZE bytes (0 = off)
+# - streamed responses (exports, live streams) and static files go out as-is
+# - Cache-Control is left alone, so secret panels keep no-store
+# =========================================================
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_MIMETYPES = {"application/json", "text/html"}
+
+
+@bp.after_app_request
+def compress_response(response):
+    if (
+        COMPRESS_MIN_SIZE <= 0
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    coding = compress.choose(request.headers.get("Accept-Encoding", ""))
+    if coding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(compress.encode(data, coding))
+    response.headers["Content-Encoding"] = coding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)  # no longer byte-identical to the plain body
+    return response
+
+
+# =========================================================
+# Request metrics (per-route timing, exposed on /metrics)
+# =========================================================
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def _record_request(status: int):
+    started = g.pop("request_started", None)
+    if started is None:
+        return
+    # route template, not the raw path, so ids don't explode the label set
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    metrics.observe_request(request.method, route, status, time.perf_counter() - started)
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    _record_request(response.status_code)
+    return response
+
+
+@bp.teardown_app_request
+def record_failed_request(exc):
+    if exc is not None:
+        _record_request(500)
+
+
+@bp.get("/metrics")
+@login_required
+@role_required("Admin")
+def metrics_page():
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# =========================================================
+# Health (for load balancers / orchestrators, no login)
+# =========================================================
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "2"))
+
+
+@bp.get("/healthz")
+def healthz():
+    # liveness: the worker answers, no DB call
+    return jsonify({"ok": True})
+
+
+@bp.get("/readyz")
+def readyz():
+    # readiness: a pooled connection answers SELECT 1 in time
+    try:
+        ping_ms = db.ping(timeout=READY_TIMEOUT)
+    except Exception as e:
+        # type only: driver messages can carry server names
+        return jsonify({"ok": False, "db": "down", "error": type(e).__name__}), 503
+    return jsonify({"ok": True, "db": "up", "ping_ms": ping_ms, "pool": db.get_pool().stats()})
+
 # =========================================================
 # Root / Login pages
 # =========================================================
-@app.get("/")
+@bp.get("/")
 def root():
     u = session.get("user")
     if u:
         return redirect(role_redirect(u.get("Role", "Guest")))
-    return redirect(url_for("login_page"))
+    return redirect(url_for("srms.login_page"))
 
 
-@app.get("/login")
+@bp.get("/login")
 def login_page():
     return render_template("login.html")
 
@@ -135,7 +850,7 @@ def login_page():
 # =========================================================
 # Auth APIs
 # =========================================================
-@app.post("/api/login/guest")
+@bp.post("/api/login/guest")
 def api_login_guest():
     """
     Guest يدخل من غير username/password
@@ -144,12 +859,13 @@ def api_login_guest():
     return jsonify({"ok": True, "redirect": "/guest"})
 
 
-@app.post("/api/login")
+@bp.post("/api/login")
 def api_login():
     """
     Normal login:
     frontend يرسل {username, password}
-    backend يجرب الدور تلقائيًا: Admin -> Instructor -> TA -> Student
+    backend يحدد الدور في call واحدة (sp_AuthUserAnyRole)
+    لو نفس الـ username موجود بأكتر من دور: Admin -> Instructor -> TA -> Student
     """
     data = request.get_json(force=True) or {}
     username = (data.get("username") or "").strip()
@@ -158,23 +874,21 @@ def api_login():
     if not username or not password:
         return jsonify({"error": "Please enter username and password."}), 400
 
-    roles_to_try = ["Admin", "Instructor", "TA", "Student"]
-
-    for role in roles_to_try:
-        rows = call_sp("dbo.sp_AuthUser", (role, username, password))
-        if rows:
-            row = rows[0]
-            session["user"] = {
-                "UserID": row.get("UserID"),
-                "Role": row.get("Role"),
-                "ClearanceLevel": row.get("ClearanceLevel"),
-            }
-            return jsonify({"ok": True, "redirect": role_redirect(session["user"]["Role"])})
+    # Needs FIX SP: sp_AuthUserAnyRole
+    rows = call_sp("dbo.sp_AuthUserAnyRole", (username, password))
+    if rows:
+        row = rows[0]
+        session["user"] = {
+            "UserID": row.get("UserID"),
+            "Role": row.get("Role"),
+            "ClearanceLevel": row.get("ClearanceLevel"),
+        }
+        return jsonify({"ok": True, "redirect": role_redirect(session["user"]["Role"])})
 
     return jsonify({"error": "Incorrect username or password."}), 401
 
 
-@app.post("/api/logout")
+@bp.post("/api/logout")
 def api_logout():
     session.clear()
     return jsonify({"ok": True, "redirect": "/login"})
@@ -183,7 +897,7 @@ def api_logout():
 # =========================================================
 # /info (Unified: show who is logged in + edit if allowed)
 # =========================================================
-@app.get("/info")
+@bp.get("/info")
 @login_required
 @role_required("Admin", "Instructor", "TA", "Student", "Guest")
 def info_page():
@@ -191,7 +905,70 @@ def info_page():
     return render_template("info.html")
 
 
-@app.get("/api/me")
+def profile_calls(role: str, user_id: int, clearance: int) -> dict:
+    """
+    SPs behind /api/me, as call_sp_many input. Context + role-based profile
+    don't depend on each other, so they run at the same time.
+    """
+    calls = {"ctx": ("dbo.sp_GetUserContext", (user_id,))}
+    if role == "Student":
+        calls["profile"] = ("dbo.sp_ViewStudent_Profile", (role, user_id, clearance, None))
+    elif role in ("Admin", "TA"):
+        # Needs FIX SP: sp_ViewMyUserProfile
+        # Returns: UserID, Role, ClearanceLevel, FullName, Email
+        calls["profile"] = ("dbo.sp_ViewMyUserProfile", (role, user_id))
+    return calls
+
+
+def profile_from_results(role: str, results: dict):
+    """(context, role-based profile) from the call_sp_many results of profile_calls."""
+    ctx_rows = results["ctx"]
+    ctx = ctx_rows[0] if ctx_rows else {}
+
+    data_out = None
+    if "profile" in results:
+        rows = results["profile"]
+        data_out = rows[0] if rows else None
+    elif role == "Instructor":
+        # If you later add sp_ViewInstructor_Profile use it, for now use context.
+        data_out = ctx
+    return ctx, data_out
+
+
+def load_my_profile(role: str, user_id: int, clearance: int):
+    """
+    (context, role-based profile) for the logged-in user, cached per user.
+    """
+    def load():
+        return profile_from_results(role, call_sp_many(profile_calls(role, user_id, clearance)))
+
+    return user_cache.get_or_load((user_id, role, clearance), load)
+
+
+def me_payload(role: str, user_id: int, clearance: int, ctx, data_out) -> dict:
+    return {
+        "ok": True,
+        "profile": {
+            "role": role,
+            "user_id": user_id,
+            "clearance": clearance,
+            "context": ctx,
+            "data": data_out,
+        },
+    }
+
+
+def invalidate_user(user_id=None, student_id=None):
+    """
+    Drop cached /api/me data for a user (by UserID) or for whoever owns a StudentID.
+    """
+    user_cache.invalidate_if(
+        lambda key, value: key[0] == user_id
+        or (student_id is not None and (value[0] or {}).get("StudentID") == student_id)
+    )
+
+
+@bp.get("/api/me")
 @login_required
 @role_required("Admin", "Instructor", "TA", "Student", "Guest")
 def api_me_get():
@@ -214,44 +991,12 @@ def api_me_get():
             }
         )
 
-    # Context from SP
-    ctx_rows = call_sp("dbo.sp_GetUserContext", (user_id,))
-    ctx = ctx_rows[0] if ctx_rows else {}
-
-    # Role-based profile
-    data_out = None
-    if role == "Student":
-        rows = call_sp(
-            "dbo.sp_ViewStudent_Profile",
-            (role, user_id, clearance, None),
-        )
-        data_out = rows[0] if rows else None
-
-    elif role in ("Admin", "TA"):
-        # Needs FIX SP: sp_ViewMyUserProfile
-        # Returns: UserID, Role, ClearanceLevel, FullName, Email
-        rows = call_sp("dbo.sp_ViewMyUserProfile", (role, user_id))
-        data_out = rows[0] if rows else None
+    ctx, data_out = load_my_profile(role, user_id, clearance)
 
-    elif role == "Instructor":
-        # If you later add sp_ViewInstructor_Profile use it, for now use context.
-        data_out = ctx
-
-    return jsonify(
-        {
-            "ok": True,
-            "profile": {
-                "role": role,
-                "user_id": user_id,
-                "clearance": clearance,
-                "context": ctx,
-                "data": data_out,
-            },
-        }
-    )
+    return jsonify(me_payload(role, user_id, clearance, ctx, data_out))
 
 
-@app.post("/api/me")
+@bp.post("/api/me")
 @login_required
 @role_required("Admin", "Instructor", "TA", "Student")
 def api_me_update():
@@ -273,6 +1018,7 @@ def api_me_update():
 
     try:
         call_sp("dbo.sp_EditMyProfile", (role, user_id, full_name, email, dob, department))
+        notifier.publish("users", {"UserID": user_id})
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -281,53 +1027,61 @@ def api_me_update():
 # =========================================================
 # Guest (Public Courses)
 # =========================================================
-@app.get("/guest")
+@bp.get("/guest")
 @login_required
 @role_required("Guest", "Student", "TA", "Instructor", "Admin")
 def guest_page():
     return render_template("guest.html")
 
 
-@app.get("/api/courses/public")
+@bp.get("/api/courses/public")
 @login_required
+@public_cache(CATALOG_MAX_AGE)
 def api_public_courses():
     u = session["user"]
-    courses = call_sp("dbo.sp_Guest_ViewPublicCourses", (u.get("Role", "Guest"),))
-    return jsonify({"courses": courses})
+    etag, courses = public_catalog(u.get("Role", "Guest"))
+
+    # weak match: compress_response turns the ETag weak on gzip/br bodies
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify({"courses": courses})
+    resp.set_etag(etag)
+    return resp
 
 
 # =========================================================
 # Student GUI (Pages)
 # =========================================================
-@app.get("/student")
+@bp.get("/student")
 @login_required
 @role_required("Student", "Admin")
 def student_home():
     return render_template("student_home.html")
 
 
-@app.get("/student/profile")
+@bp.get("/student/profile")
 @login_required
 @role_required("Student", "Admin")
 def student_profile_page():
     return render_template("student_profile.html")
 
 
-@app.get("/student/grades")
+@bp.get("/student/grades")
 @login_required
 @role_required("Student", "Admin")
 def student_grades_page():
     return render_template("student_grades.html")
 
 
-@app.get("/student/attendance")
+@bp.get("/student/attendance")
 @login_required
 @role_required("Student", "Admin")
 def student_attendance_page():
     return render_template("student_attendance.html")
 
 
-@app.get("/student/role-request")
+@bp.get("/student/role-request")
 @login_required
 @role_required("Student", "Admin")
 def student_role_request_page():
@@ -337,11 +1091,15 @@ def student_role_request_page():
 # =========================================================
 # Student GUI (APIs)
 # =========================================================
-@app.get("/api/student/profile")
+@bp.get("/api/student/profile")
 @login_required
 @role_required("Student", "Admin")
 def api_student_profile():
     u = session["user"]
+    if u["Role"] == "Student":
+        _, profile = load_my_profile(u["Role"], u["UserID"], u["ClearanceLevel"])
+        return jsonify({"profile": profile})
+
     rows = call_sp(
         "dbo.sp_ViewStudent_Profile",
         (u["Role"], u["UserID"], u["ClearanceLevel"], None),
@@ -349,7 +1107,7 @@ def api_student_profile():
     return jsonify({"profile": rows[0] if rows else None})
 
 
-@app.post("/api/student/profile/edit")
+@bp.post("/api/student/profile/edit")
 @login_required
 @role_required("Student", "Admin")
 def api_student_profile_edit():
@@ -376,33 +1134,84 @@ def api_student_profile_edit():
             "dbo.sp_EditStudent_Profile",
             (u["Role"], u["UserID"], student_id, full_name, email, department),
         )
+        notifier.publish("users", {"StudentID": student_id})
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
-@app.get("/api/student/grades")
+@bp.get("/api/student/grades")
 @login_required
 @role_required("Student", "Admin")
 def api_student_grades():
     u = session["user"]
-    rows = call_sp("dbo.sp_ViewGrades", (u["Role"], u["UserID"]))
-    return jsonify({"grades": rows})
+    try:
+        term_id = term_arg()
+        filters = grade_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        rows = call_sp_rows("dbo.sp_ViewGrades", (u["Role"], u["UserID"], None, None, term_id, *filters))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("grades", rows)
 
-@app.get("/api/student/attendance")
+
+@bp.get("/api/student/overview")
+@login_required
+@role_required("Student")
+def api_student_overview():
+    """
+    Landing page data in one round trip: profile + published grade count/average
+    + per-course attendance rollups (Needs FIX SP: sp_Student_Overview, Fix.sql #21).
+    """
+    u = session["user"]
+    try:
+        sets = call_sp_multi(
+            "dbo.sp_Student_Overview",
+            (u["Role"], u["UserID"], u["ClearanceLevel"]),
+            ("profile", "grade_summary", "attendance_summary"),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "profile": sets["profile"][0] if sets["profile"] else None,
+        "grade_summary": sets["grade_summary"][0] if sets["grade_summary"] else None,
+        "attendance_summary": sets["attendance_summary"],
+    })
+
+
+@bp.get("/api/student/attendance/summary")
+@login_required
+@role_required("Student")
+def api_student_attendance_summary():
+    return attendance_summary(session["user"])
+
+
+@bp.get("/api/student/attendance")
 @login_required
 @role_required("Student", "Admin")
 def api_student_attendance():
     u = session["user"]
-    rows = call_sp(
-        "dbo.sp_ViewAttendance",
-        (u["Role"], u["UserID"], u["ClearanceLevel"], None, None),
-    )
-    return jsonify({"attendance": rows})
+    try:
+        term_id = term_arg()
+        filters = attendance_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows(
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], None, None, None, None, term_id, *filters),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("attendance", rows)
 
 
-@app.post("/api/student/role-request")
+@bp.post("/api/student/role-request")
 @login_required
 @role_required("Student", "Admin")
 def api_student_role_request():
@@ -418,35 +1227,37 @@ def api_student_role_request():
     if len(reason) < 5:
         return jsonify({"error": "Please enter a reason (min 5 characters)."}), 400
 
-    call_sp("dbo.sp_RequestRoleUpgrade", (u["Role"], u["UserID"], requested_role, reason))
+    rows = call_sp("dbo.sp_RequestRoleUpgrade", (u["Role"], u["UserID"], requested_role, reason))
+    if rows:
+        notifier.publish("role_requests", {"type": "submitted", "request": rows[0]})
     return jsonify({"ok": True})
 
 
 # =========================================================
 # TA GUI (Pages)
 # =========================================================
-@app.get("/ta")
+@bp.get("/ta")
 @login_required
 @role_required("TA", "Admin")
 def ta_home():
     return render_template("ta_home.html")
 
 
-@app.get("/ta/attendance")
+@bp.get("/ta/attendance")
 @login_required
 @role_required("TA", "Admin")
 def ta_attendance_page():
     return render_template("ta_attendance.html")
 
 
-@app.get("/ta/student-profile")
+@bp.get("/ta/student-profile")
 @login_required
 @role_required("TA", "Admin")
 def ta_student_profile_page():
     return render_template("ta_student_profile.html")
 
 
-@app.get("/ta/role-request")
+@bp.get("/ta/role-request")
 @login_required
 @role_required("TA", "Admin")
 def ta_role_request_page():
@@ -456,7 +1267,7 @@ def ta_role_request_page():
 # =========================================================
 # TA GUI (APIs)
 # =========================================================
-@app.get("/api/ta/attendance")
+@bp.get("/api/ta/attendance")
 @login_required
 @role_required("TA", "Admin")
 def api_ta_view_attendance():
@@ -467,14 +1278,41 @@ def api_ta_view_attendance():
     student_id = int(student_id) if student_id and student_id.isdigit() else None
     course_id = int(course_id) if course_id and course_id.isdigit() else None
 
-    rows = call_sp(
-        "dbo.sp_ViewAttendance",
-        (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id),
-    )
-    return jsonify({"attendance": rows})
+    if request.args.get("since_id") is not None:
+        return attendance_delta(u, student_id, course_id)
+
+    try:
+        after_id, limit = page_args()
+        term_id = term_arg()
+        filters = attendance_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows(
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id, after_id, limit + 1, term_id, *filters),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("attendance", rows, "AttendanceID", limit)
 
 
-@app.post("/api/ta/attendance/record")
+@bp.get("/api/ta/attendance/summary")
+@login_required
+@role_required("TA", "Admin")
+def api_ta_attendance_summary():
+    return attendance_summary(session["user"])
+
+
+@bp.get("/api/ta/attendance/stream")
+@login_required
+@role_required("TA", "Admin")
+def api_ta_attendance_stream():
+    return attendance_stream(session["user"])
+
+
+@bp.post("/api/ta/attendance/record")
 @login_required
 @role_required("TA", "Admin")
 def api_ta_record_attendance():
@@ -492,12 +1330,20 @@ def api_ta_record_attendance():
 
     try:
         call_sp("dbo.sp_RecordAttendance", (u["Role"], u["UserID"], student_id, course_id, status))
+        attendance_changed(course_id)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
-@app.get("/api/ta/student-profile")
+@bp.post("/api/ta/attendance/record-batch")
+@login_required
+@role_required("TA", "Admin")
+def api_ta_record_attendance_batch():
+    return record_attendance_batch(session["user"])
+
+
+@bp.get("/api/ta/student-profile")
 @login_required
 @role_required("TA", "Admin")
 def api_ta_student_profile():
@@ -517,7 +1363,7 @@ def api_ta_student_profile():
     return jsonify({"profile": rows[0]})
 
 
-@app.post("/api/ta/role-request")
+@bp.post("/api/ta/role-request")
 @login_required
 @role_required("TA", "Admin")
 def api_ta_role_request():
@@ -533,35 +1379,37 @@ def api_ta_role_request():
     if len(reason) < 5:
         return jsonify({"error": "Please enter a reason (min 5 characters)."}), 400
 
-    call_sp("dbo.sp_RequestRoleUpgrade", (u["Role"], u["UserID"], requested_role, reason))
+    rows = call_sp("dbo.sp_RequestRoleUpgrade", (u["Role"], u["UserID"], requested_role, reason))
+    if rows:
+        notifier.publish("role_requests", {"type": "submitted", "request": rows[0]})
     return jsonify({"ok": True})
 
 
 # =========================================================
 # Instructor GUI (Pages)
 # =========================================================
-@app.get("/instructor")
+@bp.get("/instructor")
 @login_required
 @role_required("Instructor", "Admin")
 def instructor_home():
     return render_template("instructor_home.html")
 
 
-@app.get("/instructor/grades")
+@bp.get("/instructor/grades")
 @login_required
 @role_required("Instructor", "Admin")
 def instructor_grades_page():
     return render_template("instructor_grades.html")
 
 
-@app.get("/instructor/attendance")
+@bp.get("/instructor/attendance")
 @login_required
 @role_required("Instructor", "Admin")
 def instructor_attendance_page():
     return render_template("instructor_attendance.html")
 
 
-@app.get("/instructor/student-profile")
+@bp.get("/instructor/student-profile")
 @login_required
 @role_required("Instructor", "Admin")
 def instructor_student_profile_page():
@@ -571,16 +1419,26 @@ def instructor_student_profile_page():
 # =========================================================
 # Instructor GUI (APIs)
 # =========================================================
-@app.get("/api/instructor/grades")
+@bp.get("/api/instructor/grades")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_view_grades():
     u = session["user"]
-    rows = call_sp("dbo.sp_ViewGrades", (u["Role"], u["UserID"]))
-    return jsonify({"grades": rows})
+    try:
+        after_id, limit = page_args()
+        term_id = term_arg()
+        filters = grade_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows("dbo.sp_ViewGrades", (u["Role"], u["UserID"], after_id, limit + 1, term_id, *filters))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("grades", rows, "GradeID", limit)
 
 
-@app.post("/api/instructor/grades/insert")
+@bp.post("/api/instructor/grades/insert")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_insert_grade():
@@ -606,7 +1464,7 @@ def api_instructor_insert_grade():
         return jsonify({"error": str(e)}), 400
 
 
-@app.post("/api/instructor/grades/publish")
+@bp.post("/api/instructor/grades/publish")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_publish_grade():
@@ -628,7 +1486,28 @@ def api_instructor_publish_grade():
         return jsonify({"error": str(e)}), 400
 
 
-@app.get("/api/instructor/attendance")
+@bp.post("/api/instructor/grades/import")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_import_grades():
+    return import_grades_batch(session["user"])
+
+
+@bp.post("/api/instructor/grades/publish-course")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_publish_course():
+    return publish_course_grades(session["user"])
+
+
+@bp.get("/api/instructor/grades/stats")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_grade_stats():
+    return course_grade_stats(session["user"])
+
+
+@bp.get("/api/instructor/attendance")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_view_attendance():
@@ -639,14 +1518,41 @@ def api_instructor_view_attendance():
     student_id = int(student_id) if student_id and student_id.isdigit() else None
     course_id = int(course_id) if course_id and course_id.isdigit() else None
 
-    rows = call_sp(
-        "dbo.sp_ViewAttendance",
-        (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id),
-    )
-    return jsonify({"attendance": rows})
+    if request.args.get("since_id") is not None:
+        return attendance_delta(u, student_id, course_id)
+
+    try:
+        after_id, limit = page_args()
+        term_id = term_arg()
+        filters = attendance_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows(
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id, after_id, limit + 1, term_id, *filters),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("attendance", rows, "AttendanceID", limit)
+
+
+@bp.get("/api/instructor/attendance/summary")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_attendance_summary():
+    return attendance_summary(session["user"])
+
+
+@bp.get("/api/instructor/attendance/stream")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_attendance_stream():
+    return attendance_stream(session["user"])
 
 
-@app.post("/api/instructor/attendance/record")
+@bp.post("/api/instructor/attendance/record")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_record_attendance():
@@ -664,12 +1570,20 @@ def api_instructor_record_attendance():
 
     try:
         call_sp("dbo.sp_RecordAttendance", (u["Role"], u["UserID"], student_id, course_id, status))
+        attendance_changed(course_id)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
-@app.get("/api/instructor/student-profile")
+@bp.post("/api/instructor/attendance/record-batch")
+@login_required
+@role_required("Instructor", "Admin")
+def api_instructor_record_attendance_batch():
+    return record_attendance_batch(session["user"])
+
+
+@bp.get("/api/instructor/student-profile")
 @login_required
 @role_required("Instructor", "Admin")
 def api_instructor_student_profile():
@@ -692,7 +1606,7 @@ def api_instructor_student_profile():
 # =========================================================
 # Admin GUI (Page)
 # =========================================================
-@app.get("/admin")
+@bp.get("/admin")
 @login_required
 @role_required("Admin")
 def admin_home():
@@ -702,16 +1616,22 @@ def admin_home():
 # =========================================================
 # Admin - EXTRA APIs (Admin does everything in the table)
 # =========================================================
-@app.get("/api/admin/users")
+@bp.get("/api/admin/users")
 @login_required
 @role_required("Admin")
 def api_admin_users():
     u = session["user"]
-    rows = call_sp("dbo.sp_Admin_ListUsers", (u["Role"],))
-    return jsonify({"users": rows})
+    try:
+        after_id, limit = page_args()
+        filters = user_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    rows = call_sp_rows("dbo.sp_Admin_ListUsers", (u["Role"], after_id, limit + 1, *filters))
+    return listing_response("users", rows, "UserID", limit)
 
-@app.get("/api/admin/role-requests")
+
+@bp.get("/api/admin/role-requests")
 @login_required
 @role_required("Admin")
 def api_admin_role_requests():
@@ -720,7 +1640,63 @@ def api_admin_role_requests():
     return jsonify({"requests": rows})
 
 
-@app.post("/api/admin/role-requests/approve")
+# Live pending queue (Server-Sent Events):
+#   event "snapshot"     {requests: [...]}   first, and again if this stream fell behind
+#   event "role_request" {type: submitted, request: {...}} | {type: approved|denied, RequestID}
+@bp.get("/api/admin/role-requests/stream")
+@login_required
+@role_required("Admin")
+def api_admin_role_requests_stream():
+    u = session["user"]
+    if not _live_slots.acquire(blocking=False):
+        resp = jsonify({"error": "Too many live streams, try again shortly."})
+        resp.headers["Retry-After"] = "10"
+        return resp, 503
+
+    # subscribe before reading the list so nothing published in between is lost
+    sub = notifier.subscribe("role_requests")
+
+    def close():
+        sub.close()
+        _live_slots.release()
+
+    try:
+        rows = call_sp("dbo.sp_Admin_ListPendingRoleRequests", (u["Role"],))
+    except Exception as e:
+        close()
+        return jsonify({"error": str(e)}), 400
+
+    def generate(rows=rows):
+        deadline = time.monotonic() + LIVE_STREAM_MAX_AGE
+        yield "retry: 3000\n\n"
+        try:
+            while True:
+                if rows is not None:
+                    yield f"event: snapshot\ndata: {fastjson.dumps({'requests': rows}).decode()}\n\n"
+                    rows = None
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return
+                events = sub.get(min(LIVE_POLL_SECONDS, left))
+                if sub.overflowed:
+                    sub.overflowed = False
+                    sub.get(0)  # what's still queued predates the fresh list
+                    rows = call_sp("dbo.sp_Admin_ListPendingRoleRequests", (u["Role"],))
+                    continue
+                for event in events:
+                    yield f"event: role_request\ndata: {fastjson.dumps(event).decode()}\n\n"
+                if not events:
+                    yield ": ping\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["X-Accel-Buffering"] = "no"
+    resp.call_on_close(close)
+    return resp
+
+
+@bp.post("/api/admin/role-requests/approve")
 @login_required
 @role_required("Admin")
 def api_admin_role_requests_approve():
@@ -732,13 +1708,19 @@ def api_admin_role_requests_approve():
         return jsonify({"error": "request_id must be an integer."}), 400
 
     try:
-        call_sp("dbo.sp_Admin_ApproveRoleRequest", (u["Role"], request_id))
+        rows = call_sp("dbo.sp_Admin_ApproveRoleRequest", (u["Role"], request_id))
+        # _on_role_request drops the user's cached profile (here and in the other workers)
+        notifier.publish("role_requests", {
+            "type": "approved",
+            "RequestID": request_id,
+            "UserID": rows[0]["UserID"] if rows else None,
+        })
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
-@app.post("/api/admin/role-requests/deny")
+@bp.post("/api/admin/role-requests/deny")
 @login_required
 @role_required("Admin")
 def api_admin_role_requests_deny():
@@ -751,23 +1733,51 @@ def api_admin_role_requests_deny():
 
     try:
         call_sp("dbo.sp_Admin_DenyRoleRequest", (u["Role"], request_id))
+        notifier.publish("role_requests", {"type": "denied", "RequestID": request_id})
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
 # Admin view grades (same SP used)
-@app.get("/api/admin/grades")
+@bp.get("/api/admin/grades")
 @login_required
 @role_required("Admin")
 def api_admin_view_grades():
     u = session["user"]
-    rows = call_sp("dbo.sp_ViewGrades", (u["Role"], u["UserID"]))
-    return jsonify({"grades": rows})
+    try:
+        after_id, limit = page_args()
+        term_id = term_arg()
+        filters = grade_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows("dbo.sp_ViewGrades", (u["Role"], u["UserID"], after_id, limit + 1, term_id, *filters))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("grades", rows, "GradeID", limit)
+
+
+# Admin export grades (streamed: ?format=ndjson|csv)
+@bp.get("/api/admin/grades/export")
+@login_required
+@role_required("Admin")
+def api_admin_export_grades():
+    u = session["user"]
+
+    try:
+        fmt = export_format()
+        term_id = term_arg()
+        filters = grade_filters()
+        rows = stream_sp("dbo.sp_ViewGrades", (u["Role"], u["UserID"], None, None, term_id, *filters))
+        return export_response(rows, fmt, "grades")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
 
 # Admin insert grade
-@app.post("/api/admin/grades/insert")
+@bp.post("/api/admin/grades/insert")
 @login_required
 @role_required("Admin")
 def api_admin_insert_grade():
@@ -794,7 +1804,7 @@ def api_admin_insert_grade():
 
 
 # Admin publish grade
-@app.post("/api/admin/grades/publish")
+@bp.post("/api/admin/grades/publish")
 @login_required
 @role_required("Admin")
 def api_admin_publish_grade():
@@ -815,8 +1825,32 @@ def api_admin_publish_grade():
         return jsonify({"error": str(e)}), 400
 
 
+# Admin bulk grade import (JSON records or CSV body)
+@bp.post("/api/admin/grades/import")
+@login_required
+@role_required("Admin")
+def api_admin_import_grades():
+    return import_grades_batch(session["user"])
+
+
+# Admin publish / unpublish every grade of a course
+@bp.post("/api/admin/grades/publish-course")
+@login_required
+@role_required("Admin")
+def api_admin_publish_course():
+    return publish_course_grades(session["user"])
+
+
+# Admin per-course grade statistics (COUNT >= 3 only)
+@bp.get("/api/admin/grades/stats")
+@login_required
+@role_required("Admin")
+def api_admin_grade_stats():
+    return course_grade_stats(session["user"])
+
+
 # Admin view attendance
-@app.get("/api/admin/attendance")
+@bp.get("/api/admin/attendance")
 @login_required
 @role_required("Admin")
 def api_admin_view_attendance():
@@ -827,15 +1861,53 @@ def api_admin_view_attendance():
     student_id = int(student_id) if student_id and student_id.isdigit() else None
     course_id = int(course_id) if course_id and course_id.isdigit() else None
 
-    rows = call_sp(
-        "dbo.sp_ViewAttendance",
-        (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id),
-    )
-    return jsonify({"attendance": rows})
+    if request.args.get("since_id") is not None:
+        return attendance_delta(u, student_id, course_id)
+
+    try:
+        after_id, limit = page_args()
+        term_id = term_arg()
+        filters = attendance_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp_rows(
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id, after_id, limit + 1, term_id, *filters),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return listing_response("attendance", rows, "AttendanceID", limit)
+
+
+# Admin export attendance (streamed: ?format=ndjson|csv, same filters as the list)
+@bp.get("/api/admin/attendance/export")
+@login_required
+@role_required("Admin")
+def api_admin_export_attendance():
+    u = session["user"]
+    student_id = request.args.get("student_id")
+    course_id = request.args.get("course_id")
+
+    student_id = int(student_id) if student_id and student_id.isdigit() else None
+    course_id = int(course_id) if course_id and course_id.isdigit() else None
+
+    try:
+        fmt = export_format()
+        term_id = term_arg()
+        filters = attendance_filters()
+        rows = stream_sp(
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id, None, None, term_id, *filters),
+        )
+        return export_response(rows, fmt, "attendance")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
 
 # Admin record attendance
-@app.post("/api/admin/attendance/record")
+@bp.post("/api/admin/attendance/record")
 @login_required
 @role_required("Admin")
 def api_admin_record_attendance():
@@ -853,13 +1925,394 @@ def api_admin_record_attendance():
 
     try:
         call_sp("dbo.sp_RecordAttendance", (u["Role"], u["UserID"], student_id, course_id, status))
+        attendance_changed(course_id)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
+# Admin record attendance for a whole roster
+@bp.post("/api/admin/attendance/record-batch")
+@login_required
+@role_required("Admin")
+def api_admin_record_attendance_batch():
+    return record_attendance_batch(session["user"])
+
+
+# =========================================================
+# Terms + archive (Needs FIX SP: Fix.sql #19)
+# The grade / attendance listings take ?term_id=: an open term reads only
+# the hot tables, an archived one only the columnstore archive, "all" both.
+# Without it they read the hot tables (every open term, Fix.sql #22).
+# =========================================================
+def _term_datetime(value, name: str) -> datetime:
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be an ISO date, e.g. 2025-09-01.")
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date, e.g. 2025-09-01.")
+
+
+@bp.get("/api/terms")
+@login_required
+@role_required("Admin", "Instructor", "TA", "Student")
+def api_terms():
+    u = session["user"]
+    try:
+        rows = call_sp("dbo.sp_ListTerms", (u["Role"],))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"terms": rows})
+
+
+@bp.post("/api/admin/terms")
+@login_required
+@role_required("Admin")
+def api_admin_create_term():
+    u = session["user"]
+    data = request.get_json(force=True) or {}
+    name = str(data.get("name") or "").strip()
+
+    if not name or len(name) > 50:
+        return jsonify({"error": "name is required (max 50 chars)."}), 400
+    try:
+        start = _term_datetime(data.get("start_date"), "start_date")
+        end = _term_datetime(data.get("end_date"), "end_date")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = call_sp("dbo.sp_Admin_CreateTerm", (u["Role"], name, start, end))
+        return jsonify({"ok": True, "term": rows[0] if rows else None})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def _move_term(sp_name: str, autocommit: bool = False):
+    u = session["user"]
+    data = request.get_json(force=True) or {}
+    term_id = data.get("term_id")
+
+    if not isinstance(term_id, int):
+        return jsonify({"error": "term_id must be an integer."}), 400
+
+    try:
+        rows = call_sp(sp_name, (u["Role"], term_id), autocommit=autocommit)
+        return jsonify({"ok": True, **(rows[0] if rows else {})})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# Moves an ended term's attendance + grades into the archive tables (rollups/grade stats unchanged).
+# autocommit: the SP compresses the archive rowgroups after its own COMMIT, which
+# SQL Server only allows outside a transaction (pooled conns always have one open).
+@bp.post("/api/admin/terms/archive")
+@login_required
+@role_required("Admin")
+def api_admin_archive_term():
+    return _move_term("dbo.sp_Admin_ArchiveTerm", autocommit=True)
+
+
+@bp.post("/api/admin/terms/restore")
+@login_required
+@role_required("Admin")
+def api_admin_restore_term():
+    return _move_term("dbo.sp_Admin_RestoreTerm")
+
+
+# =========================================================
+# Listing filters (Needs FIX SP: Fix.sql #20)
+# The grade / attendance / user listings, their exports and batch ops take
+# these as query-string (or batch) args. The SPs apply them before
+# decrypting or paging; a missing or empty value means no filter.
+# =========================================================
+USER_ROLES = ("Admin", "Instructor", "TA", "Student", "Guest")
+
+
+def _bool_arg(args: dict, name: str):
+    v = args.get(name)
+    if v is None or v == "":
+        return None
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, str) and v.lower() in ("1", "true", "0", "false"):
+        return v.lower() in ("1", "true")
+    raise ValueError(f"{name} must be true or false.")
+
+
+def _date_arg(args: dict, name: str, end: bool = False):
+    """ISO date/datetime; with end=True a plain date covers that whole day (the SPs use < @DateTo)."""
+    v = args.get(name)
+    if v is None or v == "":
+        return None
+    d = _term_datetime(v, name)
+    if end and len(v.strip()) == 10:
+        d += timedelta(days=1)
+    return d
+
+
+def term_arg(args=None):
+    """@TermID from ?term_id=N; missing or "all" -> None (the filters below send @AllTerms for "all")"""
+    args = request.args if args is None else args
+    if _all_terms(args):
+        return None
+    return _int_arg(args, "term_id")
+
+
+def _all_terms(args) -> bool:
+    return str(args.get("term_id") or "").strip().lower() == "all"
+
+
+def grade_filters(args=None) -> tuple:
+    """sp_ViewGrades params after @TermID: ?student_id, course_id, published, date_from, date_to, term_id=all"""
+    args = request.args if args is None else args
+    return (
+        _int_arg(args, "student_id"),
+        _int_arg(args, "course_id"),
+        _bool_arg(args, "published"),
+        _date_arg(args, "date_from"),
+        _date_arg(args, "date_to", end=True),
+        _all_terms(args),
+    )
+
+
+def attendance_filters(args=None) -> tuple:
+    """sp_ViewAttendance params after @TermID: ?status, date_from, date_to, term_id=all (student/course are positional)"""
+    args = request.args if args is None else args
+    return (
+        _bool_arg(args, "status"),
+        _date_arg(args, "date_from"),
+        _date_arg(args, "date_to", end=True),
+        _all_terms(args),
+    )
+
+
+def user_filters(args=None) -> tuple:
+    """sp_Admin_ListUsers params after @Limit: ?role, clearance"""
+    args = request.args if args is None else args
+    role = str(args.get("role") or "").strip() or None
+    if role is not None and role not in USER_ROLES:
+        raise ValueError(f"role must be one of: {', '.join(USER_ROLES)}.")
+    return role, _int_arg(args, "clearance")
+
+
+# =========================================================
+# Batched reads: POST /api/batch
+# Body: {"ops": [{"op": "users", "args": {"limit": 50}}, {"op": "grades", "key": "g"}, ...]}
+# -> {"results": {"users": {...}, "g": {...}}}, each result shaped like the
+#    matching GET endpoint, or {"error": "..."} if only that op failed.
+# One login/role check for the whole batch, then every SP runs through one
+# call_sp_many (parallel, pooled connections, one deadline).
+# =========================================================
+MAX_BATCH_OPS = 10
+
+
+def _int_arg(args: dict, name: str):
+    v = args.get(name)
+    if v is None or v == "":
+        return None
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    if isinstance(v, str) and v.isdigit():
+        return int(v)
+    raise ValueError(f"{name} must be an integer.")
+
+
+# Each planner returns (calls for call_sp_many, finish(results) -> payload); raises ValueError on bad args.
+def _batch_me(u, args):
+    role, user_id, clearance = u["Role"], u["UserID"], u["ClearanceLevel"]
+    key = (user_id, role, clearance)
+    cached = user_cache.get(key)
+    if cached is not None:
+        return {}, lambda results: me_payload(role, user_id, clearance, *cached)
+
+    def finish(results):
+        value = profile_from_results(role, results)
+        user_cache.set(key, value)
+        return me_payload(role, user_id, clearance, *value)
+
+    return profile_calls(role, user_id, clearance), finish
+
+
+def _batch_users(u, args):
+    after_id, limit = page_args(args)
+    filters = user_filters(args)
+
+    def finish(results):
+        rows, next_cursor = paged(results["rows"], "UserID", limit)
+        return {"users": rows, "next_cursor": next_cursor}
+
+    return {"rows": ("dbo.sp_Admin_ListUsers", (u["Role"], after_id, limit + 1, *filters))}, finish
+
+
+def _batch_role_requests(u, args):
+    return (
+        {"rows": ("dbo.sp_Admin_ListPendingRoleRequests", (u["Role"],))},
+        lambda results: {"requests": results["rows"]},
+    )
+
+
+def _batch_grades(u, args):
+    after_id, limit = page_args(args)
+    term_id = term_arg(args)
+    filters = grade_filters(args)
+
+    def finish(results):
+        rows, next_cursor = paged(results["rows"], "GradeID", limit)
+        return {"grades": rows, "next_cursor": next_cursor}
+
+    return {"rows": ("dbo.sp_ViewGrades", (u["Role"], u["UserID"], after_id, limit + 1, term_id, *filters))}, finish
+
+
+def _batch_grade_stats(u, args):
+    course_id = _int_arg(args, "course_id")
+    return (
+        {"rows": ("dbo.sp_ViewCourseGradeStats", (u["Role"], course_id))},
+        lambda results: {"stats": grade_stats_rows(results["rows"])},
+    )
+
+
+def _batch_attendance(u, args):
+    student_id = _int_arg(args, "student_id")
+    course_id = _int_arg(args, "course_id")
+    term_id = term_arg(args)
+    filters = attendance_filters(args)
+    after_id, limit = page_args(args)
+
+    def finish(results):
+        rows, next_cursor = paged(results["rows"], "AttendanceID", limit)
+        return {"attendance": rows, "next_cursor": next_cursor}
+
+    return {
+        "rows": (
+            "dbo.sp_ViewAttendance",
+            (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id, after_id, limit + 1, term_id, *filters),
+        )
+    }, finish
+
+
+def _batch_attendance_summary(u, args):
+    student_id = _int_arg(args, "student_id")
+    course_id = _int_arg(args, "course_id")
+    return (
+        {"rows": ("dbo.sp_ViewAttendanceSummary", (u["Role"], u["UserID"], u["ClearanceLevel"], student_id, course_id))},
+        lambda results: {"summary": results["rows"]},
+    )
+
+
+def _batch_public_courses(u, args):
+    # memoized catalog (see public_catalog); usually no DB call at all
+    return {}, lambda results: {"courses": public_catalog(u["Role"])[1]}
+
+
+# op name -> (roles allowed, planner); roles mirror the matching GET routes
+BATCH_OPS = {
+    "me": (("Admin", "Instructor", "TA", "Student"), _batch_me),
+    "users": (("Admin",), _batch_users),
+    "role_requests": (("Admin",), _batch_role_requests),
+    "grades": (("Admin", "Instructor", "Student"), _batch_grades),
+    "grade_stats": (("Admin", "Instructor"), _batch_grade_stats),
+    "attendance": (("Admin", "Instructor", "TA", "Student"), _batch_attendance),
+    "attendance_summary": (("Admin", "Instructor", "TA", "Student"), _batch_attendance_summary),
+    "public_courses": (("Admin", "Instructor", "TA", "Student", "Guest"), _batch_public_courses),
+}
+
+
+def run_batch(u: dict, ops: list) -> dict:
+    """
+    ops = [(key, op_name, args), ...] already checked against BATCH_OPS + the user's role.
+    Returns {key: payload or {"error": ...}}. Raises ValueError on bad args,
+    db.FanoutTimeoutError when the batch misses its deadline.
+    """
+    plans = []
+    calls = {}
+    for key, name, args in ops:
+        try:
+            op_calls, finish = BATCH_OPS[name][1](u, args)
+        except ValueError as e:
+            raise ValueError(f"{key}: {e}")
+        plans.append((key, op_calls, finish))
+        calls.update({(key, sub): call for sub, call in op_calls.items()})
+
+    results = call_sp_many(calls, return_exceptions=True)
+
+    out = {}
+    for key, op_calls, finish in plans:
+        op_results = {sub: results[(key, sub)] for sub in op_calls}
+        failed = next((r for r in op_results.values() if isinstance(r, Exception)), None)
+        if failed is not None:
+            out[key] = {"error": str(failed)}
+            continue
+        try:
+            out[key] = finish(op_results)
+        except Exception as e:
+            out[key] = {"error": str(e)}
+    return out
+
+
+@bp.post("/api/batch")
+@login_required
+def api_batch():
+    u = session["user"]
+    data = request.get_json(force=True, silent=True) or {}
+    items = data.get("ops")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "ops must be a non-empty list."}), 400
+    if len(items) > MAX_BATCH_OPS:
+        return jsonify({"error": f"ops is limited to {MAX_BATCH_OPS} per request."}), 400
+
+    ops = []
+    seen = set()
+    for i, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        name = item.get("op")
+        key = item.get("key") or name
+        args = item.get("args") or {}
+
+        if name not in BATCH_OPS:
+            return jsonify({"error": f"ops[{i}]: unknown op {name!r}."}), 400
+        if not isinstance(key, str) or key in seen:
+            return jsonify({"error": f"ops[{i}]: key must be a unique string."}), 400
+        if not isinstance(args, dict):
+            return jsonify({"error": f"ops[{i}]: args must be an object."}), 400
+        if u.get("Role") not in BATCH_OPS[name][0]:
+            return jsonify({"error": f"ops[{i}]: {name} is not allowed for role {u.get('Role')}."}), 403
+        seen.add(key)
+        ops.append((key, name, args))
+
+    try:
+        results = run_batch(u, ops)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except db.FanoutTimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+    return jsonify({"results": results})
+
+
 # =========================================================
-# Run
+# App factory + Run
+# - production: gunicorn -c gunicorn.conf.py (see wsgi.py)
+# - each worker process builds its own app and DB pool; nothing
+#   DB-related is created at import time, so fork() shares no ODBC handles
 # =========================================================
+def create_app(warm_db: bool = False) -> Flask:
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(BASE_DIR, "templates"),
+        static_folder=os.path.join(BASE_DIR, "static"),
+    )
+
+    # مهم: حط أي secret في .env أفضل
+    app.secret_key = os.getenv("FLASK_SECRET", "change-me-please")
+
+    app.register_blueprint(bp)
+
+    if warm_db:
+        db.warm_pool()
+    return app
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
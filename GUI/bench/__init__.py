@@ -0,0 +1 @@
+"""Load-test harness and local stored-procedure stand-in (see loadtest.py)."""
@@ -0,0 +1,361 @@
+"""
+HTTP load test for the SRMS portal.
+
+Drives a weighted mix of role workloads (student dashboard reads, TA/instructor
+attendance bursts, admin listings) and reports p50/p95/p99 latency and req/s
+per endpoint.
+
+    cd GUI
+    python -m bench.loadtest                                # in-process, SQLite stand-in
+    python -m bench.loadtest --out before.json
+    python -m bench.loadtest --out after.json --compare before.json
+    python -m bench.loadtest --url http://127.0.0.1:5000    # live server (real DB, demo accounts)
+
+In-process runs use a fresh SQLite dataset built from --seed, and every worker
+draws its requests from its own seeded RNG, so two runs with the same flags
+send the same request mix against the same data: compare them on one machine.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+GUI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "student=6,instructor=2,ta=1,admin=1"
+DEMO_STUDENTS = ["ze", "do", "am", "fa", "ma"]
+PASSWORD = "123"
+
+
+# =========================================================
+# Clients
+# =========================================================
+class InProcessClient:
+    """Flask test client against the imported app (no sockets)."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method: str, path: str, body=None):
+        resp = self._client.open(path, method=method, json=body)
+        data = resp.get_data()  # drain streamed bodies too
+        resp.close()
+        return resp.status_code, data
+
+
+class HttpClient:
+    """urllib client with its own cookie jar (one session per client)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method: str, path: str, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with self._opener.open(req, timeout=60) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+# =========================================================
+# Stats
+# =========================================================
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100.0) - 1))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # label -> [seconds]
+        self.errors = {}   # label -> count
+
+    def add(self, label: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, wall: float) -> dict:
+        def row(values, errors):
+            values = sorted(values)
+            return {
+                "count": len(values),
+                "errors": errors,
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "rps": round(len(values) / wall, 1) if wall > 0 else 0.0,
+            }
+
+        endpoints = {label: row(v, self.errors.get(label, 0)) for label, v in sorted(self.samples.items())}
+        everything = [s for v in self.samples.values() for s in v]
+        total = row(everything, sum(self.errors.values()))
+        total["wall_s"] = round(wall, 3)
+        return {"endpoints": endpoints, "total": total}
+
+
+# =========================================================
+# Virtual users
+# =========================================================
+class Session:
+    """One logged-in role session plus the ids it discovered during setup."""
+
+    def __init__(self, role: str, client, recorder: Recorder):
+        self.role = role
+        self.client = client
+        self.recorder = recorder
+        self.pairs = []  # (student_id, course_id) this role may write attendance/grades for
+
+    def call(self, label: str, method: str, path: str, body=None, measured: bool = False):
+        t0 = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, body)
+            ok = status < 400
+        except Exception:
+            data, ok = b"", False
+        if measured:
+            self.recorder.add(label, time.perf_counter() - t0, ok)
+        return data if ok else None
+
+    def login(self, username: str):
+        if self.call("POST /api/login", "POST", "/api/login", {"username": username, "password": PASSWORD}) is None:
+            raise RuntimeError(f"login failed for {username!r} ({self.role})")
+
+    def discover(self, path: str):
+        data = self.call("GET " + path.split("?")[0], "GET", path)
+        rows = (json.loads(data) or {}).get("attendance", []) if data else []
+        self.pairs = sorted({(r["StudentID"], r["CourseID"]) for r in rows})
+
+
+def _roster(s: Session, rnd: random.Random):
+    course_id = rnd.choice(s.pairs)[1]
+    students = [sid for sid, cid in s.pairs if cid == course_id][:40]
+    return {"course_id": course_id, "records": [{"student_id": sid, "status": rnd.random() > 0.1} for sid in students]}
+
+
+def _batch(*ops):
+    return {"ops": [{"op": op} for op in ops]}
+
+
+# role -> [(weight, label, method, path, body_fn / fixed body / None)]; body_fns need discovered pairs
+SCENARIOS = {
+    "student": [
+        (3, "GET /api/me", "GET", "/api/me", None),
+        (2, "GET /api/student/profile", "GET", "/api/student/profile", None),
+        (4, "GET /api/student/grades", "GET", "/api/student/grades", None),
+        (4, "GET /api/student/attendance", "GET", "/api/student/attendance", None),
+        (3, "GET /api/student/overview", "GET", "/api/student/overview", None),
+        (2, "GET /api/student/attendance/summary", "GET", "/api/student/attendance/summary", None),
+        (1, "GET /api/courses/public", "GET", "/api/courses/public", None),
+    ],
+    "ta": [
+        (4, "GET /api/ta/attendance", "GET", "/api/ta/attendance?limit=200", None),
+        (3, "POST /api/ta/attendance/record", "POST", "/api/ta/attendance/record",
+         lambda s, rnd: dict(zip(("student_id", "course_id"), rnd.choice(s.pairs)), status=rnd.random() > 0.1)),
+        (1, "POST /api/ta/attendance/record-batch", "POST", "/api/ta/attendance/record-batch", _roster),
+        (2, "GET /api/ta/attendance/summary", "GET", "/api/ta/attendance/summary?course_id=1", None),
+    ],
+    "instructor": [
+        (3, "GET /api/instructor/grades", "GET", "/api/instructor/grades?limit=200", None),
+        (3, "GET /api/instructor/attendance", "GET", "/api/instructor/attendance?limit=200", None),
+        (1, "GET /api/instructor/attendance (term)", "GET", "/api/instructor/attendance?term_id=1&limit=200", None),
+        (2, "GET /api/instructor/grades (filtered)", "GET",
+         "/api/instructor/grades?course_id=1&published=false&limit=200", None),
+        (3, "POST /api/instructor/attendance/record-batch", "POST", "/api/instructor/attendance/record-batch", _roster),
+        (1, "POST /api/instructor/grades/insert", "POST", "/api/instructor/grades/insert",
+         lambda s, rnd: dict(zip(("student_id", "course_id"), rnd.choice(s.pairs)), grade=rnd.randint(50, 100))),
+        (1, "GET /api/instructor/grades/stats", "GET", "/api/instructor/grades/stats", None),
+        (2, "GET /api/instructor/attendance/summary", "GET", "/api/instructor/attendance/summary?course_id=1", None),
+        (1, "POST /api/batch (instructor home)", "POST", "/api/batch", _batch("me", "grade_stats", "attendance")),
+    ],
+    "admin": [
+        (3, "GET /api/admin/users", "GET", "/api/admin/users?limit=200", None),
+        (3, "GET /api/admin/grades", "GET", "/api/admin/grades?limit=200", None),
+        (3, "GET /api/admin/attendance", "GET", "/api/admin/attendance?limit=200", None),
+        (1, "GET /api/admin/grades (term)", "GET", "/api/admin/grades?term_id=1&limit=200", None),
+        (2, "GET /api/admin/attendance (filtered)", "GET",
+         "/api/admin/attendance?course_id=1&status=false&date_from=2025-09-01&limit=200", None),
+        (1, "GET /api/admin/users (filtered)", "GET", "/api/admin/users?role=Student&clearance=2&limit=200", None),
+        (2, "GET /api/admin/grades (columnar)", "GET", "/api/admin/grades?limit=200&format=columnar", None),
+        (2, "GET /api/admin/attendance (columnar)", "GET", "/api/admin/attendance?limit=200&format=columnar", None),
+        (2, "GET /api/admin/role-requests", "GET", "/api/admin/role-requests", None),
+        (4, "POST /api/batch (admin home)", "POST", "/api/batch",
+         _batch("me", "users", "role_requests", "grades", "attendance", "public_courses")),
+        (1, "GET /api/me", "GET", "/api/me", None),
+    ],
+}
+
+LOGINS = {"instructor": "in", "ta": "ta", "admin": "ad"}
+DISCOVER = {"instructor": "/api/instructor/attendance?limit=500", "ta": "/api/ta/attendance?limit=500"}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        role, _, weight = part.partition("=")
+        role = role.strip().lower()
+        if role not in SCENARIOS:
+            raise ValueError(f"unknown role in --mix: {role!r} (expected one of {', '.join(SCENARIOS)})")
+        mix[role] = float(weight or 1)
+    return mix
+
+
+def worker(index: int, args, make_client, recorder: Recorder, budget: dict, budget_lock: threading.Lock):
+    rnd = random.Random(args.seed * 1000 + index)
+    students = [f"st{n}" for n in range(1, args.students + 1)] if not args.url else DEMO_STUDENTS
+
+    sessions = {}
+    for role in args.mix:
+        s = Session(role, make_client(), recorder)
+        s.login(rnd.choice(students) if role == "student" else LOGINS[role])
+        if role in DISCOVER:
+            s.discover(DISCOVER[role])
+        sessions[role] = s
+
+    roles = list(args.mix)
+    weights = [args.mix[r] for r in roles]
+    while True:
+        with budget_lock:
+            if budget["left"] <= 0:
+                return
+            budget["left"] -= 1
+            measured = budget["left"] < budget["measure_from"]
+            if budget["left"] == budget["measure_from"] - 1:
+                budget["t0"] = time.perf_counter()
+
+        s = sessions[rnd.choices(roles, weights)[0]]
+        actions = [a for a in SCENARIOS[s.role] if not callable(a[4]) or s.pairs]
+        _, label, method, path, body = rnd.choices(actions, [a[0] for a in actions])[0]
+        s.call(label, method, path, body(s, rnd) if callable(body) else body, measured)
+
+
+# =========================================================
+# Report
+# =========================================================
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=GUI_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(result: dict, baseline: dict = None):
+    base = (baseline or {}).get("endpoints", {})
+    head = f"{'endpoint':<48}{'count':>7}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}"
+    if baseline:
+        head += f"{'p50 Δ':>9}{'p95 Δ':>9}"
+    print(head)
+    print("-" * len(head))
+
+    def line(label, r, old):
+        out = f"{label:<48}{r['count']:>7}{r['errors']:>5}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['rps']:>9.1f}"
+        if baseline:
+            for key in ("p50_ms", "p95_ms"):
+                if old and old.get(key):
+                    out += f"{(r[key] - old[key]) / old[key] * 100:>+8.1f}%"
+                else:
+                    out += f"{'-':>9}"
+        print(out)
+
+    for label, r in result["endpoints"].items():
+        line(label, r, base.get(label))
+    print("-" * len(head))
+    line("TOTAL", result["total"], (baseline or {}).get("total"))
+    print(f"wall {result['total']['wall_s']}s, commit {result['meta']['commit']}, mode {result['meta']['mode']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SRMS HTTP load test (p50/p95/p99 + req/s per endpoint).")
+    ap.add_argument("--url", help="base URL of a running server; default runs app.py in-process on SQLite")
+    ap.add_argument("--requests", type=int, default=2000, help="measured requests (default 2000)")
+    ap.add_argument("--warmup", type=int, default=100, help="unmeasured requests first (default 100); logins are never measured")
+    ap.add_argument("--concurrency", type=int, default=8, help="worker threads (default 8)")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"role weights (default {DEFAULT_MIX})")
+    ap.add_argument("--students", type=int, default=2000, help="synthetic students for the SQLite dataset")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", help="write results as JSON (for --compare on a later run)")
+    ap.add_argument("--compare", help="previous --out file to diff against")
+    args = ap.parse_args(argv)
+    args.mix = parse_mix(args.mix)
+
+    backend = None
+    if args.url:
+        def make_client():
+            return HttpClient(args.url)
+    else:
+        sys.path.insert(0, GUI_DIR)
+        import app as app_module
+        from bench.sqlite_backend import SqliteBackend
+
+        backend = SqliteBackend.seeded(students=args.students, seed=args.seed)
+        backend.install(app_module)
+        flask_app = app_module.create_app()
+
+        def make_client():
+            return InProcessClient(flask_app)
+
+    recorder = Recorder()
+    budget = {"left": args.requests + args.warmup, "measure_from": args.requests, "t0": time.perf_counter()}
+    budget_lock = threading.Lock()
+
+    threads = [
+        threading.Thread(target=worker, args=(i, args, make_client, recorder, budget, budget_lock), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - budget["t0"]
+    finally:
+        if backend is not None:
+            backend.close()
+
+    result = recorder.summary(wall)
+    result["meta"] = {
+        "commit": git_commit(),
+        "mode": args.url or "in-process/sqlite",
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "students": args.students,
+        "seed": args.seed,
+        "python": platform.python_version(),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
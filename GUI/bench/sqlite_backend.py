@@ -0,0 +1,835 @@
+"""
+SQLite stand-in for the SRMS stored procedures.
+
+Implements the same contracts call_sp / stream_sp rely on (procedure name,
+positional params, column names, RAISERROR messages) on a plain-text SQLite
+copy of the schema, so app.py can be benchmarked without SQL Server.
+Encryption, GRANTs and the blind index are not modelled: the numbers measure
+the Flask side (routing, sessions, JSON, caching) plus a realistic data shape.
+
+    backend = SqliteBackend.seeded(students=2000)
+    backend.install(app_module)   # swaps app.call_sp / app.call_sp_rows / app.stream_sp
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+SCHEMA = """
+CREATE TABLE STUDENT (
+    StudentID INTEGER PRIMARY KEY, FullName TEXT NOT NULL, Email TEXT NOT NULL,
+    DOB TEXT, Department TEXT, ClearanceLevel INTEGER NOT NULL
+);
+CREATE TABLE INSTRUCTOR (
+    InstructorID INTEGER PRIMARY KEY, FullName TEXT NOT NULL, Email TEXT NOT NULL,
+    ClearanceLevel INTEGER NOT NULL
+);
+CREATE TABLE COURSE (
+    CourseID INTEGER PRIMARY KEY, CourseName TEXT NOT NULL, Description TEXT,
+    PublicInfo TEXT, InstructorID INTEGER
+);
+CREATE TABLE ENROLLMENT (
+    EnrollmentID INTEGER PRIMARY KEY, StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    UNIQUE (StudentID, CourseID)
+);
+CREATE TABLE USERS (
+    UserID INTEGER PRIMARY KEY, Username TEXT NOT NULL UNIQUE, Password TEXT NOT NULL,
+    Role TEXT NOT NULL, ClearanceLevel INTEGER NOT NULL,
+    StudentID INTEGER, InstructorID INTEGER, FullName TEXT, Email TEXT
+);
+CREATE TABLE TA_COURSE (
+    AssignmentID INTEGER PRIMARY KEY, TAUserID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    UNIQUE (TAUserID, CourseID)
+);
+CREATE TABLE GRADES (
+    GradeID INTEGER PRIMARY KEY, StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    Grade DECIMAL, IsPublished BIT NOT NULL DEFAULT 0,
+    DateEntered DATETIME NOT NULL, PublishedDate DATETIME
+);
+CREATE TABLE ATTENDANCE (
+    AttendanceID INTEGER PRIMARY KEY, StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    Status BIT NOT NULL, DateRecorded DATETIME NOT NULL, RecordedByUserID INTEGER
+);
+CREATE TABLE ROLE_REQUESTS (
+    RequestID INTEGER PRIMARY KEY, UserID INTEGER NOT NULL, CurrentRole TEXT NOT NULL,
+    RequestedRole TEXT NOT NULL, Reason TEXT NOT NULL, Status TEXT NOT NULL DEFAULT 'Pending',
+    RequestDate DATETIME NOT NULL
+);
+CREATE TABLE CATALOG_VERSION (ID INTEGER PRIMARY KEY, Version INTEGER NOT NULL);
+CREATE TABLE ATTENDANCE_ROLLUP (
+    StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    PresentCount INTEGER NOT NULL DEFAULT 0, AbsentCount INTEGER NOT NULL DEFAULT 0,
+    CurrentStreak INTEGER NOT NULL DEFAULT 0, LongestStreak INTEGER NOT NULL DEFAULT 0,
+    LastPresentAt DATETIME, LastRecordedAt DATETIME, LastAttendanceID INTEGER,
+    PRIMARY KEY (StudentID, CourseID)
+);
+CREATE TABLE TERM (
+    TermID INTEGER PRIMARY KEY, TermName TEXT NOT NULL UNIQUE, StartDate DATETIME NOT NULL,
+    EndDate DATETIME NOT NULL, IsArchived BIT NOT NULL DEFAULT 0, ArchivedAt DATETIME
+);
+CREATE TABLE ATTENDANCE_ARCHIVE (
+    AttendanceID INTEGER PRIMARY KEY, StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    Status BIT NOT NULL, DateRecorded DATETIME NOT NULL, RecordedByUserID INTEGER, TermID INTEGER NOT NULL
+);
+CREATE TABLE GRADES_ARCHIVE (
+    GradeID INTEGER PRIMARY KEY, StudentID INTEGER NOT NULL, CourseID INTEGER NOT NULL,
+    Grade DECIMAL, IsPublished BIT NOT NULL, DateEntered DATETIME NOT NULL, PublishedDate DATETIME,
+    TermID INTEGER NOT NULL
+);
+
+-- Fix.sql #18 (row-at-a-time here; SQLite evaluates every SET against the old row);
+-- rows restored from the archive are already counted (Fix.sql #19)
+CREATE TRIGGER trg_ATTENDANCE_Rollup AFTER INSERT ON ATTENDANCE
+WHEN NOT EXISTS (SELECT 1 FROM ATTENDANCE_ARCHIVE x WHERE x.AttendanceID = NEW.AttendanceID)
+BEGIN
+    INSERT OR IGNORE INTO ATTENDANCE_ROLLUP (StudentID, CourseID) VALUES (NEW.StudentID, NEW.CourseID);
+    UPDATE ATTENDANCE_ROLLUP SET
+        PresentCount = PresentCount + NEW.Status,
+        AbsentCount = AbsentCount + 1 - NEW.Status,
+        CurrentStreak = CASE WHEN NEW.Status THEN CurrentStreak + 1 ELSE 0 END,
+        LongestStreak = CASE WHEN NEW.Status THEN MAX(LongestStreak, CurrentStreak + 1) ELSE LongestStreak END,
+        LastPresentAt = CASE WHEN NEW.Status THEN NEW.DateRecorded ELSE LastPresentAt END,
+        LastRecordedAt = NEW.DateRecorded,
+        LastAttendanceID = NEW.AttendanceID
+    WHERE StudentID = NEW.StudentID AND CourseID = NEW.CourseID;
+END;
+
+-- same access paths as Fix.sql #13
+CREATE INDEX IX_ATTENDANCE_Student ON ATTENDANCE (StudentID, AttendanceID DESC);
+CREATE INDEX IX_ATTENDANCE_Course ON ATTENDANCE (CourseID, AttendanceID DESC);
+CREATE INDEX IX_GRADES_Student_Published ON GRADES (StudentID, IsPublished, GradeID DESC);
+CREATE INDEX IX_GRADES_Course ON GRADES (CourseID);
+CREATE INDEX IX_ROLE_REQUESTS_Pending ON ROLE_REQUESTS (RequestDate DESC) WHERE Status = 'Pending';
+CREATE INDEX IX_ATTENDANCE_ROLLUP_Course ON ATTENDANCE_ROLLUP (CourseID);
+CREATE INDEX IX_ATTENDANCE_ARCHIVE_Term ON ATTENDANCE_ARCHIVE (TermID);
+CREATE INDEX IX_GRADES_ARCHIVE_Term ON GRADES_ARCHIVE (TermID);
+CREATE INDEX IX_GRADES_Course_GradeID ON GRADES (CourseID, GradeID DESC);
+CREATE INDEX IX_GRADES_DateEntered ON GRADES (DateEntered);
+CREATE INDEX IX_ATTENDANCE_DateRecorded ON ATTENDANCE (DateRecorded);
+CREATE INDEX IX_USERS_Role_Clearance ON USERS (Role, ClearanceLevel, UserID);
+"""
+
+MAX_INT = 2147483647
+
+ATTENDANCE_COLUMNS = "AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID"
+GRADE_COLUMNS = "GradeID, StudentID, CourseID, Grade, IsPublished, DateEntered, PublishedDate"
+
+# sp_ViewAttendanceSummary columns (see _rollup for AttendanceRate)
+ROLLUP_COLUMNS = (
+    "r.StudentID, r.CourseID, r.PresentCount, r.AbsentCount, "
+    "100.0 * r.PresentCount / NULLIF(r.PresentCount + r.AbsentCount, 0) AS AttendanceRate, "
+    "r.CurrentStreak, r.LongestStreak, r.LastPresentAt, r.LastRecordedAt"
+)
+
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATETIME", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("DECIMAL", lambda b: Decimal(b.decode()).quantize(Decimal("0.01")))
+sqlite3.register_converter("BIT", lambda b: b not in (b"0", b""))
+
+
+class ProcError(Exception):
+    """RAISERROR stand-in: str(e) is the procedure's message."""
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class SqliteBackend:
+    """
+    One SQLite file (WAL mode), one connection per thread.
+    Procedures are the sp_* methods below, looked up by their dbo. name.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+
+    # ---------- setup ----------
+    @classmethod
+    def seeded(cls, students: int = 2000, courses: int = 50, seed: int = 42, path: str = None):
+        """
+        Fresh database with a deterministic dataset (same seed = same rows), so runs
+        on different commits see identical data. Logins (password 123):
+        ad (Admin), in (Instructor), ta (TA), st1..stN (Students).
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="srms-bench-", suffix=".sqlite")
+            os.close(fd)
+        backend = cls(path)
+        backend._seed(students, courses, random.Random(seed))
+        return backend
+
+    def _seed(self, students: int, courses: int, rnd: random.Random):
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        base = datetime(2025, 9, 1)
+
+        conn.execute("INSERT INTO INSTRUCTOR VALUES (1, 'Bench Instructor', 'in@uni.edu', 3)")
+        conn.executemany(
+            "INSERT INTO COURSE (CourseID, CourseName, PublicInfo, InstructorID) VALUES (?, ?, ?, 1)",
+            [(c, f"Course {c}", f"Public info for course {c}") for c in range(1, courses + 1)],
+        )
+        conn.execute("INSERT INTO CATALOG_VERSION VALUES (1, 1)")
+        conn.execute(
+            "INSERT INTO TERM (TermID, TermName, StartDate, EndDate) VALUES (1, 'Fall 2025', ?, ?)",
+            (base, datetime(2026, 1, 1)),
+        )
+        conn.executemany(
+            "INSERT INTO STUDENT (StudentID, FullName, Email, Department, ClearanceLevel) VALUES (?, ?, ?, 'CS', ?)",
+            [(s, f"Student {s}", f"st{s}@uni.edu", 1 + s % 2) for s in range(1, students + 1)],
+        )
+
+        users = [
+            ("ad", "Admin", 3, None, None, "Admin", "admin@uni.edu"),
+            ("in", "Instructor", 3, None, 1, None, None),
+            ("ta", "TA", 2, None, None, "Bench TA", "ta@uni.edu"),
+        ] + [(f"st{s}", "Student", 1 + s % 2, s, None, None, None) for s in range(1, students + 1)]
+        conn.executemany(
+            "INSERT INTO USERS (Username, Password, Role, ClearanceLevel, StudentID, InstructorID, FullName, Email) "
+            "VALUES (?, '123', ?, ?, ?, ?, ?, ?)",
+            users,
+        )
+        ta_id = conn.execute("SELECT UserID FROM USERS WHERE Username = 'ta'").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO TA_COURSE (TAUserID, CourseID) VALUES (?, ?)",
+            [(ta_id, c) for c in range(1, min(courses, 10) + 1)],
+        )
+
+        enroll, att, grades = [], [], []
+        for s in range(1, students + 1):
+            for c in rnd.sample(range(1, courses + 1), min(5, courses)):
+                enroll.append((s, c))
+                for d in range(4):
+                    att.append((s, c, rnd.random() > 0.15, base + timedelta(days=7 * d, minutes=s), ta_id))
+                published = rnd.random() > 0.3
+                grades.append((s, c, Decimal(rnd.randint(40, 100)), published, base, base if published else None))
+        conn.executemany("INSERT INTO ENROLLMENT (StudentID, CourseID) VALUES (?, ?)", enroll)
+        conn.executemany(
+            "INSERT INTO ATTENDANCE (StudentID, CourseID, Status, DateRecorded, RecordedByUserID) VALUES (?, ?, ?, ?, ?)",
+            att,
+        )
+        conn.executemany(
+            "INSERT INTO GRADES (StudentID, CourseID, Grade, IsPublished, DateEntered, PublishedDate) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            grades,
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self, remove: bool = True):
+        with self._conns_lock:
+            for c in self._conns:
+                c.close()
+            self._conns.clear()
+        if remove:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except OSError:
+                    pass
+
+    # ---------- call_sp / stream_sp contract ----------
+    def _proc(self, sp_name: str):
+        name = sp_name.split(".")[-1]
+        fn = getattr(self, name, None) if name.startswith("sp_") else None
+        if fn is None:
+            raise ProcError(f"Could not find stored procedure '{sp_name}'.")
+        return fn
+
+    def _run(self, sp_name: str, params: tuple):
+        conn = self._conn()
+        try:
+            result = self._proc(sp_name)(conn, *params)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _run_first(self, sp_name: str, params: tuple):
+        # multi-result procs return a list of (columns, rows); single-set callers see the first
+        result = self._run(sp_name, params)
+        if isinstance(result, list):
+            return result[0] if result else None
+        return result
+
+    def call_sp(self, sp_name: str, params: tuple = (), autocommit: bool = False):
+        # autocommit is a SQL Server concern (each proc here already runs in its own transaction)
+        result = self._run_first(sp_name, params)
+        if not result:
+            return []
+        columns, rows = result
+        return [dict(zip(columns, r)) for r in rows]
+
+    def call_sp_rows(self, sp_name: str, params: tuple = (), autocommit: bool = False):
+        from db import ResultSet  # app imports db anyway; keeps this module importable on its own
+
+        result = self._run_first(sp_name, params)
+        if not result:
+            return ResultSet([], [])
+        columns, rows = result
+        return ResultSet(columns, [tuple(r) for r in rows])
+
+    def call_sp_multi(self, sp_name: str, params: tuple = (), names: tuple = ()):
+        result = self._run(sp_name, params)
+        sets = result if isinstance(result, list) else [result]
+        out = {}
+        for i, name in enumerate(names):
+            columns, rows = sets[i] if i < len(sets) and sets[i] else ([], [])
+            out[name] = [dict(zip(columns, r)) for r in rows]
+        return out
+
+    def stream_sp(self, sp_name: str, params: tuple = (), batch_size: int = 500):
+        result = self._run_first(sp_name, params)
+        if not result:
+            yield []
+            return
+        columns, rows = result
+        yield columns
+        for r in rows:
+            yield tuple(r)
+
+    def install(self, module):
+        """Point a module's call_sp* / stream_sp (e.g. app) at this backend."""
+        module.call_sp = self.call_sp
+        module.call_sp_rows = self.call_sp_rows
+        module.call_sp_multi = self.call_sp_multi
+        module.stream_sp = self.stream_sp
+        fan_out = getattr(module, "call_sp_many", None)
+        if fan_out is not None:
+            # keep db.call_sp_many's threads + deadline, but run each call here
+            module.call_sp_many = lambda calls, *args, **kw: fan_out(calls, *args, call=self.call_sp, **kw)
+
+    # ---------- helpers ----------
+    @staticmethod
+    def _select(conn, sql: str, args=()):
+        cur = conn.execute(sql, args)
+        return [c[0] for c in cur.description], cur.fetchall()
+
+    @staticmethod
+    def _scalar(conn, sql: str, args=()):
+        row = conn.execute(sql, args).fetchone()
+        return row[0] if row else None
+
+    def _own_student_id(self, conn, user_id):
+        return self._scalar(conn, "SELECT StudentID FROM USERS WHERE UserID = ? AND Role = 'Student'", (user_id,))
+
+    # ---------- auth / context ----------
+    def sp_AuthUserAnyRole(self, conn, username, password):
+        return self._select(
+            conn,
+            "SELECT UserID, Role, ClearanceLevel FROM USERS "
+            "WHERE Username = ? AND Password = ? AND Role IN ('Admin','Instructor','TA','Student') "
+            "ORDER BY CASE Role WHEN 'Admin' THEN 1 WHEN 'Instructor' THEN 2 WHEN 'TA' THEN 3 ELSE 4 END, UserID "
+            "LIMIT 1",
+            (username.strip().lower(), password),
+        )
+
+    def sp_GetUserContext(self, conn, user_id):
+        return self._select(
+            conn, "SELECT UserID, Role, ClearanceLevel, StudentID, InstructorID FROM USERS WHERE UserID = ?", (user_id,)
+        )
+
+    def sp_ViewMyUserProfile(self, conn, role, user_id):
+        if role not in ("Admin", "TA"):
+            raise ProcError("Access Denied.")
+        return self._select(
+            conn, "SELECT UserID, Role, ClearanceLevel, FullName, Email FROM USERS WHERE UserID = ?", (user_id,)
+        )
+
+    def sp_ViewStudent_Profile(self, conn, role, user_id, clearance, student_id=None):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied")
+        if role == "Student":
+            student_id = self._own_student_id(conn, user_id)
+            if student_id is None:
+                raise ProcError("Student identity not linked to this account.")
+        if role == "TA":
+            if student_id is None:
+                raise ProcError("TA must specify StudentID.")
+            if not self._scalar(
+                conn,
+                "SELECT 1 FROM TA_COURSE tc JOIN ENROLLMENT e ON e.CourseID = tc.CourseID AND e.StudentID = ? "
+                "WHERE tc.TAUserID = ?",
+                (student_id, user_id),
+            ):
+                raise ProcError("Access Denied: Student not in your assigned courses.")
+        return self._select(
+            conn,
+            "SELECT StudentID, FullName, Email, DOB, Department, ClearanceLevel FROM STUDENT "
+            "WHERE StudentID = ? AND ClearanceLevel <= ?",
+            (student_id, clearance),
+        )
+
+    def sp_EditMyProfile(self, conn, role, user_id, full_name, email, dob=None, department=None):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied: Editing not allowed.")
+        if role == "Student":
+            sid = self._own_student_id(conn, user_id)
+            if sid is None:
+                raise ProcError("Student identity not linked.")
+            conn.execute(
+                "UPDATE STUDENT SET FullName = ?, Email = ?, DOB = ?, Department = ? WHERE StudentID = ?",
+                (full_name, email, dob, department, sid),
+            )
+        elif role == "Instructor":
+            iid = self._scalar(conn, "SELECT InstructorID FROM USERS WHERE UserID = ? AND Role = 'Instructor'", (user_id,))
+            if iid is None:
+                raise ProcError("Instructor identity not linked.")
+            conn.execute("UPDATE INSTRUCTOR SET FullName = ?, Email = ? WHERE InstructorID = ?", (full_name, email, iid))
+        else:
+            conn.execute("UPDATE USERS SET FullName = ?, Email = ? WHERE UserID = ?", (full_name, email, user_id))
+
+    def sp_EditStudent_Profile(self, conn, role, user_id, student_id, full_name, email, department):
+        if role not in ("Admin", "Student"):
+            raise ProcError("Access Denied.")
+        if role == "Student" and self._own_student_id(conn, user_id) != student_id:
+            raise ProcError("Students can edit only their own profile.")
+        cur = conn.execute(
+            "UPDATE STUDENT SET FullName = ?, Email = ?, Department = ? WHERE StudentID = ?",
+            (full_name, email, department, student_id),
+        )
+        if cur.rowcount == 0:
+            raise ProcError("Student not found.")
+
+    # ---------- public catalog ----------
+    def sp_Guest_ViewPublicCourses(self, conn, role):
+        if role not in ("Guest", "Student", "TA", "Instructor", "Admin"):
+            raise ProcError("Access Denied")
+        return self._select(conn, "SELECT CourseID, CourseName, PublicInfo FROM COURSE ORDER BY CourseID")
+
+    def sp_Guest_CatalogVersion(self, conn, role):
+        if role not in ("Guest", "Student", "TA", "Instructor", "Admin"):
+            raise ProcError("Access Denied")
+        return self._select(conn, "SELECT Version FROM CATALOG_VERSION WHERE ID = 1")
+
+    # ---------- grades ----------
+    def sp_ViewGrades(self, conn, role, user_id, after_id=None, limit=None, term_id=None, student_id=None,
+                      course_id=None, is_published=None, date_from=None, date_to=None, all_terms=False):
+        if role not in ("Admin", "Instructor", "Student"):
+            raise ProcError("Access Denied: Grades not allowed for this role.")
+        source, source_args = self._term_source(conn, "GRADES", GRADE_COLUMNS, "DateEntered", term_id, all_terms)
+        where, args = ["GradeID < ?"], [*source_args, MAX_INT if after_id is None else after_id]
+        if role == "Student":
+            sid = self._own_student_id(conn, user_id)
+            if sid is None:
+                raise ProcError("Student identity not linked to this account.")
+            where.append("StudentID = ? AND IsPublished = 1")
+            args.append(sid)
+        # Fix.sql #20 filters, only the ones given
+        for clause, value in (("StudentID = ?", student_id), ("CourseID = ?", course_id),
+                              ("IsPublished = ?", is_published), ("DateEntered >= ?", date_from),
+                              ("DateEntered < ?", date_to)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        args.append(MAX_INT if limit is None else limit)
+        return self._select(
+            conn,
+            f"SELECT {GRADE_COLUMNS} FROM {source} WHERE {' AND '.join(where)} ORDER BY GradeID DESC LIMIT ?",
+            args,
+        )
+
+    def _term_source(self, conn, table: str, columns: str, date_column: str, term_id, all_terms=False):
+        """FROM source of the term-aware listings (Fix.sql #19, #22): hot only, hot + archive, or one term's rows."""
+        if term_id is None:
+            if not all_terms:
+                return table, ()
+            return f"(SELECT {columns} FROM {table} UNION ALL SELECT {columns} FROM {table}_ARCHIVE)", ()
+        term = conn.execute("SELECT StartDate, EndDate, IsArchived FROM TERM WHERE TermID = ?", (term_id,)).fetchone()
+        if term is None:
+            raise ProcError("Term not found.")
+        start, end, archived = term
+        if archived:
+            return f"(SELECT {columns} FROM {table}_ARCHIVE WHERE TermID = ?)", (term_id,)
+        return f"(SELECT {columns} FROM {table} WHERE {date_column} >= ? AND {date_column} < ?)", (start, end)
+
+    def _grade_check(self, conn, clearance, student_id, course_id):
+        student_clearance = self._scalar(conn, "SELECT ClearanceLevel FROM STUDENT WHERE StudentID = ?", (student_id,))
+        if student_clearance is None:
+            return "Student not found."
+        if not self._scalar(conn, "SELECT 1 FROM COURSE WHERE CourseID = ?", (course_id,)):
+            return "Course not found."
+        if clearance < student_clearance:
+            return "No Write Down violation: insufficient clearance."
+        return None
+
+    def sp_InsertGrade(self, conn, role, user_id, clearance, student_id, course_id, grade):
+        if role not in ("Admin", "Instructor"):
+            raise ProcError("Access Denied: Admin/Instructor only.")
+        error = self._grade_check(conn, clearance, student_id, course_id)
+        if error:
+            raise ProcError(error)
+        conn.execute(
+            "INSERT INTO GRADES (StudentID, CourseID, Grade, IsPublished, DateEntered) VALUES (?, ?, ?, 0, ?)",
+            (student_id, course_id, Decimal(str(grade)), _now()),
+        )
+
+    def sp_InsertGradeBatch(self, conn, role, user_id, clearance, rows):
+        if role not in ("Admin", "Instructor"):
+            raise ProcError("Access Denied: Admin/Instructor only.")
+        out, now = [], _now()
+        for row_no, student_id, course_id, grade in rows:
+            error = self._grade_check(conn, clearance, student_id, course_id)
+            if error is None:
+                conn.execute(
+                    "INSERT INTO GRADES (StudentID, CourseID, Grade, IsPublished, DateEntered) VALUES (?, ?, ?, 0, ?)",
+                    (student_id, course_id, Decimal(str(grade)), now),
+                )
+            out.append((row_no, student_id, course_id, error is None, error))
+        return ["RowNo", "StudentID", "CourseID", "Inserted", "Error"], out
+
+    def sp_SetGradePublished(self, conn, role, grade_id, publish):
+        if role not in ("Admin", "Instructor"):
+            raise ProcError("Access Denied: Admin/Instructor only.")
+        cur = conn.execute(
+            "UPDATE GRADES SET IsPublished = ?, PublishedDate = ? WHERE GradeID = ?",
+            (bool(publish), _now() if publish else None, grade_id),
+        )
+        if cur.rowcount == 0:
+            raise ProcError("GradeID not found.")
+
+    def sp_PublishCourseGrades(self, conn, role, course_id, publish):
+        if role not in ("Admin", "Instructor"):
+            raise ProcError("Access Denied: Admin/Instructor only.")
+        if not self._scalar(conn, "SELECT 1 FROM COURSE WHERE CourseID = ?", (course_id,)):
+            raise ProcError("Course not found.")
+        cur = conn.execute(
+            "UPDATE GRADES SET IsPublished = ?, PublishedDate = ? WHERE CourseID = ? AND IsPublished <> ?",
+            (bool(publish), _now() if publish else None, course_id, bool(publish)),
+        )
+        return ["Updated"], [(cur.rowcount,)]
+
+    def sp_ViewCourseGradeStats(self, conn, role, course_id=None):
+        if role not in ("Admin", "Instructor"):
+            raise ProcError("Access Denied: Admin/Instructor only.")
+        hist = ", ".join(f"SUM(Bucket = {i}) AS Hist{i}" for i in range(10))
+        columns, rows = self._select(
+            conn,
+            f"SELECT CourseID, COUNT(*) AS RecordsCount, AVG(Grade) AS AvgGrade, MIN(Grade) AS MinGrade, "
+            f"MAX(Grade) AS MaxGrade, {hist} "
+            f"FROM (SELECT CourseID, Grade, MIN(MAX(CAST(Grade / 10 AS INTEGER), 0), 9) AS Bucket "
+            f"FROM (SELECT CourseID, Grade FROM GRADES UNION ALL SELECT CourseID, Grade FROM GRADES_ARCHIVE) "
+            f"WHERE Grade IS NOT NULL" + (" AND CourseID = ?" if course_id is not None else "") + ") "
+            f"GROUP BY CourseID HAVING COUNT(*) >= 3 ORDER BY CourseID",
+            () if course_id is None else (course_id,),
+        )
+        q = Decimal("0.01")
+        rows = [r[:2] + tuple(Decimal(str(v)).quantize(q) for v in r[2:5]) + r[5:] for r in rows]
+        return columns, rows
+
+    # ---------- attendance ----------
+    def sp_ViewAttendance(self, conn, role, user_id, clearance, student_id=None, course_id=None,
+                          after_id=None, limit=None, term_id=None, status=None, date_from=None, date_to=None,
+                          all_terms=False):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied")
+        source = self._term_source(conn, "ATTENDANCE", ATTENDANCE_COLUMNS, "DateRecorded", term_id, all_terms)
+        return self._view_attendance(conn, role, user_id, clearance, student_id, course_id,
+                                     "a.AttendanceID < ?", MAX_INT if after_id is None else after_id, "DESC", limit,
+                                     source, (("a.Status = ?", status), ("a.DateRecorded >= ?", date_from),
+                                              ("a.DateRecorded < ?", date_to)))
+
+    def sp_ViewAttendanceSince(self, conn, role, user_id, clearance, since_id, student_id=None, course_id=None,
+                               limit=None):
+        return self._view_attendance(conn, role, user_id, clearance, student_id, course_id,
+                                     "a.AttendanceID > ?", since_id or 0, "ASC", limit)
+
+    def _view_attendance(self, conn, role, user_id, clearance, student_id, course_id, seek, seek_id, order, limit,
+                         source=("ATTENDANCE", ()), filters=()):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied")
+        if role == "Student":
+            student_id = self._own_student_id(conn, user_id)
+            if student_id is None:
+                raise ProcError("Student identity not linked to this account.")
+        source, source_args = source
+        # build the filter like the indexes expect (an OR'd NULL check would force a scan here)
+        where, args = ["s.ClearanceLevel <= ?", seek], [*source_args, clearance, seek_id]
+        if student_id is not None:
+            where.append("a.StudentID = ?")
+            args.append(student_id)
+        if course_id is not None:
+            where.append("a.CourseID = ?")
+            args.append(course_id)
+        for clause, value in filters:
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        if role == "TA":
+            where.append("EXISTS (SELECT 1 FROM TA_COURSE tc WHERE tc.TAUserID = ? AND tc.CourseID = a.CourseID)")
+            args.append(user_id)
+        args.append(MAX_INT if limit is None else limit)
+        return self._select(
+            conn,
+            "SELECT a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID "
+            f"FROM {source} a JOIN STUDENT s ON s.StudentID = a.StudentID "
+            f"WHERE {' AND '.join(where)} ORDER BY a.AttendanceID {order} LIMIT ?",
+            args,
+        )
+
+    def sp_Student_Overview(self, conn, role, user_id, clearance):
+        if role != "Student":
+            raise ProcError("Access Denied: Student only.")
+        sid = self._own_student_id(conn, user_id)
+        if sid is None:
+            raise ProcError("Student identity not linked to this account.")
+        # all terms, like the rollups (Fix.sql #21)
+        columns, rows = self._select(
+            conn,
+            "SELECT COUNT(*) AS GradeCount, AVG(Grade) AS AvgGrade FROM "
+            "(SELECT Grade FROM GRADES WHERE StudentID = ? AND IsPublished = 1 "
+            "UNION ALL SELECT Grade FROM GRADES_ARCHIVE WHERE StudentID = ? AND IsPublished = 1)",
+            (sid, sid),
+        )
+        count, avg = rows[0]
+        summary = (columns, [(count, None if avg is None else Decimal(str(avg)).quantize(Decimal("0.01")))])
+        return [
+            self._select(
+                conn,
+                "SELECT StudentID, FullName, Email, DOB, Department, ClearanceLevel FROM STUDENT "
+                "WHERE StudentID = ? AND ClearanceLevel <= ?",
+                (sid, clearance),
+            ),
+            summary,
+            self._rollup(
+                conn,
+                "WHERE r.StudentID = ? AND s.ClearanceLevel <= ? ORDER BY r.CourseID",
+                (sid, clearance),
+            ),
+        ]
+
+    def sp_ViewAttendanceSummary(self, conn, role, user_id, clearance, student_id=None, course_id=None):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied")
+        if role == "Student":
+            student_id = self._own_student_id(conn, user_id)
+            if student_id is None:
+                raise ProcError("Student identity not linked to this account.")
+        where, args = ["s.ClearanceLevel <= ?"], [clearance]
+        if student_id is not None:
+            where.append("r.StudentID = ?")
+            args.append(student_id)
+        if course_id is not None:
+            where.append("r.CourseID = ?")
+            args.append(course_id)
+        if role == "TA":
+            where.append("EXISTS (SELECT 1 FROM TA_COURSE tc WHERE tc.TAUserID = ? AND tc.CourseID = r.CourseID)")
+            args.append(user_id)
+        return self._rollup(conn, f"WHERE {' AND '.join(where)} ORDER BY r.CourseID, r.StudentID", args)
+
+    def _rollup(self, conn, where_order: str, args):
+        columns, rows = self._select(
+            conn,
+            f"SELECT {ROLLUP_COLUMNS} FROM ATTENDANCE_ROLLUP r JOIN STUDENT s ON s.StudentID = r.StudentID {where_order}",
+            args,
+        )
+        # DECIMAL(5,2) like SQL Server
+        q = Decimal("0.01")
+        rows = [r[:4] + (None if r[4] is None else Decimal(str(r[4])).quantize(q),) + r[5:] for r in rows]
+        return columns, rows
+
+    def _attendance_course_check(self, conn, role, user_id, course_id):
+        if role not in ("Admin", "Instructor", "TA"):
+            raise ProcError("Access Denied: cannot edit attendance.")
+        if not self._scalar(conn, "SELECT 1 FROM COURSE WHERE CourseID = ?", (course_id,)):
+            raise ProcError("Course not found.")
+        if role == "TA" and not self._scalar(
+            conn, "SELECT 1 FROM TA_COURSE WHERE TAUserID = ? AND CourseID = ?", (user_id, course_id)
+        ):
+            raise ProcError("Access Denied: TA not assigned to this course.")
+
+    def sp_RecordAttendance(self, conn, role, user_id, student_id, course_id, status):
+        if role not in ("Admin", "Instructor", "TA"):
+            raise ProcError("Access Denied: cannot edit attendance.")
+        if not self._scalar(conn, "SELECT 1 FROM STUDENT WHERE StudentID = ?", (student_id,)):
+            raise ProcError("Student not found.")
+        self._attendance_course_check(conn, role, user_id, course_id)
+        if not self._scalar(conn, "SELECT 1 FROM ENROLLMENT WHERE StudentID = ? AND CourseID = ?", (student_id, course_id)):
+            raise ProcError("Student is not enrolled in this course.")
+        conn.execute(
+            "INSERT INTO ATTENDANCE (StudentID, CourseID, Status, DateRecorded, RecordedByUserID) VALUES (?, ?, ?, ?, ?)",
+            (student_id, course_id, bool(status), _now(), user_id),
+        )
+
+    def sp_RecordAttendanceBatch(self, conn, role, user_id, course_id, roster):
+        self._attendance_course_check(conn, role, user_id, course_id)
+        enrolled = {
+            r[0] for r in conn.execute("SELECT StudentID FROM ENROLLMENT WHERE CourseID = ?", (course_id,))
+        }
+        out, seen, now = [], set(), _now()
+        for row_no, student_id, status in sorted(roster):
+            if not self._scalar(conn, "SELECT 1 FROM STUDENT WHERE StudentID = ?", (student_id,)):
+                error = "Student not found."
+            elif student_id not in enrolled:
+                error = "Student is not enrolled in this course."
+            elif student_id in seen:
+                error = "Duplicate student in roster."
+            else:
+                error = None
+                conn.execute(
+                    "INSERT INTO ATTENDANCE (StudentID, CourseID, Status, DateRecorded, RecordedByUserID) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (student_id, course_id, bool(status), now, user_id),
+                )
+            seen.add(student_id)
+            out.append((row_no, student_id, error is None, error))
+        return ["RowNo", "StudentID", "Recorded", "Error"], out
+
+    # ---------- role requests / admin ----------
+    def sp_RequestRoleUpgrade(self, conn, role, user_id, requested_role, reason):
+        if role not in ("Student", "TA"):
+            raise ProcError("Only Student/TA can submit upgrade requests.")
+        current = self._scalar(conn, "SELECT Role FROM USERS WHERE UserID = ?", (user_id,))
+        cur = conn.execute(
+            "INSERT INTO ROLE_REQUESTS (UserID, CurrentRole, RequestedRole, Reason, RequestDate) VALUES (?, ?, ?, ?, ?)",
+            (user_id, current, requested_role, reason, _now()),
+        )
+        return self._select(
+            conn,
+            "SELECT RequestID, UserID, CurrentRole, RequestedRole, Reason, RequestDate, Status "
+            "FROM ROLE_REQUESTS WHERE RequestID = ?",
+            (cur.lastrowid,),
+        )
+
+    def sp_Admin_ListPendingRoleRequests(self, conn, role):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        return self._select(
+            conn,
+            "SELECT RequestID, UserID, CurrentRole, RequestedRole, Reason, RequestDate, Status "
+            "FROM ROLE_REQUESTS WHERE Status = 'Pending' ORDER BY RequestDate DESC",
+        )
+
+    def sp_Admin_ApproveRoleRequest(self, conn, role, request_id):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        row = conn.execute(
+            "SELECT UserID, RequestedRole FROM ROLE_REQUESTS WHERE RequestID = ? AND Status = 'Pending'", (request_id,)
+        ).fetchone()
+        if row is None:
+            raise ProcError("Invalid RequestID or request not Pending.")
+        conn.execute("UPDATE USERS SET Role = ? WHERE UserID = ?", (row[1], row[0]))
+        conn.execute("UPDATE ROLE_REQUESTS SET Status = 'Approved' WHERE RequestID = ?", (request_id,))
+        return ["RequestID", "UserID", "NewRole"], [(request_id, row[0], row[1])]
+
+    def sp_Admin_DenyRoleRequest(self, conn, role, request_id):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        cur = conn.execute(
+            "UPDATE ROLE_REQUESTS SET Status = 'Denied' WHERE RequestID = ? AND Status = 'Pending'", (request_id,)
+        )
+        if cur.rowcount == 0:
+            raise ProcError("Invalid RequestID or request not Pending.")
+
+    def sp_Admin_ListUsers(self, conn, role, after_id=None, limit=None, user_role=None, clearance=None):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        where, args = ["UserID > ?"], [0 if after_id is None else after_id]
+        for clause, value in (("Role = ?", user_role), ("ClearanceLevel = ?", clearance)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        args.append(MAX_INT if limit is None else limit)
+        return self._select(
+            conn,
+            "SELECT UserID, Role, ClearanceLevel, StudentID, InstructorID FROM USERS "
+            f"WHERE {' AND '.join(where)} ORDER BY UserID LIMIT ?",
+            args,
+        )
+
+    # ---------- terms / archive (Fix.sql #19) ----------
+    def sp_ListTerms(self, conn, role):
+        if role not in ("Admin", "Instructor", "TA", "Student"):
+            raise ProcError("Access Denied")
+        return self._select(
+            conn, "SELECT TermID, TermName, StartDate, EndDate, IsArchived, ArchivedAt FROM TERM ORDER BY StartDate DESC"
+        )
+
+    def sp_Admin_CreateTerm(self, conn, role, term_name, start_date, end_date):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        if start_date is None or end_date is None or end_date <= start_date:
+            raise ProcError("Term must end after it starts.")
+        if self._scalar(conn, "SELECT 1 FROM TERM WHERE TermName = ?", (term_name,)):
+            raise ProcError("Term name already exists.")
+        if self._scalar(conn, "SELECT 1 FROM TERM WHERE StartDate < ? AND EndDate > ?", (end_date, start_date)):
+            raise ProcError("Term overlaps an existing term.")
+        cur = conn.execute(
+            "INSERT INTO TERM (TermName, StartDate, EndDate) VALUES (?, ?, ?)", (term_name, start_date, end_date)
+        )
+        return self._select(
+            conn,
+            "SELECT TermID, TermName, StartDate, EndDate, IsArchived, ArchivedAt FROM TERM WHERE TermID = ?",
+            (cur.lastrowid,),
+        )
+
+    def sp_Admin_ArchiveTerm(self, conn, role, term_id):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        term = conn.execute("SELECT StartDate, EndDate, IsArchived FROM TERM WHERE TermID = ?", (term_id,)).fetchone()
+        if term is None:
+            raise ProcError("Term not found.")
+        start, end, archived = term
+        if archived:
+            raise ProcError("Term is already archived.")
+        if end > _now():
+            raise ProcError("Term has not ended yet.")
+        # copy first, then delete (the rollup trigger only fires on insert here)
+        conn.execute(
+            f"INSERT INTO ATTENDANCE_ARCHIVE ({ATTENDANCE_COLUMNS}, TermID) SELECT {ATTENDANCE_COLUMNS}, ? "
+            "FROM ATTENDANCE WHERE DateRecorded >= ? AND DateRecorded < ?",
+            (term_id, start, end),
+        )
+        attendance = conn.execute(
+            "DELETE FROM ATTENDANCE WHERE DateRecorded >= ? AND DateRecorded < ?", (start, end)
+        ).rowcount
+        conn.execute(
+            f"INSERT INTO GRADES_ARCHIVE ({GRADE_COLUMNS}, TermID) SELECT {GRADE_COLUMNS}, ? "
+            "FROM GRADES WHERE DateEntered >= ? AND DateEntered < ?",
+            (term_id, start, end),
+        )
+        grades = conn.execute("DELETE FROM GRADES WHERE DateEntered >= ? AND DateEntered < ?", (start, end)).rowcount
+        conn.execute("UPDATE TERM SET IsArchived = 1, ArchivedAt = ? WHERE TermID = ?", (_now(), term_id))
+        return ["TermID", "AttendanceRows", "GradeRows"], [(term_id, attendance, grades)]
+
+    def sp_Admin_RestoreTerm(self, conn, role, term_id):
+        if role != "Admin":
+            raise ProcError("Access Denied: Admin only.")
+        archived = self._scalar(conn, "SELECT IsArchived FROM TERM WHERE TermID = ?", (term_id,))
+        if archived is None:
+            raise ProcError("Term not found.")
+        if not archived:
+            raise ProcError("Term is not archived.")
+        # copy back first: the rollup trigger skips rows still in the archive
+        attendance = conn.execute(
+            f"INSERT INTO ATTENDANCE ({ATTENDANCE_COLUMNS}) SELECT {ATTENDANCE_COLUMNS} "
+            "FROM ATTENDANCE_ARCHIVE WHERE TermID = ?",
+            (term_id,),
+        ).rowcount
+        conn.execute("DELETE FROM ATTENDANCE_ARCHIVE WHERE TermID = ?", (term_id,))
+        grades = conn.execute(
+            f"INSERT INTO GRADES ({GRADE_COLUMNS}) SELECT {GRADE_COLUMNS} FROM GRADES_ARCHIVE WHERE TermID = ?",
+            (term_id,),
+        ).rowcount
+        conn.execute("DELETE FROM GRADES_ARCHIVE WHERE TermID = ?", (term_id,))
+        conn.execute("UPDATE TERM SET IsArchived = 0, ArchivedAt = NULL WHERE TermID = ?", (term_id,))
+        return ["TermID", "AttendanceRows", "GradeRows"], [(term_id, attendance, grades)]
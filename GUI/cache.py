@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with a per-entry time-to-live.
+    - at most max_size entries (least recently used is evicted first)
+    - entries older than ttl seconds are treated as missing
+    Per process only: other workers keep their own copy until it expires.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value, or calls loader() and caches its result.
+        loader runs outside the lock (two threads may both load on a cold key).
+        """
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_if(self, predicate):
+        """Drop every entry where predicate(key, value) is true."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
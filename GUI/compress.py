@@ -0,0 +1,49 @@
+import gzip
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # per-request compression: 11 is far too slow for dynamic bodies
+
+
+def _accepted(header: str) -> dict:
+    """Accept-Encoding header -> {coding: q}"""
+    out = {}
+    for part in (header or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        coding, params = coding.strip(), params.strip()
+        if not coding:
+            continue
+        q = 1.0
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[coding] = q
+    return out
+
+
+def choose(accept_encoding: str):
+    """
+    Content-Encoding to use for a client, or None.
+    - br when the client takes it and brotli is installed, else gzip
+    - q=0 refuses a coding; "*" covers the ones not listed
+    """
+    accepted = _accepted(accept_encoding)
+    any_q = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", any_q) > 0:
+        return "br"
+    if accepted.get("gzip", any_q) > 0:
+        return "gzip"
+    return None
+
+
+def encode(data: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0: same input -> same bytes
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
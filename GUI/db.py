@@ -1,9 +1,90 @@
+import math
 import os
-import pyodbc
+import threading
+import time
+from collections import deque
+from concurrent.futures import ALL_COMPLETED, FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
 from dotenv import load_dotenv
 
+from metrics import registry as metrics
+
+try:
+    import pyodbc
+except ImportError as e:
+    # no unixODBC (libodbc.so.2) on this machine: app still imports (bench/ swaps call_sp for SQLite);
+    # the error comes back from get_conn the first time a real connection is needed
+    pyodbc = None
+    _PYODBC_IMPORT_ERROR = e
+
 load_dotenv()  # reads .env
 
+# =========================================================
+# Pool settings (override in .env)
+# =========================================================
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))      # seconds before an idle conn is closed
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "30"))  # seconds to wait for a free conn
+POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))            # ping conns idle longer than this
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "15"))               # login timeout for new conns (seconds)
+
+POOL_WARM_SIZE = int(os.getenv("DB_POOL_WARM_SIZE", "2"))                 # conns opened per worker at startup
+
+STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH_SIZE", "500"))         # rows per fetchmany in stream_sp
+
+FANOUT_WORKERS = int(os.getenv("DB_FANOUT_WORKERS", "8"))                 # threads for call_sp_many (per process)
+FANOUT_TIMEOUT = float(os.getenv("DB_FANOUT_TIMEOUT", "10"))              # per-request deadline for call_sp_many
+
+SESSION_KEY = (os.getenv("DB_SESSION_KEY", "no") or "no").lower() in ("yes", "true", "1")
+
+# Runs when a connection goes back to the pool so the next borrower
+# never sees a half-finished transaction or a key left open by an SP.
+_RESET_SQL = "CLOSE ALL SYMMETRIC KEYS;"
+
+# DB_SESSION_KEY=yes (needs Fix.sql #14): SRMS_SymKey is opened once per connection and
+# stays open for its lifetime; the key procs then skip their own OPEN/CLOSE.
+# The reset still closes anything else an SP left open, and re-opens SRMS_SymKey
+# only if something closed it (sp_Session_OpenKey is a no-op when it is open).
+# A discarded connection takes its open keys with it (they are session state).
+_OPEN_SESSION_KEY_SQL = "EXEC dbo.sp_Session_OpenKey;"
+_RESET_KEEP_KEY_SQL = (
+    "IF EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name <> N'SRMS_SymKey') CLOSE ALL SYMMETRIC KEYS; "
+    "EXEC dbo.sp_Session_OpenKey;"
+)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class FanoutTimeoutError(Exception):
+    """Raised when call_sp_many does not finish within its deadline."""
+
+
+class ResultSet:
+    """
+    One SP result as column names + plain tuples (what call_sp_rows returns).
+    Cheaper than list[dict] for big listings; dicts() gives the call_sp shape.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: list, rows: list):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def dicts(self) -> list:
+        columns = self.columns
+        return [dict(zip(columns, r)) for r in self.rows]
+
+
 def _build_conn_str() -> str:
     driver = os.getenv("ODBC_DRIVER", "ODBC Driver 17 for SQL Server")
     server = os.getenv("DB_SERVER", ".")
@@ -28,46 +109,488 @@ def _build_conn_str() -> str:
         f"UID={user};PWD={pwd};"
     )
 
-def get_conn():
+
+def get_conn(timeout: float = None):
     """
     Returns a pyodbc connection to SQL Server using env vars.
+    timeout caps the login timeout (DB_CONNECT_TIMEOUT) for callers with a smaller budget.
     """
+    if pyodbc is None:
+        raise ImportError(f"pyodbc is not usable here: {_PYODBC_IMPORT_ERROR}")
     conn_str = _build_conn_str()
+    login_timeout = CONNECT_TIMEOUT if timeout is None else min(CONNECT_TIMEOUT, max(1, math.ceil(timeout)))
     # autocommit False so we can commit where needed
-    return pyodbc.connect(conn_str, autocommit=False)
+    return pyodbc.connect(conn_str, autocommit=False, timeout=login_timeout)
 
-def call_sp(sp_name: str, params: tuple = ()):
+
+# =========================================================
+# Connection pool
+# =========================================================
+class ConnectionPool:
     """
-    Execute a stored procedure and return rows as list[dict].
-    If SP returns no result set, commit and return [].
+    Bounded, thread-safe pool of pyodbc connections.
+    - at most max_size connections are open (idle + borrowed)
+    - idle connections older than idle_timeout are closed
+    - connections idle longer than ping_after are pinged on checkout
+    - state is reset (rollback + close keys) when a connection is returned
+    - session_key: SRMS_SymKey stays open per connection (see _RESET_KEEP_KEY_SQL)
     """
-    with get_conn() as conn:
-        cur = conn.cursor()
 
-        if params:
-            placeholders = ",".join(["?"] * len(params))
-            sql = f"EXEC {sp_name} {placeholders}"
-            cur.execute(sql, params)
-        else:
-            sql = f"EXEC {sp_name}"
-            cur.execute(sql)
+    def __init__(self, connect, max_size: int = POOL_MAX_SIZE, idle_timeout: float = POOL_IDLE_TIMEOUT,
+                 checkout_timeout: float = POOL_CHECKOUT_TIMEOUT, ping_after: float = POOL_PING_AFTER,
+                 session_key: bool = SESSION_KEY):
+        self._connect = connect
+        self.session_key = session_key
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
 
-        # Try reading a result set
+        self._idle = deque()  # (conn, last_used) - newest on the right
+        self._size = 0        # open connections (idle + borrowed)
+        self._cond = threading.Condition(threading.Lock())
+
+    # ---------- internals ----------
+    def _close_quietly(self, conn):
         try:
-            if cur.description is None:
-                conn.commit()
-                return []
+            conn.close()
+        except Exception:
+            pass
+
+    def _prune_idle(self, now: float):
+        """Close idle connections past idle_timeout (oldest are on the left). Caller holds the lock."""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        return expired
+
+    def _is_healthy(self, conn, idle_for: float) -> bool:
+        if getattr(conn, "closed", False):
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            cur.close()
+            return True
+        except pyodbc.Error:
+            return False
 
-            columns = [c[0] for c in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, r)) for r in rows]
-        except pyodbc.ProgrammingError:
-            # no results
+    def _reset(self, conn) -> bool:
+        try:
+            conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+            cur = conn.cursor()
+            cur.execute(_RESET_KEEP_KEY_SQL if self.session_key else _RESET_SQL)
+            cur.close()
             conn.commit()
-            return []
-        finally:
-            # If SP made changes, commit
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _open(self, timeout: float):
+        conn = self._connect(timeout)
+        if self.session_key:
             try:
+                cur = conn.cursor()
+                cur.execute(_OPEN_SESSION_KEY_SQL)
+                cur.close()
                 conn.commit()
             except Exception:
-                pass
\ No newline at end of file
+                self._close_quietly(conn)
+                raise
+        return conn
+
+    def _discard(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    # ---------- public ----------
+    def acquire(self, timeout: float = None):
+        """
+        Borrow a connection. Reuses the most recently returned idle connection,
+        opens a new one while under max_size, otherwise waits up to checkout_timeout
+        (or timeout, if given).
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn, last_used, expired = None, None, []
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    expired.extend(self._prune_idle(now))
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No database connection available within {timeout:g}s "
+                            f"(pool size {self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+
+            for c in expired:
+                self._close_quietly(c)
+
+            if conn is None:
+                # new slot reserved above; connect outside the lock, within what is left of the deadline
+                try:
+                    return self._open(deadline - time.monotonic())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_healthy(conn, time.monotonic() - last_used):
+                return conn
+
+            # stale connection: drop it and try again
+            self._discard(conn)
+
+    def release(self, conn, broken: bool = False):
+        """Return a borrowed connection. Broken or un-resettable connections are closed."""
+        if broken or not self._reset(conn):
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        t0 = time.perf_counter()
+        conn = self.acquire(timeout)
+        metrics.observe_pool_wait(time.perf_counter() - t0)
+        broken = False
+        try:
+            yield conn
+        except (pyodbc.OperationalError, pyodbc.InterfaceError):
+            # link-level failures: never hand this connection out again
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def warm(self, count: int):
+        """Open up to count connections now (borrow them all, then return them)."""
+        borrowed = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                borrowed.append(self.acquire())
+        finally:
+            for conn in borrowed:
+                self.release(conn)
+        return len(borrowed)
+
+    def close_all(self):
+        """Close every idle connection (borrowed ones are closed when returned)."""
+        with self._cond:
+            idle = [c for c, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for c in idle:
+            self._close_quietly(c)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_abandoned = []  # pools inherited through fork(): kept referenced so GC never closes the parent's handles
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Process-wide pool, created on first use in each process.
+    A pool inherited from a parent process (fork) is never used or closed here:
+    its ODBC handles belong to the parent.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                if _pool is not None:
+                    _abandoned.append(_pool)
+                _pool = ConnectionPool(get_conn)
+                _pool_pid = pid
+    return _pool
+
+
+def _after_fork_in_child():
+    # the locks may have been held by another thread at fork time,
+    # and the parent's fan-out threads do not exist in the child
+    global _pool_lock, _executor, _executor_lock
+    _pool_lock = threading.Lock()
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def warm_pool(count: int = POOL_WARM_SIZE) -> int:
+    """
+    Open count connections for this process up front (call after fork, once per worker).
+    Failures are swallowed: the app still starts and /readyz reports the DB as down.
+    """
+    try:
+        return get_pool().warm(count)
+    except Exception:
+        return 0
+
+
+def ping(timeout: float = 5.0) -> float:
+    """
+    Round-trip SELECT 1 on a pooled connection; returns milliseconds.
+    Raises PoolTimeoutError / pyodbc.Error when the DB is unreachable.
+    """
+    t0 = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    with get_pool().connection(timeout=timeout) as conn:
+        # the query gets what is left of the budget too (pooled conn: restore the setting after)
+        previous = conn.timeout
+        conn.timeout = max(1, math.ceil(deadline - time.monotonic()))
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            cur.close()
+        finally:
+            conn.timeout = previous
+    return round((time.perf_counter() - t0) * 1000, 2)
+
+
+def _pool_gauges():
+    if _pool is None:
+        return {}
+    st = _pool.stats()
+    return {("open",): st["size"], ("idle",): st["idle"], ("max",): st["max_size"]}
+
+
+metrics.add_gauge("srms_db_pool_connections", "Pooled DB connections.", ("state",), _pool_gauges)
+
+
+def _exec_sp(cur, sp_name: str, params: tuple = ()):
+    if params:
+        placeholders = ",".join(["?"] * len(params))
+        sql = f"EXEC {sp_name} {placeholders}"
+        cur.execute(sql, params)
+    else:
+        sql = f"EXEC {sp_name}"
+        cur.execute(sql)
+
+
+def call_sp(sp_name: str, params: tuple = (), autocommit: bool = False):
+    """
+    Execute a stored procedure and return rows as list[dict].
+    If SP returns no result set, commit and return [].
+    Uses a pooled connection (see ConnectionPool).
+    Every call is timed into metrics (latency, rows, errors).
+    autocommit=True runs the SP outside any driver transaction (for SPs that
+    manage their own, e.g. index maintenance that cannot run inside one).
+    """
+    return call_sp_rows(sp_name, params, autocommit).dicts()
+
+
+def call_sp_rows(sp_name: str, params: tuple = (), autocommit: bool = False) -> ResultSet:
+    """
+    Same as call_sp, but returns a ResultSet (columns once + tuple rows).
+    No result set -> ResultSet([], []).
+    """
+    t0 = time.perf_counter()
+    result = None
+    try:
+        result = _call_sp(sp_name, params, autocommit)
+        return result
+    finally:
+        metrics.observe_sp(sp_name, time.perf_counter() - t0, len(result) if result else 0, result is None)
+
+
+def _call_sp(sp_name: str, params: tuple = (), autocommit: bool = False) -> ResultSet:
+    with get_pool().connection() as conn:
+        if not autocommit:
+            return _read_first(conn, sp_name, params)
+
+        # pooled conns run with autocommit off; put it back before the conn is released
+        conn.autocommit = True
+        try:
+            return _read_first(conn, sp_name, params)
+        finally:
+            try:
+                conn.autocommit = False
+            except pyodbc.Error:
+                pass  # release() resets it again, or discards the conn
+
+
+def _read_first(conn, sp_name: str, params: tuple) -> ResultSet:
+    cur = conn.cursor()
+    _exec_sp(cur, sp_name, params)
+
+    # Try reading a result set
+    try:
+        if cur.description is None:
+            conn.commit()
+            return ResultSet([], [])
+
+        columns = [c[0] for c in cur.description]
+        rows = cur.fetchall()
+        return ResultSet(columns, [tuple(r) for r in rows])
+    except pyodbc.ProgrammingError:
+        # no results
+        conn.commit()
+        return ResultSet([], [])
+    finally:
+        # If SP made changes, commit
+        try:
+            conn.commit()
+        except Exception:
+            pass
+
+
+def call_sp_multi(sp_name: str, params: tuple = (), names: tuple = ()) -> dict:
+    """
+    For procedures that return several result sets (walks cursor.nextset()).
+    names label the sets in order -> {name: list[dict]}; a set the SP did not
+    return comes back as [], extra sets are ignored.
+    One connection, one round trip; timed into metrics like call_sp.
+    """
+    t0 = time.perf_counter()
+    result = None
+    try:
+        result = _call_sp_multi(sp_name, params, names)
+        return result
+    finally:
+        rows = sum(len(v) for v in result.values()) if result else 0
+        metrics.observe_sp(sp_name, time.perf_counter() - t0, rows, result is None)
+
+
+def _call_sp_multi(sp_name: str, params: tuple, names: tuple) -> dict:
+    with get_pool().connection() as conn:
+        cur = conn.cursor()
+        _exec_sp(cur, sp_name, params)
+
+        sets = []
+        while len(sets) < len(names):
+            if cur.description is not None:  # skip row-count-only results
+                columns = [c[0] for c in cur.description]
+                sets.append([dict(zip(columns, r)) for r in cur.fetchall()])
+            # a RAISERROR after the first set surfaces here
+            if not cur.nextset():
+                break
+        cur.close()
+        conn.commit()
+
+    sets.extend([] for _ in range(len(names) - len(sets)))
+    return dict(zip(names, sets))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="sp-fanout")
+    return _executor
+
+
+def call_sp_many(calls: dict, timeout: float = FANOUT_TIMEOUT, call=None, return_exceptions: bool = False) -> dict:
+    """
+    Run independent stored procedures at the same time, one pooled connection each.
+    calls = {key: (sp_name, params)}  ->  {key: rows}  (rows as returned by call_sp)
+    - the whole batch shares one deadline (timeout seconds) -> FanoutTimeoutError
+    - if any call raises, that error is raised (first one in calls order),
+      or with return_exceptions=True it is returned in place of that key's rows
+    Only for reads / calls that don't depend on each other: there is no shared transaction.
+    """
+    call = call or call_sp
+    if len(calls) <= 1 and not return_exceptions:
+        return {key: call(sp_name, params) for key, (sp_name, params) in calls.items()}
+    if not calls:
+        return {}
+
+    executor = _get_executor()
+    futures = {key: executor.submit(call, sp_name, params) for key, (sp_name, params) in calls.items()}
+    done, pending = wait(
+        futures.values(), timeout=timeout, return_when=ALL_COMPLETED if return_exceptions else FIRST_EXCEPTION)
+
+    if not return_exceptions:
+        for key, f in futures.items():
+            if f in done and f.exception() is not None:
+                for p in pending:
+                    p.cancel()
+                raise f.exception()
+
+    if pending:
+        for p in pending:
+            p.cancel()  # not started yet: never runs; running ones finish and release their connection
+        late = [key for key, f in futures.items() if f in pending]
+        raise FanoutTimeoutError(f"Database calls did not finish within {timeout:g}s: {', '.join(map(str, late))}.")
+
+    if return_exceptions:
+        return {key: f.exception() or f.result() for key, f in futures.items()}
+    return {key: f.result() for key, f in futures.items()}
+
+
+def stream_sp(sp_name: str, params: tuple = (), batch_size: int = STREAM_BATCH_SIZE):
+    """
+    Generator version of call_sp for big read-only result sets.
+    - first item is the column list, then one tuple per row
+    - rows are pulled with fetchmany(batch_size), so memory stays flat
+    - the pooled connection is held until the generator is exhausted or closed
+    Call next() once before handing it to a Response so SP errors
+    (RAISERROR) surface before any bytes are sent.
+    """
+    t0 = time.perf_counter()
+    count, failed = 0, True
+    try:
+        with get_pool().connection() as conn:
+            cur = conn.cursor()
+            try:
+                _exec_sp(cur, sp_name, params)
+
+                if cur.description is None:
+                    failed = False
+                    yield []
+                    return
+
+                yield [c[0] for c in cur.description]
+                while True:
+                    batch = cur.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    count += len(batch)
+                    for r in batch:
+                        yield tuple(r)
+                failed = False
+            finally:
+                # drops unread rows if the client went away mid-stream
+                cur.close()
+    except GeneratorExit:
+        failed = False  # closed early by the consumer, not an SP error
+        raise
+    finally:
+        metrics.observe_sp(sp_name, time.perf_counter() - t0, count, failed)
@@ -0,0 +1,195 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import socket
+import threading
+
+import fastjson
+
+
+class Subscription:
+    """
+    Queue of payloads published on one topic after subscribe().
+    If the reader falls more than max_pending behind, the backlog is dropped
+    and overflowed is set: the reader should reload from the DB.
+    """
+
+    def __init__(self, hub, topic, max_pending: int):
+        self._hub, self.topic = hub, topic
+        self._queue = queue.Queue(max_pending)
+        self.overflowed = False
+
+    def _put(self, payload):
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> list:
+        """Waits up to timeout for the next payload, then drains what else is queued."""
+        try:
+            items = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def close(self):
+        self._hub._unsubscribe(self)
+
+
+class Notifier:
+    """
+    Change signals keyed by topic string (e.g. "attendance:12", "role_requests").
+    - publish(topic, payload) bumps the topic's version, wakes wait()ers,
+      queues payload for subscribers and runs listen() callbacks
+    - with a broker, the same publish is delivered to the other worker processes
+    Without one, only this process hears it: listeners that must see writes from
+    other workers also re-check the DB on a timer.
+    """
+
+    def __init__(self, broker=None):
+        self.broker = broker
+        self._versions = {}  # topic -> int
+        self._subs = {}      # topic -> set(Subscription)
+        self._listeners = {}  # topic -> [callback(payload)]
+        self._cond = threading.Condition()
+
+    def version(self, topic) -> int:
+        with self._cond:
+            return self._versions.get(topic, 0)
+
+    def publish(self, topic, payload=None):
+        self._start_broker()
+        self._deliver(topic, payload)
+        if self.broker is not None:
+            self.broker.send(topic, payload)
+
+    def wait(self, topic, seen: int, timeout: float) -> int:
+        """Returns the topic's current version (== seen if it timed out)."""
+        self._start_broker()
+        with self._cond:
+            self._cond.wait_for(lambda: self._versions.get(topic, 0) != seen, timeout)
+            return self._versions.get(topic, 0)
+
+    def subscribe(self, topic, max_pending: int = 256) -> Subscription:
+        self._start_broker()
+        sub = Subscription(self, topic, max_pending)
+        with self._cond:
+            self._subs.setdefault(topic, set()).add(sub)
+        return sub
+
+    def listen(self, topic, callback):
+        """callback(payload) runs on every publish, local or from another process."""
+        self._start_broker()
+        with self._cond:
+            self._listeners.setdefault(topic, []).append(callback)
+
+    def _unsubscribe(self, sub):
+        with self._cond:
+            self._subs.get(sub.topic, set()).discard(sub)
+
+    def _start_broker(self):
+        if self.broker is not None:
+            self.broker.start(self._deliver)
+
+    def _deliver(self, topic, payload):
+        with self._cond:
+            self._versions[topic] = self._versions.get(topic, 0) + 1
+            self._cond.notify_all()
+            subs = list(self._subs.get(topic, ()))
+            listeners = list(self._listeners.get(topic, ()))
+        for sub in subs:
+            sub._put(payload)
+        for callback in listeners:
+            try:
+                callback(payload)
+            except Exception:
+                pass
+
+
+class SocketBroker:
+    """
+    Local stand-in for a pub/sub broker (Redis channels etc.) between the worker
+    processes of one host. Every process binds a Unix datagram socket in
+    directory and send() writes the message to all the others; sockets
+    left behind by dead processes are removed on the first failed send.
+    Delivery is best effort (a full receive buffer drops the datagram).
+    """
+
+    MAX_MESSAGE = 60000
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._pid = None
+        self._sock = None
+        self._path = None
+        self._lock = threading.Lock()
+
+    def start(self, deliver):
+        """Binds this process's socket + reader thread (again after a fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{os.getpid()}.sock")
+            if os.path.exists(path):
+                os.remove(path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path)
+            self._sock, self._path, self._pid = sock, path, os.getpid()
+            atexit.register(self._unlink, path)
+            threading.Thread(target=self._read, args=(sock, deliver), name="srms-events", daemon=True).start()
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _read(self, sock, deliver):
+        while True:
+            try:
+                data = sock.recv(self.MAX_MESSAGE)
+                msg = json.loads(data)
+                deliver(msg["topic"], msg.get("payload"))
+            except OSError:
+                return
+            except Exception:
+                continue
+
+    def send(self, topic, payload):
+        data = fastjson.dumps({"topic": topic, "payload": payload})
+        if len(data) > self.MAX_MESSAGE:
+            data = fastjson.dumps({"topic": topic, "payload": None})  # peers still get the wake-up
+
+        out = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        out.setblocking(False)
+        try:
+            for path in glob.glob(os.path.join(self.directory, "*.sock")):
+                if path == self._path:
+                    continue
+                try:
+                    out.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    self._unlink(path)  # its process is gone
+                except OSError:
+                    pass  # receiver is backed up: drop this one
+        finally:
+            out.close()
+
+
+def broker_from_env():
+    """SocketBroker when EVENTS_DIR is set and the OS has Unix sockets, else None (this process only)."""
+    directory = os.getenv("EVENTS_DIR")
+    if not directory or not hasattr(socket, "AF_UNIX"):
+        return None
+    return SocketBroker(directory)
@@ -0,0 +1,34 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+try:
+    import orjson  # optional: pip install orjson
+except ImportError:
+    orjson = None
+
+
+def _default(o):
+    # Decimal as a string, same as Flask's jsonify (no float rounding of grades)
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (bytes, bytearray)):
+        return o.hex()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+_stdlib = json.JSONEncoder(default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps(obj) -> bytes:
+    """
+    Compact JSON as UTF-8 bytes for the big listing responses (?format=columnar).
+    - orjson when installed (C encoder, datetime handled natively), else the stdlib C encoder
+    - both give the same output: Decimal -> "85.50", date/datetime -> ISO 8601
+    - tuples encode as arrays, so ResultSet rows go out without building dicts
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return _stdlib.encode(obj).encode()
@@ -0,0 +1,61 @@
+"""
+gunicorn settings for SRMS (Linux app servers).
+
+    cd GUI
+    gunicorn -c gunicorn.conf.py
+
+Every knob can be overridden from the environment (values below are defaults).
+Keep DB_POOL_MAX_SIZE >= GUNICORN_THREADS so no thread waits for a connection.
+Live attendance streams hold a thread each: keep GUNICORN_THREADS > LIVE_MAX_STREAMS.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# processes for CPU (one per core), threads to overlap DB round trips
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# recycle workers now and then (bounded memory growth in long runs)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = 500
+
+# never import the app (and so never open ODBC handles) in the master
+preload_app = False
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+# live-stream events between workers (events.SocketBroker): one socket directory per master
+_own_events_dir = "EVENTS_DIR" not in os.environ
+if _own_events_dir:
+    os.environ["EVENTS_DIR"] = tempfile.mkdtemp(prefix="srms-events-")
+
+# /metrics totals across workers (metrics.SharedDir): one snapshot directory per master
+_own_metrics_dir = "METRICS_DIR" not in os.environ
+if _own_metrics_dir:
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="srms-metrics-")
+
+
+def post_worker_init(worker):
+    # the worker's app is loaded: open its first DB connections before traffic arrives
+    import db
+
+    opened = db.warm_pool()
+    worker.log.info("SRMS worker %s: %s DB connection(s) warmed", worker.pid, opened)
+
+
+def on_exit(server):
+    if _own_events_dir:
+        shutil.rmtree(os.environ["EVENTS_DIR"], ignore_errors=True)
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
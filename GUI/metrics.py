@@ -0,0 +1,285 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+# Upper bounds in seconds (Prometheus "le" buckets; +Inf is implicit)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name, self.help, self.label_names = name, help_text, label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(into: dict, values: dict):
+        for labels, v in values.items():
+            into[labels] = into.get(labels, 0) + v
+
+    def render(self, values: dict = None):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, v in sorted((self.snapshot() if values is None else values).items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(v)}"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is one bisect + a few adds under a lock,
+    cheap enough to leave on for every request / SP call.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help_text, label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    @staticmethod
+    def merge(into: dict, series: dict):
+        for labels, s in series.items():
+            have = into.get(labels)
+            into[labels] = list(s) if have is None else [a + b for a, b in zip(have, s)]
+
+    def render(self, series: dict = None):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, s in sorted((self.snapshot() if series is None else series).items()):
+            running = 0
+            for bound, n in zip(self.buckets, s):
+                running += n
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {running}"
+            running += s[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {running}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_num(s[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {running}"
+
+
+class Gauge:
+    """Read at scrape time from a callback returning {labels: value}."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, read):
+        self.name, self.help, self.label_names, self._read = name, help_text, label_names, read
+
+    def snapshot(self) -> dict:
+        try:
+            return dict(self._read() or {})
+        except Exception:
+            return {}
+
+    merge = staticmethod(Counter.merge)
+
+    def render(self, values: dict = None):
+        values = self.snapshot() if values is None else values
+        if not values:
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, v in sorted(values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(v)}"
+
+
+class SharedDir:
+    """
+    Totals across the worker processes of one host (METRICS_DIR, set by gunicorn.conf.py).
+    Every process writes its snapshot to <pid>.json every FLUSH_SECONDS (and at exit);
+    the worker answering /metrics writes its own and sums all the files.
+    Counters/histograms of exited workers are folded into dead.json so totals never go
+    backwards when gunicorn recycles a worker; gauges only count live workers.
+    """
+
+    FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self, registry):
+        """Flusher thread for this process (again after a fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._pid = os.getpid()
+            atexit.register(self.write, registry)
+            threading.Thread(target=self._flush, args=(registry,), name="srms-metrics", daemon=True).start()
+
+    def _flush(self, registry):
+        while True:
+            time.sleep(self.FLUSH_SECONDS)
+            try:
+                self.write(registry)
+            except Exception:
+                pass
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _dump(self, name: str, snap: dict):
+        # per thread: a /metrics scrape can race the flusher (or another scrape under gthread)
+        tmp = self._path(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({m: [[list(k), v] for k, v in values.items()] for m, values in snap.items()}, f)
+        os.replace(tmp, self._path(name))
+
+    def _load(self, name: str) -> dict:
+        try:
+            with open(self._path(name)) as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {m: {tuple(k): v for k, v in values} for m, values in raw.items()}
+
+    def write(self, registry):
+        self._dump(f"{os.getpid()}.json", registry.snapshot())
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def collect(self, registry) -> dict:
+        """Summed snapshot of every worker (the caller's included)."""
+        import fcntl  # METRICS_DIR is only set under gunicorn (POSIX)
+
+        self.write(registry)
+        with open(self._path(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = self._load("dead.json")
+            total = {m: dict(v) for m, v in dead.items()}
+            folded = False
+            for path in glob.glob(self._path("*.json")):
+                name = os.path.basename(path)
+                if not name[:-5].isdigit():
+                    continue
+                snap = self._load(name)
+                live = self._alive(int(name[:-5]))
+                registry.merge(total, snap, gauges=live)
+                if not live:
+                    registry.merge(dead, snap, gauges=False)
+                    os.remove(path)
+                    folded = True
+            if folded:
+                self._dump("dead.json", dead)
+        return total
+
+
+class Registry:
+    """
+    Process-local metrics; with METRICS_DIR set, render() sums every worker (SharedDir).
+    render() returns the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.sp_duration = Histogram(
+            "srms_sp_duration_seconds", "Stored procedure wall time (execute + fetch).", ("procedure",))
+        self.sp_rows = Counter("srms_sp_rows_total", "Rows returned by stored procedures.", ("procedure",))
+        self.sp_errors = Counter("srms_sp_errors_total", "Stored procedure calls that raised.", ("procedure",))
+        self.pool_wait = Histogram(
+            "srms_db_pool_wait_seconds", "Time spent waiting to borrow a pooled connection.")
+        self.http_duration = Histogram(
+            "srms_http_request_duration_seconds", "Flask handler time per route (streamed bodies excluded).",
+            ("method", "route"))
+        self.http_requests = Counter(
+            "srms_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+        self._gauges = []
+        directory = os.getenv("METRICS_DIR")
+        self.shared = SharedDir(directory) if directory else None
+
+    def _metrics(self):
+        return (self.sp_duration, self.sp_rows, self.sp_errors, self.pool_wait,
+                self.http_duration, self.http_requests, *self._gauges)
+
+    def snapshot(self) -> dict:
+        """{metric name: {labels: value or histogram series}} for this process."""
+        if self.shared is not None:
+            self.shared.start(self)
+        return {m.name: m.snapshot() for m in self._metrics()}
+
+    def merge(self, into: dict, snap: dict, gauges: bool = True):
+        for m in self._metrics():
+            if snap.get(m.name) and (gauges or not isinstance(m, Gauge)):
+                m.merge(into.setdefault(m.name, {}), snap[m.name])
+
+    def add_gauge(self, name: str, help_text: str, label_names: tuple, read):
+        self._gauges.append(Gauge(name, help_text, label_names, read))
+
+    def observe_sp(self, sp_name: str, seconds: float, rows: int = 0, error: bool = False):
+        if self.shared is not None:
+            self.shared.start(self)
+        key = (sp_name,)
+        self.sp_duration.observe(key, seconds)
+        if rows:
+            self.sp_rows.inc(key, rows)
+        if error:
+            self.sp_errors.inc(key)
+
+    def observe_pool_wait(self, seconds: float):
+        self.pool_wait.observe((), seconds)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        if self.shared is not None:
+            self.shared.start(self)
+        self.http_duration.observe((method, route), seconds)
+        self.http_requests.inc((method, route, str(status)))
+
+    def render(self) -> str:
+        total = self.shared.collect(self) if self.shared is not None else None
+        lines = []
+        for m in self._metrics():
+            lines.extend(m.render(None if total is None else total.get(m.name, {})))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -19,11 +19,50 @@ function showSec(name, btn) {
   if (name === "profile") loadMe();
   if (name === "grades") loadGrades();
   if (name === "attendance") loadAttendance();
-  if (name === "users") { loadUsers(); loadRequests(); }
+  if (name === "users") { loadUsers(); if (!liveRequests) loadRequests(); }
   if (name === "public") loadPublicCourses();
 }
 
-/* Search filter for any table */
+/* Keyset paging: next_cursor per table ("Load more" buttons) */
+const nextCursor = { users: null, grades: null, attendance: null };
+
+function setMoreBtn(name) {
+  const btn = document.getElementById(`${name}More`);
+  if (btn) btn.classList.toggle("hidden", !nextCursor[name]);
+}
+
+function countLabel(tableId, name) {
+  const n = document.querySelectorAll(`#${tableId} tbody tr`).length;
+  return nextCursor[name] ? `${n}+` : `${n}`;
+}
+
+/* ?format=columnar listings: {columns, rows} -> [{col: value}, ...] */
+function rowsOf(data) {
+  const cols = data.columns || [];
+  return (data.rows || []).map(r => Object.fromEntries(cols.map((c, i) => [c, r[i]])));
+}
+
+/* Server-side filters: {arg: inputId} -> {arg: value} for the fields that are set */
+function filterArgs(fields) {
+  const args = {};
+  Object.entries(fields).forEach(([arg, id]) => {
+    const v = document.getElementById(id).value.trim();
+    if (v) args[arg] = v;
+  });
+  return args;
+}
+
+const gradeFilter = () => filterArgs({
+  student_id: "gradesFilterStudent", course_id: "gradesFilterCourse", published: "gradesFilterPublished",
+  date_from: "gradesFilterFrom", date_to: "gradesFilterTo",
+});
+const attendanceFilter = () => filterArgs({
+  student_id: "attFilterStudent", course_id: "attFilterCourse", status: "attFilterStatus",
+  date_from: "attFilterFrom", date_to: "attFilterTo",
+});
+const userFilter = () => filterArgs({ role: "usersFilterRole", clearance: "usersFilterClearance" });
+
+/* Search filter for small tables loaded in full (public catalog) */
 function filterTable(tableId, q) {
   q = (q || "").toLowerCase();
   const rows = document.querySelectorAll(`#${tableId} tbody tr`);
@@ -95,7 +134,10 @@ async function loadMe() {
     setMsg(data.error || "Failed to load profile", false);
     return;
   }
+  renderMe(data);
+}
 
+function renderMe(data) {
   const p = data.profile || {};
   const d = p.data || {};
 
@@ -135,19 +177,26 @@ async function saveMyProfile() {
 /* =========================
    Manage Users (list)
 ========================= */
-async function loadUsers() {
-  const res = await fetch("/api/admin/users", { credentials: "include" });
-  const data = await res.json();
+async function loadUsers(more = false) {
+  const qs = new URLSearchParams(userFilter());
+  if (more && nextCursor.users) qs.set("cursor", nextCursor.users);
 
-  const tbody = document.querySelector("#usersTable tbody");
-  tbody.innerHTML = "";
+  const res = await fetch(`/api/admin/users?${qs.toString()}`, { credentials: "include" });
+  const data = await res.json();
 
   if (!res.ok) {
+    if (!more) document.querySelector("#usersTable tbody").innerHTML = "";
     setMsg(data.error || "Failed to load users", false);
     return;
   }
+  renderUsers(data.users, data.next_cursor, more);
+}
 
-  (data.users || []).forEach(u => {
+function renderUsers(users, cursor, more = false) {
+  const tbody = document.querySelector("#usersTable tbody");
+  if (!more) tbody.innerHTML = "";
+
+  (users || []).forEach(u => {
     const tr = document.createElement("tr");
     tr.innerHTML = `
       <td>${u.UserID}</td>
@@ -159,7 +208,9 @@ async function loadUsers() {
     tbody.appendChild(tr);
   });
 
-  document.getElementById("statUsers").textContent = (data.users || []).length;
+  nextCursor.users = cursor || null;
+  setMoreBtn("users");
+  document.getElementById("statUsers").textContent = countLabel("usersTable", "users");
 }
 
 /* =========================
@@ -169,33 +220,69 @@ async function loadRequests() {
   const res = await fetch("/api/admin/role-requests", { credentials: "include" });
   const data = await res.json();
 
-  const tbody = document.querySelector("#requestsTable tbody");
-  tbody.innerHTML = "";
-
   if (!res.ok) {
+    document.querySelector("#requestsTable tbody").innerHTML = "";
     setMsg(data.error || "Failed to load role requests", false);
     return;
   }
+  renderRequests(data.requests);
+}
 
-  (data.requests || []).forEach(r => {
-    const tr = document.createElement("tr");
-    tr.innerHTML = `
-      <td>${r.RequestID}</td>
-      <td>${r.UserID}</td>
-      <td>${r.CurrentRole}</td>
-      <td>${r.RequestedRole}</td>
-      <td>${r.Reason}</td>
-      <td>${r.RequestDate || "-"}</td>
-      <td><span class="badge badge--pending">${r.Status}</span></td>
-      <td>
-        <button class="miniBtn" onclick="approveReq(${r.RequestID})">Approve</button>
-        <button class="miniBtn danger" onclick="denyReq(${r.RequestID})">Deny</button>
-      </td>
-    `;
-    tbody.appendChild(tr);
-  });
+function renderRequests(requests) {
+  const tbody = document.querySelector("#requestsTable tbody");
+  tbody.innerHTML = "";
+  (requests || []).forEach(r => tbody.appendChild(requestRow(r)));
+  countRequests();
+}
+
+function requestRow(r) {
+  const tr = document.createElement("tr");
+  tr.dataset.requestId = r.RequestID;
+  tr.innerHTML = `
+    <td>${r.RequestID}</td>
+    <td>${r.UserID}</td>
+    <td>${r.CurrentRole}</td>
+    <td>${r.RequestedRole}</td>
+    <td>${r.Reason}</td>
+    <td>${r.RequestDate || "-"}</td>
+    <td><span class="badge badge--pending">${r.Status}</span></td>
+    <td>
+      <button class="miniBtn" onclick="approveReq(${r.RequestID})">Approve</button>
+      <button class="miniBtn danger" onclick="denyReq(${r.RequestID})">Deny</button>
+    </td>
+  `;
+  return tr;
+}
 
-  document.getElementById("statReq").textContent = (data.requests || []).length;
+function countRequests() {
+  document.getElementById("statReq").textContent =
+    document.querySelectorAll("#requestsTable tbody tr").length;
+}
+
+function removeRequest(id) {
+  document.querySelector(`#requestsTable tr[data-request-id="${id}"]`)?.remove();
+  countRequests();
+}
+
+/* Live queue: a snapshot first, then one event per submit/approve/deny */
+let liveRequests = null;
+
+function applyRequestEvent(ev) {
+  if (ev.type === "submitted") {
+    const r = ev.request || {};
+    if (document.querySelector(`#requestsTable tr[data-request-id="${r.RequestID}"]`)) return;
+    document.querySelector("#requestsTable tbody").prepend(requestRow(r));
+    countRequests();
+  } else {
+    removeRequest(ev.RequestID);
+  }
+}
+
+function watchRequests() {
+  if (!window.EventSource) return;
+  liveRequests = new EventSource("/api/admin/role-requests/stream");
+  liveRequests.addEventListener("snapshot", e => renderRequests(JSON.parse(e.data).requests));
+  liveRequests.addEventListener("role_request", e => applyRequestEvent(JSON.parse(e.data)));
 }
 
 async function approveReq(id) {
@@ -212,7 +299,7 @@ async function approveReq(id) {
   }
   setMsg("Request approved.", true);
   loadUsers();
-  loadRequests();
+  removeRequest(id);
 }
 
 async function denyReq(id) {
@@ -228,26 +315,32 @@ async function denyReq(id) {
     return;
   }
   setMsg("Request denied.", true);
-  loadRequests();
+  removeRequest(id);
 }
 
 /* =========================
    Grades (view/edit)
 ========================= */
-async function loadGrades() {
-  const res = await fetch("/api/admin/grades", { credentials: "include" });
-  const data = await res.json();
+async function loadGrades(more = false) {
+  const qs = new URLSearchParams({ format: "columnar", ...gradeFilter() });
+  if (more && nextCursor.grades) qs.set("cursor", nextCursor.grades);
 
-  const tbody = document.querySelector("#gradesTable tbody");
-  tbody.innerHTML = "";
+  const res = await fetch(`/api/admin/grades?${qs.toString()}`, { credentials: "include" });
+  const data = await res.json();
 
   if (!res.ok) {
+    if (!more) document.querySelector("#gradesTable tbody").innerHTML = "";
     setMsg(data.error || "Failed to load grades", false);
     return;
   }
+  renderGrades(rowsOf(data), data.next_cursor, more);
+}
+
+function renderGrades(grades, cursor, more = false) {
+  const tbody = document.querySelector("#gradesTable tbody");
+  if (!more) tbody.innerHTML = "";
 
-  const grades = data.grades || [];
-  grades.forEach(g => {
+  (grades || []).forEach(g => {
     const tr = document.createElement("tr");
     tr.innerHTML = `
       <td>${g.GradeID}</td>
@@ -261,7 +354,9 @@ async function loadGrades() {
     tbody.appendChild(tr);
   });
 
-  document.getElementById("statGrades").textContent = grades.length;
+  nextCursor.grades = cursor || null;
+  setMoreBtn("grades");
+  document.getElementById("statGrades").textContent = countLabel("gradesTable", "grades");
 }
 
 async function insertGrade() {
@@ -320,26 +415,26 @@ async function publishGrade() {
 /* =========================
    Attendance (view/edit)
 ========================= */
-async function loadAttendance() {
-  const sid = document.getElementById("attFilterStudent").value.trim();
-  const cid = document.getElementById("attFilterCourse").value.trim();
-
-  const qs = new URLSearchParams();
-  if (sid) qs.set("student_id", sid);
-  if (cid) qs.set("course_id", cid);
+async function loadAttendance(more = false) {
+  const qs = new URLSearchParams({ format: "columnar", ...attendanceFilter() });
+  if (more && nextCursor.attendance) qs.set("cursor", nextCursor.attendance);
 
   const res = await fetch(`/api/admin/attendance?${qs.toString()}`, { credentials: "include" });
   const data = await res.json();
 
-  const tbody = document.querySelector("#attTable tbody");
-  tbody.innerHTML = "";
-
   if (!res.ok) {
+    if (!more) document.querySelector("#attTable tbody").innerHTML = "";
     setMsg(data.error || "Failed to load attendance", false);
     return;
   }
+  renderAttendance(rowsOf(data), data.next_cursor, more);
+}
 
-  (data.attendance || []).forEach(a => {
+function renderAttendance(attendance, cursor, more = false) {
+  const tbody = document.querySelector("#attTable tbody");
+  if (!more) tbody.innerHTML = "";
+
+  (attendance || []).forEach(a => {
     const tr = document.createElement("tr");
     tr.innerHTML = `
       <td>${a.AttendanceID}</td>
@@ -351,6 +446,9 @@ async function loadAttendance() {
     `;
     tbody.appendChild(tr);
   });
+
+  nextCursor.attendance = cursor || null;
+  setMoreBtn("attendance");
 }
 
 async function recordAttendance() {
@@ -387,15 +485,19 @@ async function loadPublicCourses() {
   const res = await fetch("/api/courses/public", { credentials: "include" });
   const data = await res.json();
 
-  const tbody = document.querySelector("#publicTable tbody");
-  tbody.innerHTML = "";
-
   if (!res.ok) {
+    document.querySelector("#publicTable tbody").innerHTML = "";
     setMsg(data.error || "Failed to load public courses", false);
     return;
   }
+  renderPublicCourses(data.courses);
+}
+
+function renderPublicCourses(courses) {
+  const tbody = document.querySelector("#publicTable tbody");
+  tbody.innerHTML = "";
 
-  (data.courses || []).forEach(c => {
+  (courses || []).forEach(c => {
     const tr = document.createElement("tr");
     tr.innerHTML = `
       <td>${c.CourseID}</td>
@@ -407,12 +509,45 @@ async function loadPublicCourses() {
 }
 
 /* =========================
-   Refresh all
+   Dashboard: every panel in one /api/batch request
 ========================= */
 async function refreshAll() {
   setMsg("Refreshing...", true);
-  await Promise.allSettled([loadMe(), loadUsers(), loadRequests(), loadGrades(), loadAttendance(), loadPublicCourses()]);
-  setMsg("Updated.", true);
+
+  const res = await fetch("/api/batch", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      ops: [
+        { op: "me" },
+        { op: "users", args: userFilter() },
+        { op: "role_requests" },
+        { op: "grades", args: gradeFilter() },
+        { op: "attendance", args: attendanceFilter() },
+        { op: "public_courses" },
+      ],
+    }),
+    credentials: "include",
+  });
+  const data = await res.json().catch(() => ({}));
+
+  if (!res.ok) {
+    setMsg(data.error || "Failed to load dashboard", false);
+    return;
+  }
+
+  const r = data.results || {};
+  const failed = Object.values(r).find(x => x.error);
+
+  if (!r.me?.error) renderMe(r.me);
+  if (!r.users?.error) renderUsers(r.users.users, r.users.next_cursor);
+  if (!r.role_requests?.error) renderRequests(r.role_requests.requests);
+  if (!r.grades?.error) renderGrades(r.grades.grades, r.grades.next_cursor);
+  if (!r.attendance?.error) renderAttendance(r.attendance.attendance, r.attendance.next_cursor);
+  if (!r.public_courses?.error) renderPublicCourses(r.public_courses.courses);
+
+  if (failed) setMsg(failed.error, false);
+  else setMsg("Updated.", true);
 }
 
 /* =========================
@@ -421,4 +556,5 @@ async function refreshAll() {
 document.addEventListener("DOMContentLoaded", async () => {
   applySecretGuards();
   await refreshAll();
+  watchRequests();
 });
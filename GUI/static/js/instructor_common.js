@@ -2,3 +2,9 @@ document.getElementById("logoutBtn")?.addEventListener("click", async () => {
   await fetch("/api/logout", { method: "POST", credentials: "include" });
   location.href = "/login";
 });
+
+/* ?format=columnar listings: {columns, rows} -> [{col: value}, ...] */
+function rowsOf(data){
+  const cols = data.columns || [];
+  return (data.rows || []).map(r => Object.fromEntries(cols.map((c, i) => [c, r[i]])));
+}
@@ -1,19 +1,37 @@
 const gradesBody = document.getElementById("gradesBody");
 const insertMsg = document.getElementById("insertMsg");
 const pubMsg = document.getElementById("pubMsg");
+const loadMsg = document.getElementById("loadMsg");
+const moreBtn = document.getElementById("moreBtn");
+let nextCursor = null;
 
 function setMsg(el, text, ok=false){
   el.textContent = text || "";
   el.className = "msg " + (ok ? "ok" : "err");
 }
 
-async function loadGrades(){
-  const res = await fetch("/api/instructor/grades", { credentials: "include" });
+/* filters are applied by sp_ViewGrades, only the matching rows come back */
+function readFilter(params){
+  const fields = { student_id: "filterStudentId", course_id: "filterCourseId", published: "filterPublished",
+                   date_from: "filterFrom", date_to: "filterTo" };
+  for (const [name, id] of Object.entries(fields)){
+    const v = document.getElementById(id).value.trim();
+    if (v) params.set(name, v);
+  }
+  return params;
+}
+
+async function loadGrades(more = false){
+  loadMsg.textContent = "";
+  const params = readFilter(new URLSearchParams({ format: "columnar" }));
+  if (more && nextCursor) params.set("cursor", nextCursor);
+
+  const res = await fetch(`/api/instructor/grades?${params.toString()}`, { credentials: "include" });
   const data = await res.json().catch(() => ({}));
-  if (!res.ok) return;
+  if (!res.ok) return setMsg(loadMsg, data.error || "Failed to load grades.");
 
-  const items = data.grades || [];
-  gradesBody.innerHTML = items.map(g => `
+  const items = rowsOf(data);
+  const html = items.map(g => `
     <tr>
       <td>${g.GradeID}</td>
       <td>${g.StudentID}</td>
@@ -24,8 +42,17 @@ async function loadGrades(){
       <td>${g.PublishedDate ?? ""}</td>
     </tr>
   `).join("");
+
+  if (more) gradesBody.insertAdjacentHTML("beforeend", html);
+  else gradesBody.innerHTML = html;
+
+  nextCursor = data.next_cursor || null;
+  if (moreBtn) moreBtn.style.display = nextCursor ? "" : "none";
 }
 
+moreBtn?.addEventListener("click", () => loadGrades(true));
+document.getElementById("loadBtn")?.addEventListener("click", () => loadGrades());
+
 document.getElementById("insertBtn")?.addEventListener("click", async () => {
   insertMsg.textContent = "";
 
@@ -73,4 +100,49 @@ document.getElementById("publishBtn")?.addEventListener("click", async () => {
   await loadGrades();
 });
 
+document.getElementById("importBtn")?.addEventListener("click", async () => {
+  const importMsg = document.getElementById("importMsg");
+  importMsg.textContent = "";
+
+  const csvText = document.getElementById("importCsv").value.trim();
+  if (!csvText) return setMsg(importMsg, "Paste CSV rows to import.");
+
+  const res = await fetch("/api/instructor/grades/import", {
+    method: "POST",
+    headers: {"Content-Type":"text/csv"},
+    credentials: "include",
+    body: csvText + "\n"
+  });
+
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) return setMsg(importMsg, data.error || "Import failed.");
+
+  const errs = data.errors || [];
+  const detail = errs.map(e => `row ${e.index + 1}: ${e.error}`).join(" | ");
+  setMsg(importMsg, `Imported ${data.inserted} grade(s).` + (detail ? ` ${detail}` : ""), !errs.length);
+  await loadGrades();
+});
+
+document.getElementById("publishCourseBtn")?.addEventListener("click", async () => {
+  const pubCourseMsg = document.getElementById("pubCourseMsg");
+  pubCourseMsg.textContent = "";
+
+  const course_id = Number(document.getElementById("pubCourseId").value);
+  const publish = document.getElementById("pubCourseFlag").value === "true";
+  if (!course_id) return setMsg(pubCourseMsg, "Please enter a valid CourseID.");
+
+  const res = await fetch("/api/instructor/grades/publish-course", {
+    method: "POST",
+    headers: {"Content-Type":"application/json"},
+    credentials: "include",
+    body: JSON.stringify({ course_id, publish })
+  });
+
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) return setMsg(pubCourseMsg, data.error || "Update failed.");
+
+  setMsg(pubCourseMsg, `${data.updated} grade(s) updated.`, true);
+  await loadGrades();
+});
+
 loadGrades();
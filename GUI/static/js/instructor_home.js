@@ -0,0 +1,62 @@
+const statsBody = document.getElementById("statsBody");
+const attBody = document.getElementById("attBody");
+const dashMsg = document.getElementById("dashMsg");
+
+function setMsg(el, text, ok=false){
+  el.textContent = text || "";
+  el.className = "msg " + (ok ? "ok" : "err");
+}
+
+// Whole dashboard in one request (/api/batch)
+async function loadDashboard(){
+  const res = await fetch("/api/batch", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      ops: [
+        { op: "me" },
+        { op: "grade_stats" },
+        { op: "attendance", args: { limit: 10 } },
+      ],
+    }),
+    credentials: "include",
+  });
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) return setMsg(dashMsg, data.error || "Failed to load dashboard.");
+
+  const r = data.results || {};
+
+  if (r.me && !r.me.error){
+    document.getElementById("statClearance").textContent = r.me.profile?.clearance ?? "-";
+  }
+
+  if (r.grade_stats && !r.grade_stats.error){
+    document.getElementById("statCourses").textContent = (r.grade_stats.stats || []).length;
+    statsBody.innerHTML = (r.grade_stats.stats || []).map(s => `
+      <tr>
+        <td>${s.CourseID}</td>
+        <td>${s.RecordsCount}</td>
+        <td>${s.AvgGrade ?? ""}</td>
+        <td>${s.MinGrade ?? ""}</td>
+        <td>${s.MaxGrade ?? ""}</td>
+      </tr>
+    `).join("");
+  }
+
+  if (r.attendance && !r.attendance.error){
+    attBody.innerHTML = (r.attendance.attendance || []).map(a => `
+      <tr>
+        <td>${a.AttendanceID}</td>
+        <td>${a.StudentID}</td>
+        <td>${a.CourseID}</td>
+        <td>${a.Status ? "Present" : "Absent"}</td>
+        <td>${a.DateRecorded ?? ""}</td>
+      </tr>
+    `).join("");
+  }
+
+  const failed = Object.values(r).find(x => x.error);
+  if (failed) setMsg(dashMsg, failed.error);
+}
+
+loadDashboard();
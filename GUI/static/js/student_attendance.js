@@ -2,19 +2,38 @@ const body = document.getElementById("attBody");
 const msg = document.getElementById("msg");
 function setMsg(t){ msg.textContent = t || ""; }
 
-fetch("/api/student/attendance", { credentials: "include" })
+const termPick = document.getElementById("termPick");
+
+// Default is the open terms (hot tables); archived terms only on request
+fetch("/api/terms", { credentials: "include" })
   .then(r => r.json())
   .then(data => {
-    const items = data.attendance || [];
-    if (!items.length) setMsg("No attendance records found.");
-
-    body.innerHTML = items.map(a => `
-      <tr>
-        <td>${a.AttendanceID}</td>
-        <td>${a.CourseID}</td>
-        <td>${a.Status ? "Present" : "Absent"}</td>
-        <td>${a.DateRecorded ?? ""}</td>
-      </tr>
-    `).join("");
+    const all = termPick.querySelector('option[value="all"]');
+    (data.terms || []).forEach(t => termPick.add(new Option(t.TermName, t.TermID), all));
   })
-  .catch(() => setMsg("Error loading attendance."));
+  .catch(() => {});
+
+function loadAttendance(){
+  setMsg("");
+  const q = termPick.value ? `?term_id=${encodeURIComponent(termPick.value)}` : "";
+  fetch(`/api/student/attendance${q}`, { credentials: "include" })
+    .then(r => r.json())
+    .then(data => {
+      if (data.error) return setMsg(data.error);
+      const items = data.attendance || [];
+      if (!items.length) setMsg("No attendance records found.");
+
+      body.innerHTML = items.map(a => `
+        <tr>
+          <td>${a.AttendanceID}</td>
+          <td>${a.CourseID}</td>
+          <td>${a.Status ? "Present" : "Absent"}</td>
+          <td>${a.DateRecorded ?? ""}</td>
+        </tr>
+      `).join("");
+    })
+    .catch(() => setMsg("Error loading attendance."));
+}
+
+termPick.addEventListener("change", loadAttendance);
+loadAttendance();
@@ -2,20 +2,39 @@ const body = document.getElementById("gradesBody");
 const msg = document.getElementById("msg");
 function setMsg(t){ msg.textContent = t || ""; }
 
-fetch("/api/student/grades", { credentials: "include" })
+const termPick = document.getElementById("termPick");
+
+// Default is the open terms (hot tables); archived terms only on request
+fetch("/api/terms", { credentials: "include" })
   .then(r => r.json())
   .then(data => {
-    const grades = data.grades || [];
-    if (!grades.length) setMsg("No published grades yet.");
-
-    body.innerHTML = grades.map(g => `
-      <tr>
-        <td>${g.GradeID}</td>
-        <td>${g.CourseID}</td>
-        <td>${g.Grade}</td>
-        <td>${g.IsPublished ? "Yes" : "No"}</td>
-        <td>${g.PublishedDate ?? ""}</td>
-      </tr>
-    `).join("");
+    const all = termPick.querySelector('option[value="all"]');
+    (data.terms || []).forEach(t => termPick.add(new Option(t.TermName, t.TermID), all));
   })
-  .catch(() => setMsg("Error loading grades."));
+  .catch(() => {});
+
+function loadGrades(){
+  setMsg("");
+  const q = termPick.value ? `?term_id=${encodeURIComponent(termPick.value)}` : "";
+  fetch(`/api/student/grades${q}`, { credentials: "include" })
+    .then(r => r.json())
+    .then(data => {
+      if (data.error) return setMsg(data.error);
+      const grades = data.grades || [];
+      if (!grades.length) setMsg("No published grades yet.");
+
+      body.innerHTML = grades.map(g => `
+        <tr>
+          <td>${g.GradeID}</td>
+          <td>${g.CourseID}</td>
+          <td>${g.Grade}</td>
+          <td>${g.IsPublished ? "Yes" : "No"}</td>
+          <td>${g.PublishedDate ?? ""}</td>
+        </tr>
+      `).join("");
+    })
+    .catch(() => setMsg("Error loading grades."));
+}
+
+termPick.addEventListener("change", loadGrades);
+loadGrades();
@@ -1,3 +1,29 @@
+const msg = document.getElementById("msg");
+function setMsg(t){ msg.textContent = t || ""; }
+function setText(id, v){ document.getElementById(id).textContent = v; }
+
+// Profile + grade totals + attendance rollups in one request (sp_Student_Overview)
+fetch("/api/student/overview", { credentials: "include" })
+  .then(r => r.json())
+  .then(data => {
+    if (data.error) return setMsg(data.error);
+
+    const p = data.profile || {};
+    setText("ovName", p.FullName ?? "-");
+    setText("ovDept", p.Department ?? "-");
+
+    const g = data.grade_summary || {};
+    setText("ovGrades", g.GradeCount ?? 0);
+    setText("ovAvg", g.AvgGrade != null ? Number(g.AvgGrade).toFixed(2) : "-");
+
+    // per-course rollups (all sessions)
+    const sum = data.attendance_summary || [];
+    const present = sum.reduce((n, r) => n + r.PresentCount, 0);
+    const total = sum.reduce((n, r) => n + r.PresentCount + r.AbsentCount, 0);
+    setText("ovAtt", total ? `${present}/${total} present` : "-");
+  })
+  .catch(() => setMsg("Error loading overview."));
+
 document.getElementById("logoutBtn").addEventListener("click", async () => {
   await fetch("/api/logout", { method: "POST", credentials: "include" });
   window.location.href = "/login";
@@ -1,6 +1,12 @@
 const recordMsg = document.getElementById("recordMsg");
 const loadMsg = document.getElementById("loadMsg");
+const rosterMsg = document.getElementById("rosterMsg");
 const attBody = document.getElementById("attBody");
+const moreBtn = document.getElementById("moreBtn");
+let nextCursor = null;
+let lastId = 0;        // newest AttendanceID shown for the current filter
+let live = null;       // EventSource for the filtered course
+let viewFilter = "";   // filters the table was loaded with
 
 function setMsg(el, text, ok=false){
   el.textContent = text || "";
@@ -30,27 +36,46 @@ async function recordAttendance(){
   if (!res.ok) return setMsg(recordMsg, data.error || "Failed to record attendance.");
 
   setMsg(recordMsg, "Attendance recorded successfully ", true);
+  await loadNewer();
 }
 
-async function loadAttendance(){
-  loadMsg.textContent = "";
-  attBody.innerHTML = "";
+async function recordRoster(){
+  rosterMsg.textContent = "";
 
-  const fs = document.getElementById("filterStudentId").value.trim();
-  const fc = document.getElementById("filterCourseId").value.trim();
+  const course_id = Number(document.getElementById("rosterCourseId").value);
+  if (!course_id) return setMsg(rosterMsg, "Please enter a valid CourseID.");
 
-  const params = new URLSearchParams();
-  if (fs) params.set("student_id", fs);
-  if (fc) params.set("course_id", fc);
+  const records = [];
+  const lines = document.getElementById("rosterLines").value.split("\n");
+  for (const [i, line] of lines.entries()){
+    if (!line.trim()) continue;
+    const [sid, st] = line.split(",").map(x => (x || "").trim().toLowerCase());
+    const student_id = Number(sid);
+    if (!student_id || !["present", "absent", "1", "0"].includes(st)){
+      return setMsg(rosterMsg, `Line ${i + 1}: expected "StudentID,present|absent".`);
+    }
+    records.push({ student_id, status: st === "present" || st === "1" });
+  }
+  if (!records.length) return setMsg(rosterMsg, "Roster is empty.");
+
+  const res = await fetch("/api/ta/attendance/record-batch", {
+    method: "POST",
+    headers: {"Content-Type":"application/json"},
+    credentials: "include",
+    body: JSON.stringify({ course_id, records })
+  });
 
-  const res = await fetch(`/api/ta/attendance?${params.toString()}`, { credentials: "include" });
   const data = await res.json().catch(() => ({}));
-  if (!res.ok) return setMsg(loadMsg, data.error || "Failed to load attendance.");
+  if (!res.ok) return setMsg(rosterMsg, data.error || "Failed to record roster.");
 
-  const items = data.attendance || [];
-  if (!items.length) setMsg(loadMsg, "No attendance records found.", true);
+  const errs = data.errors || [];
+  const detail = errs.map(e => `#${e.student_id}: ${e.error}`).join(" | ");
+  setMsg(rosterMsg, `Recorded ${data.recorded} of ${records.length}.` + (detail ? ` ${detail}` : ""), !errs.length);
+  await loadNewer();
+}
 
-  attBody.innerHTML = items.map(a => `
+function rowHtml(a){
+  return `
     <tr>
       <td>${a.AttendanceID}</td>
       <td>${a.StudentID}</td>
@@ -58,10 +83,83 @@ async function loadAttendance(){
       <td>${a.Status ? "Present" : "Absent"}</td>
       <td>${a.DateRecorded ?? ""}</td>
     </tr>
-  `).join("");
+  `;
+}
+
+function readFilter(){
+  const params = new URLSearchParams();
+  const fs = document.getElementById("filterStudentId").value.trim();
+  const fc = document.getElementById("filterCourseId").value.trim();
+  if (fs) params.set("student_id", fs);
+  if (fc) params.set("course_id", fc);
+  return params.toString();
+}
+
+/* rows come oldest first: put each one on top, skipping anything already shown */
+function prependRows(items){
+  const fresh = items.filter(a => a.AttendanceID > lastId);
+  if (!fresh.length) return;
+  attBody.insertAdjacentHTML("afterbegin", fresh.slice().reverse().map(rowHtml).join(""));
+  lastId = fresh[fresh.length - 1].AttendanceID;
+  if (loadMsg.className.endsWith("ok")) loadMsg.textContent = "";
+}
+
+/* only what was recorded after the newest row on screen (?since_id=) */
+async function loadNewer(){
+  const params = new URLSearchParams(viewFilter);
+  params.set("format", "columnar");
+  params.set("since_id", lastId);
+
+  const res = await fetch(`/api/ta/attendance?${params.toString()}`, { credentials: "include" });
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) return setMsg(loadMsg, data.error || "Failed to load attendance.");
+
+  prependRows(rowsOf(data));
+  if (data.more) await loadNewer();
+}
+
+/* live updates while the view is filtered to one course */
+function watchCourse(){
+  if (live) live.close();
+  live = null;
+
+  const params = new URLSearchParams(viewFilter);
+  if (!params.get("course_id") || !window.EventSource) return;
+  params.set("since_id", lastId);
+
+  live = new EventSource(`/api/ta/attendance/stream?${params.toString()}`);
+  live.addEventListener("attendance", e => prependRows(rowsOf(JSON.parse(e.data))));
+}
+
+async function loadAttendance(more = false){
+  loadMsg.textContent = "";
+  if (!more){
+    attBody.innerHTML = "";
+    viewFilter = readFilter();
+  }
+
+  const params = new URLSearchParams(viewFilter);
+  params.set("format", "columnar");
+  if (more && nextCursor) params.set("cursor", nextCursor);
+
+  const res = await fetch(`/api/ta/attendance?${params.toString()}`, { credentials: "include" });
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) return setMsg(loadMsg, data.error || "Failed to load attendance.");
+
+  const items = rowsOf(data);
+  if (!items.length && !more) setMsg(loadMsg, "No attendance records found.", true);
+
+  attBody.insertAdjacentHTML("beforeend", items.map(rowHtml).join(""));
+  if (!more) lastId = items.length ? items[0].AttendanceID : 0;
+
+  nextCursor = data.next_cursor || null;
+  if (moreBtn) moreBtn.style.display = nextCursor ? "" : "none";
+  if (!more) watchCourse();
 }
 
 document.getElementById("recordBtn")?.addEventListener("click", recordAttendance);
-document.getElementById("loadBtn")?.addEventListener("click", loadAttendance);
+document.getElementById("rosterBtn")?.addEventListener("click", recordRoster);
+document.getElementById("loadBtn")?.addEventListener("click", () => loadAttendance());
+moreBtn?.addEventListener("click", () => loadAttendance(true));
 
 loadAttendance();
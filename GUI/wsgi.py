@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers.
+
+    cd GUI
+    gunicorn -c gunicorn.conf.py
+
+Each worker imports this module after fork (gunicorn's default, preload_app
+off), so every process builds its own app, pool and caches.
+"""
+from app import create_app
+
+app = create_app()
@@ -0,0 +1,455 @@
+USE SRMS;
+GO
+
+/* =========================================================
+   SRMS PERFORMANCE BENCHMARKS
+   - Run AFTER Project.sql + Fix.sql
+   - Every section generates its own synthetic data inside a
+     transaction and rolls it back, so the demo data is untouched.
+   - Results are PRINTed (ms); compare runs on the same machine.
+   ========================================================= */
+
+PRINT '==============================';
+PRINT 'SRMS PERFORMANCE BENCHMARKS';
+PRINT '==============================';
+GO
+
+
+/* ===============================
+   0) HELPERS (dropped at the end)
+   =============================== */
+
+-- Adds @Count synthetic Student users (bench_1..bench_N, password 123).
+-- UsernameHash is filled inline so the blind-index trigger has nothing to do.
+CREATE OR ALTER PROCEDURE dbo.sp_Bench_AddUsers
+    @Count INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @From INT = (SELECT COUNT(*) FROM dbo.USERS WHERE Role = 'Student' AND StudentID IS NULL);
+    DECLARE @IPad VARBINARY(64), @OPad VARBINARY(64);
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    SELECT @IPad = CONVERT(VARBINARY(64), DecryptByKey(IPadEncrypted)),
+           @OPad = CONVERT(VARBINARY(64), DecryptByKey(OPadEncrypted))
+    FROM dbo.LOOKUP_KEY
+    WHERE KeyID = 1;
+
+    ;WITH N AS (
+        SELECT TOP (@Count) @From + ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+        FROM sys.all_objects a CROSS JOIN sys.all_objects b CROSS JOIN sys.all_objects c
+    ),
+    Names AS (
+        SELECT N'bench_' + CAST(n AS NVARCHAR(10)) AS Username FROM N
+    )
+    INSERT INTO dbo.USERS (UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel, UsernameHash)
+    SELECT
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(MAX), Username)),
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(MAX), N'123')),
+        N'Student', 2,
+        dbo.fn_UsernameHashWithPads(@IPad, @OPad, Username)
+    FROM Names;
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+-- Adds a scaled academic dataset: @Students students spread over @Courses
+-- new courses, with attendance/grade rows per student and @RoleRequests
+-- closed role requests (plus a handful still Pending).
+CREATE OR ALTER PROCEDURE dbo.sp_Bench_AddRecords
+    @Students INT,
+    @Courses INT,
+    @AttendancePerStudent INT,
+    @GradesPerStudent INT,
+    @RoleRequests INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @LastStudent INT = ISNULL((SELECT MAX(StudentID) FROM dbo.STUDENT), 0);
+    DECLARE @LastCourse INT = ISNULL((SELECT MAX(CourseID) FROM dbo.COURSE), 0);
+
+    ;WITH N AS (
+        SELECT TOP (@Courses) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+        FROM sys.all_objects
+    )
+    INSERT INTO dbo.COURSE (CourseName)
+    SELECT N'Bench Course ' + CAST(n AS NVARCHAR(10)) FROM N;
+
+    ;WITH N AS (
+        SELECT TOP (@Students) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+        FROM sys.all_objects a CROSS JOIN sys.all_objects b
+    )
+    INSERT INTO dbo.STUDENT (FullName, Email, ClearanceLevel)
+    SELECT N'Bench Student ' + CAST(n AS NVARCHAR(10)),
+           N'bench' + CAST(n AS NVARCHAR(10)) + N'@uni.edu',
+           1 + n % 3
+    FROM N;
+
+    SELECT ROW_NUMBER() OVER (ORDER BY StudentID) - 1 AS n, StudentID
+    INTO #S FROM dbo.STUDENT WHERE StudentID > @LastStudent;
+    SELECT ROW_NUMBER() OVER (ORDER BY CourseID) - 1 AS n, CourseID
+    INTO #C FROM dbo.COURSE WHERE CourseID > @LastCourse;
+
+    ;WITH K AS (
+        SELECT TOP (@AttendancePerStudent) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS k
+        FROM sys.all_objects
+    )
+    INSERT INTO dbo.ATTENDANCE (StudentID, CourseID, Status)
+    SELECT s.StudentID, c.CourseID, CASE WHEN (s.n + K.k) % 5 = 0 THEN 0 ELSE 1 END
+    FROM #S s
+    CROSS JOIN K
+    JOIN #C c ON c.n = (s.n + K.k) % @Courses;
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    ;WITH K AS (
+        SELECT TOP (@GradesPerStudent) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS k
+        FROM sys.all_objects
+    )
+    INSERT INTO dbo.GRADES (StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished)
+    SELECT
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), s.StudentID)),
+        s.StudentID, c.CourseID,
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), CAST(50 + (s.n * 7 + K.k * 13) % 51 AS DECIMAL(5,2)))),
+        CASE WHEN K.k % 2 = 0 THEN 1 ELSE 0 END
+    FROM #S s
+    CROSS JOIN K
+    JOIN #C c ON c.n = (s.n + K.k) % @Courses;
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    -- role requests need real users: reuse (or add) bench_ users
+    DECLARE @Need INT = @RoleRequests - (SELECT COUNT(*) FROM dbo.USERS WHERE Role = 'Student' AND StudentID IS NULL);
+    IF @Need > 0
+        EXEC dbo.sp_Bench_AddUsers @Need;
+
+    INSERT INTO dbo.ROLE_REQUESTS (UserID, CurrentRole, RequestedRole, Reason, Status, RequestDate)
+    SELECT TOP (@RoleRequests)
+        UserID, N'Student', N'TA', N'bench',
+        CASE WHEN UserID % 500 = 0 THEN N'Pending' WHEN UserID % 2 = 0 THEN N'Approved' ELSE N'Denied' END,
+        DATEADD(MINUTE, -(UserID % 100000), GETDATE())
+    FROM dbo.USERS
+    WHERE Role = 'Student' AND StudentID IS NULL
+    ORDER BY UserID;
+END
+GO
+
+-- Times the index-pack access paths and prints one line per path.
+-- The first (warm-up) call of each path runs with STATISTICS IO on, so the
+-- Messages tab shows logical reads per table next to the timings.
+CREATE OR ALTER PROCEDURE dbo.sp_Bench_IndexPaths
+    @Label NVARCHAR(20),
+    @Iterations INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @AdminID INT, @TAID INT, @StudentUserID INT, @StudentID INT, @CourseID INT;
+    DECLARE @i INT, @t0 DATETIME2, @Ms INT;
+    DECLARE @Att TABLE (AttendanceID INT, StudentID INT, CourseID INT, Status BIT, DateRecorded DATETIME2, RecordedByUserID INT);
+    DECLARE @Gr TABLE (GradeID INT, StudentID INT, CourseID INT, Grade DECIMAL(5,2), IsPublished BIT, DateEntered DATETIME2, PublishedDate DATETIME2);
+    DECLARE @Rq TABLE (RequestID INT, UserID INT, CurrentRole NVARCHAR(50), RequestedRole NVARCHAR(50), Reason NVARCHAR(255), RequestDate DATETIME, Status NVARCHAR(20));
+
+    SELECT TOP (1) @AdminID = UserID FROM dbo.USERS WHERE Role = 'Admin' ORDER BY UserID;
+    SELECT TOP (1) @TAID = UserID FROM dbo.USERS WHERE Role = 'TA' ORDER BY UserID;
+    SELECT TOP (1) @StudentUserID = UserID, @StudentID = StudentID FROM dbo.USERS WHERE Role = 'Student' AND StudentID IS NOT NULL ORDER BY UserID;
+    SELECT TOP (1) @CourseID = CourseID FROM dbo.TA_COURSE WHERE TAUserID = @TAID ORDER BY CourseID DESC;
+
+    PRINT '  [' + @Label + ']';
+
+    -- a) Admin: one student's attendance
+    SET STATISTICS IO ON;
+    INSERT INTO @Att EXEC dbo.sp_ViewAttendance 'Admin', @AdminID, 3, @StudentID, NULL, NULL, 200;
+    SET STATISTICS IO OFF;
+    SET @i = 0; SET @t0 = SYSDATETIME();
+    WHILE @i < @Iterations
+    BEGIN
+        DELETE FROM @Att;
+        INSERT INTO @Att EXEC dbo.sp_ViewAttendance 'Admin', @AdminID, 3, @StudentID, NULL, NULL, 200;
+        SET @i += 1;
+    END
+    SET @Ms = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+    PRINT '    attendance by student (Admin)  avg ms: ' + CAST(CAST(@Ms * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+
+    -- b) TA: one assigned course (clearance join + TA_COURSE check)
+    SET STATISTICS IO ON;
+    DELETE FROM @Att;
+    INSERT INTO @Att EXEC dbo.sp_ViewAttendance 'TA', @TAID, 2, NULL, @CourseID, NULL, 200;
+    SET STATISTICS IO OFF;
+    SET @i = 0; SET @t0 = SYSDATETIME();
+    WHILE @i < @Iterations
+    BEGIN
+        DELETE FROM @Att;
+        INSERT INTO @Att EXEC dbo.sp_ViewAttendance 'TA', @TAID, 2, NULL, @CourseID, NULL, 200;
+        SET @i += 1;
+    END
+    SET @Ms = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+    PRINT '    attendance by course (TA)      avg ms: ' + CAST(CAST(@Ms * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+
+    -- c) Student: own published grades
+    SET STATISTICS IO ON;
+    INSERT INTO @Gr EXEC dbo.sp_ViewGrades 'Student', @StudentUserID, NULL, 200;
+    SET STATISTICS IO OFF;
+    SET @i = 0; SET @t0 = SYSDATETIME();
+    WHILE @i < @Iterations
+    BEGIN
+        DELETE FROM @Gr;
+        INSERT INTO @Gr EXEC dbo.sp_ViewGrades 'Student', @StudentUserID, NULL, 200;
+        SET @i += 1;
+    END
+    SET @Ms = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+    PRINT '    published grades (Student)     avg ms: ' + CAST(CAST(@Ms * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+
+    -- d) Admin: pending role requests
+    SET STATISTICS IO ON;
+    INSERT INTO @Rq EXEC dbo.sp_Admin_ListPendingRoleRequests 'Admin';
+    SET STATISTICS IO OFF;
+    SET @i = 0; SET @t0 = SYSDATETIME();
+    WHILE @i < @Iterations
+    BEGIN
+        DELETE FROM @Rq;
+        INSERT INTO @Rq EXEC dbo.sp_Admin_ListPendingRoleRequests 'Admin';
+        SET @i += 1;
+    END
+    SET @Ms = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+    PRINT '    pending role requests (Admin)  avg ms: ' + CAST(CAST(@Ms * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+END
+GO
+
+
+/* ===============================
+   1) LOGIN: 4-role probe loop vs sp_AuthUserAnyRole (50k users)
+   =============================== */
+
+PRINT 'Login Benchmark (50k synthetic users)';
+SET NOCOUNT ON;
+
+DECLARE @Users INT = 50000;
+DECLARE @Iterations INT = 20;
+DECLARE @i INT, @t0 DATETIME2, @LoopMs INT, @OneMs INT;
+DECLARE @R TABLE (UserID INT, Role NVARCHAR(50), ClearanceLevel INT);
+
+BEGIN TRANSACTION;
+
+EXEC dbo.sp_Bench_AddUsers @Users;
+
+-- a student login is the worst case for the loop (last role tried)
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @R;
+    INSERT INTO @R EXEC dbo.sp_AuthUser 'Admin',      'ze', '123';
+    IF NOT EXISTS (SELECT 1 FROM @R) INSERT INTO @R EXEC dbo.sp_AuthUser 'Instructor', 'ze', '123';
+    IF NOT EXISTS (SELECT 1 FROM @R) INSERT INTO @R EXEC dbo.sp_AuthUser 'TA',         'ze', '123';
+    IF NOT EXISTS (SELECT 1 FROM @R) INSERT INTO @R EXEC dbo.sp_AuthUser 'Student',    'ze', '123';
+    SET @i += 1;
+END
+SET @LoopMs = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @R;
+    INSERT INTO @R EXEC dbo.sp_AuthUserAnyRole 'ze', '123';
+    SET @i += 1;
+END
+SET @OneMs = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+
+PRINT '  4-role loop        avg ms/login: ' + CAST(CAST(@LoopMs * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+PRINT '  sp_AuthUserAnyRole avg ms/login: ' + CAST(CAST(@OneMs  * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+
+ROLLBACK TRANSACTION;
+GO
+
+
+/* ===============================
+   2) LOGIN SCALING: blind-index sp_AuthUser from 1k to 500k users
+   - latency should stay flat (index seek + one-row decrypt)
+   =============================== */
+
+PRINT 'Login Scaling Benchmark (1k -> 500k synthetic users)';
+SET NOCOUNT ON;
+
+DECLARE @Iterations INT = 50;
+DECLARE @Sizes TABLE (Seq INT IDENTITY(1,1), Users INT);
+INSERT INTO @Sizes (Users) VALUES (1000), (10000), (100000), (500000);
+
+DECLARE @Seq INT = 1, @Target INT, @Have INT, @i INT, @t0 DATETIME2, @Ms INT;
+DECLARE @R TABLE (UserID INT, Role NVARCHAR(50), ClearanceLevel INT);
+
+BEGIN TRANSACTION;
+
+WHILE @Seq <= (SELECT MAX(Seq) FROM @Sizes)
+BEGIN
+    SELECT @Target = Users FROM @Sizes WHERE Seq = @Seq;
+    SET @Have = (SELECT COUNT(*) FROM dbo.USERS);
+    IF @Target > @Have
+        EXEC dbo.sp_Bench_AddUsers @Target - @Have;
+
+    SET @i = 0; SET @t0 = SYSDATETIME();
+    WHILE @i < @Iterations
+    BEGIN
+        DELETE FROM @R;
+        INSERT INTO @R EXEC dbo.sp_AuthUser 'Student', 'ze', '123';
+        SET @i += 1;
+    END
+    SET @Ms = DATEDIFF(MILLISECOND, @t0, SYSDATETIME());
+
+    PRINT '  users=' + CAST(@Target AS NVARCHAR(10))
+        + '  avg ms/login: ' + CAST(CAST(@Ms * 1.0 / @Iterations AS DECIMAL(10,2)) AS NVARCHAR(20));
+
+    SET @Seq += 1;
+END
+
+ROLLBACK TRANSACTION;
+GO
+
+
+/* ===============================
+   3) INDEX PACK (Fix.sql #13): before vs after
+   - scaled dataset: 20k students, 200 courses, 1M attendance, 200k grades,
+     50k role requests (100 pending)
+   - "before" = the pack's indexes disabled, "after" = rebuilt; both
+     happen inside the transaction, so the ROLLBACK restores them
+   - for plans, turn on "Include Actual Execution Plan" in SSMS
+   =============================== */
+
+PRINT 'Index Pack Benchmark (scaled dataset)';
+SET NOCOUNT ON;
+
+DECLARE @Iterations INT = 20;
+DECLARE @Pack TABLE (TableName SYSNAME, IndexName SYSNAME);
+INSERT INTO @Pack VALUES
+    (N'dbo.ATTENDANCE',    N'IX_ATTENDANCE_Student'),
+    (N'dbo.ATTENDANCE',    N'IX_ATTENDANCE_Course'),
+    (N'dbo.STUDENT',       N'IX_STUDENT_Clearance'),
+    (N'dbo.GRADES',        N'IX_GRADES_Student_Published'),
+    (N'dbo.GRADES',        N'IX_GRADES_Course'),
+    (N'dbo.ROLE_REQUESTS', N'IX_ROLE_REQUESTS_Pending');
+
+DECLARE @Disable NVARCHAR(MAX) = N'', @Rebuild NVARCHAR(MAX) = N'';
+SELECT
+    @Disable += N'ALTER INDEX ' + QUOTENAME(p.IndexName) + N' ON ' + p.TableName + N' DISABLE;',
+    @Rebuild += N'ALTER INDEX ' + QUOTENAME(p.IndexName) + N' ON ' + p.TableName + N' REBUILD;'
+FROM @Pack p
+WHERE EXISTS (SELECT 1 FROM sys.indexes i WHERE i.name = p.IndexName AND i.object_id = OBJECT_ID(p.TableName));
+
+IF @Disable = N''
+    PRINT '  (index pack not installed - run Fix.sql first; both runs show the "before" numbers)';
+
+BEGIN TRANSACTION;
+
+-- load with the pack disabled (faster), then measure, rebuild, measure again
+EXEC sp_executesql @Disable;
+EXEC dbo.sp_Bench_AddRecords @Students = 20000, @Courses = 200, @AttendancePerStudent = 50,
+                             @GradesPerStudent = 10, @RoleRequests = 50000;
+
+-- the demo TA is assigned to every bench course so the TA path has data
+INSERT INTO dbo.TA_COURSE (TAUserID, CourseID)
+SELECT u.UserID, c.CourseID
+FROM dbo.USERS u
+CROSS JOIN dbo.COURSE c
+WHERE u.Role = 'TA' AND c.CourseName LIKE N'Bench Course %';
+
+UPDATE STATISTICS dbo.ATTENDANCE;
+UPDATE STATISTICS dbo.GRADES;
+UPDATE STATISTICS dbo.STUDENT;
+UPDATE STATISTICS dbo.ROLE_REQUESTS;
+
+EXEC dbo.sp_Bench_IndexPaths @Label = N'before', @Iterations = @Iterations;
+
+EXEC sp_executesql @Rebuild;
+
+EXEC dbo.sp_Bench_IndexPaths @Label = N'after', @Iterations = @Iterations;
+
+ROLLBACK TRANSACTION;
+GO
+
+
+/* ===============================
+   4) SYMMETRIC KEY: open/close per call vs once per session (Fix.sql #14)
+   - same procs both times; with the key already open they skip
+     OPEN ... DECRYPTION BY CERTIFICATE and the CLOSE
+   - demo data only, nothing is written
+   =============================== */
+
+PRINT 'Session Key Benchmark (per-call open/close vs sp_Session_OpenKey once)';
+SET NOCOUNT ON;
+
+DECLARE @Iterations INT = 500;
+DECLARE @i INT, @t0 DATETIME2, @PerCallUs BIGINT, @SessionUs BIGINT, @AdminID INT;
+DECLARE @R TABLE (UserID INT, Role NVARCHAR(50), ClearanceLevel INT);
+DECLARE @Gr TABLE (GradeID INT, StudentID INT, CourseID INT, Grade DECIMAL(5,2), IsPublished BIT, DateEntered DATETIME2, PublishedDate DATETIME2);
+
+SELECT TOP (1) @AdminID = UserID FROM dbo.USERS WHERE Role = 'Admin' ORDER BY UserID;
+
+-- a) login
+CLOSE ALL SYMMETRIC KEYS;
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @R;
+    INSERT INTO @R EXEC dbo.sp_AuthUserAnyRole 'ze', '123';
+    SET @i += 1;
+END
+SET @PerCallUs = DATEDIFF_BIG(MICROSECOND, @t0, SYSDATETIME());
+
+EXEC dbo.sp_Session_OpenKey;
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @R;
+    INSERT INTO @R EXEC dbo.sp_AuthUserAnyRole 'ze', '123';
+    SET @i += 1;
+END
+SET @SessionUs = DATEDIFF_BIG(MICROSECOND, @t0, SYSDATETIME());
+CLOSE ALL SYMMETRIC KEYS;
+
+PRINT '  sp_AuthUserAnyRole  per-call key avg us: ' + CAST(@PerCallUs / @Iterations AS NVARCHAR(20))
+    + ' | session key avg us: ' + CAST(@SessionUs / @Iterations AS NVARCHAR(20))
+    + ' | saved/call us: ' + CAST((@PerCallUs - @SessionUs) / @Iterations AS NVARCHAR(20));
+
+-- b) one-row grade page (key open/close dominates)
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @Gr;
+    INSERT INTO @Gr EXEC dbo.sp_ViewGrades 'Admin', @AdminID, NULL, 1;
+    SET @i += 1;
+END
+SET @PerCallUs = DATEDIFF_BIG(MICROSECOND, @t0, SYSDATETIME());
+
+EXEC dbo.sp_Session_OpenKey;
+SET @i = 0; SET @t0 = SYSDATETIME();
+WHILE @i < @Iterations
+BEGIN
+    DELETE FROM @Gr;
+    INSERT INTO @Gr EXEC dbo.sp_ViewGrades 'Admin', @AdminID, NULL, 1;
+    SET @i += 1;
+END
+SET @SessionUs = DATEDIFF_BIG(MICROSECOND, @t0, SYSDATETIME());
+CLOSE ALL SYMMETRIC KEYS;
+
+PRINT '  sp_ViewGrades (1)   per-call key avg us: ' + CAST(@PerCallUs / @Iterations AS NVARCHAR(20))
+    + ' | session key avg us: ' + CAST(@SessionUs / @Iterations AS NVARCHAR(20))
+    + ' | saved/call us: ' + CAST((@PerCallUs - @SessionUs) / @Iterations AS NVARCHAR(20));
+GO
+
+
+DROP PROCEDURE IF EXISTS dbo.sp_Bench_AddUsers;
+GO
+DROP PROCEDURE IF EXISTS dbo.sp_Bench_AddRecords;
+GO
+DROP PROCEDURE IF EXISTS dbo.sp_Bench_IndexPaths;
+GO
+
+PRINT '==============================';
+PRINT 'BENCHMARKS COMPLETED';
+PRINT '==============================';
+GO
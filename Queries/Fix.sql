@@ -203,3 +203,3269 @@ GRANT EXECUTE ON dbo.sp_EditMyProfile TO TA;
 GRANT EXECUTE ON dbo.sp_EditMyProfile TO Instructor;
 GRANT EXECUTE ON dbo.sp_EditMyProfile TO Student;
 GO
+
+
+/* =========================================================
+   FIX #6: Blind index for encrypted usernames
+   - USERS.UsernameHash = HMAC-SHA256(secret, lower(trim(username)))
+   - the HMAC secret lives in dbo.LOOKUP_KEY, encrypted by SRMS_SymKey
+     (stored as the HMAC inner/outer pads so hashing needs no loop)
+   - auth becomes an index seek + decrypt of the matching row only
+   - rows written while the key was closed keep UsernameHash NULL and
+     are still found by auth (NULL bucket) until the backfill runs again
+   ========================================================= */
+
+IF COL_LENGTH('dbo.USERS', 'UsernameHash') IS NULL
+BEGIN
+    ALTER TABLE dbo.USERS ADD UsernameHash VARBINARY(32) NULL;
+END
+GO
+
+IF OBJECT_ID('dbo.LOOKUP_KEY', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.LOOKUP_KEY (
+        KeyID          INT NOT NULL PRIMARY KEY,
+        IPadEncrypted  VARBINARY(MAX) NOT NULL,
+        OPadEncrypted  VARBINARY(MAX) NOT NULL,
+        CreatedAt      DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+END
+GO
+
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.LOOKUP_KEY TO PUBLIC;
+GO
+
+-- Generate the HMAC secret once (random 32 bytes, zero-padded to the 64-byte block)
+IF NOT EXISTS (SELECT 1 FROM dbo.LOOKUP_KEY WHERE KeyID = 1)
+BEGIN
+    DECLARE @K BINARY(64) = CRYPT_GEN_RANDOM(32);
+    DECLARE @IPad VARBINARY(64) = 0x, @OPad VARBINARY(64) = 0x, @i INT = 1, @b INT;
+
+    WHILE @i <= 64
+    BEGIN
+        SET @b = CAST(SUBSTRING(@K, @i, 1) AS INT);
+        SET @IPad = @IPad + CAST(@b ^ 54 AS BINARY(1));   -- 0x36
+        SET @OPad = @OPad + CAST(@b ^ 92 AS BINARY(1));   -- 0x5C
+        SET @i += 1;
+    END
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    INSERT INTO dbo.LOOKUP_KEY (KeyID, IPadEncrypted, OPadEncrypted)
+    VALUES (1, EncryptByKey(Key_GUID('SRMS_SymKey'), @IPad), EncryptByKey(Key_GUID('SRMS_SymKey'), @OPad));
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+-- Pure HMAC step (pads already decrypted); used for set-based backfills
+CREATE OR ALTER FUNCTION dbo.fn_UsernameHashWithPads
+(
+    @IPad VARBINARY(64),
+    @OPad VARBINARY(64),
+    @UsernamePlain NVARCHAR(100)
+)
+RETURNS VARBINARY(32)
+AS
+BEGIN
+    RETURN HASHBYTES('SHA2_256',
+        @OPad + HASHBYTES('SHA2_256', @IPad + CONVERT(VARBINARY(MAX), LOWER(LTRIM(RTRIM(@UsernamePlain))))));
+END
+GO
+
+-- Needs SRMS_SymKey open in the session (returns NULL otherwise)
+CREATE OR ALTER FUNCTION dbo.fn_UsernameHash
+(
+    @UsernamePlain NVARCHAR(100)
+)
+RETURNS VARBINARY(32)
+AS
+BEGIN
+    DECLARE @IPad VARBINARY(64), @OPad VARBINARY(64);
+
+    SELECT @IPad = CONVERT(VARBINARY(64), DecryptByKey(IPadEncrypted)),
+           @OPad = CONVERT(VARBINARY(64), DecryptByKey(OPadEncrypted))
+    FROM dbo.LOOKUP_KEY
+    WHERE KeyID = 1;
+
+    IF @IPad IS NULL OR @OPad IS NULL
+        RETURN NULL;
+
+    RETURN dbo.fn_UsernameHashWithPads(@IPad, @OPad, @UsernamePlain);
+END
+GO
+
+-- Keep UsernameHash in sync on insert / username change.
+-- Callers that already computed the hash (bulk loads) are left alone.
+CREATE OR ALTER TRIGGER dbo.trg_USERS_UsernameHash
+ON dbo.USERS
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT UPDATE(UsernameEncrypted)
+        RETURN;
+
+    UPDATE u
+    SET UsernameHash = dbo.fn_UsernameHash(CONVERT(NVARCHAR(100), DecryptByKey(i.UsernameEncrypted)))
+    FROM dbo.USERS u
+    JOIN inserted i ON i.UserID = u.UserID
+    LEFT JOIN deleted d ON d.UserID = i.UserID
+    WHERE i.UsernameHash IS NULL
+       OR (d.UserID IS NOT NULL AND d.UsernameEncrypted <> i.UsernameEncrypted AND d.UsernameHash = i.UsernameHash);
+END
+GO
+
+-- Migration: backfill existing rows (idempotent, set-based)
+OPEN SYMMETRIC KEY SRMS_SymKey
+    DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+DECLARE @IPad VARBINARY(64), @OPad VARBINARY(64);
+SELECT @IPad = CONVERT(VARBINARY(64), DecryptByKey(IPadEncrypted)),
+       @OPad = CONVERT(VARBINARY(64), DecryptByKey(OPadEncrypted))
+FROM dbo.LOOKUP_KEY
+WHERE KeyID = 1;
+
+UPDATE dbo.USERS
+SET UsernameHash = dbo.fn_UsernameHashWithPads(@IPad, @OPad, CONVERT(NVARCHAR(100), DecryptByKey(UsernameEncrypted)))
+WHERE UsernameHash IS NULL;
+
+CLOSE SYMMETRIC KEY SRMS_SymKey;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_USERS_UsernameHash' AND object_id = OBJECT_ID('dbo.USERS'))
+BEGIN
+    CREATE INDEX IX_USERS_UsernameHash
+        ON dbo.USERS (UsernameHash)
+        INCLUDE (Role, ClearanceLevel);
+END
+GO
+
+-- Replaces the Project.sql version: seek on UsernameHash instead of decrypting every row
+CREATE OR ALTER PROCEDURE dbo.sp_AuthUser
+    @Role NVARCHAR(50),
+    @UsernamePlain NVARCHAR(100),
+    @PasswordPlain NVARCHAR(100)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    DECLARE @Hash VARBINARY(32) = dbo.fn_UsernameHash(@UsernamePlain);
+
+    ;WITH Candidates AS (
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash = @Hash
+        UNION ALL
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash IS NULL
+    ),
+    U AS (
+        SELECT
+            UserID,
+            CONVERT(NVARCHAR(100), DecryptByKey(UsernameEncrypted)) AS UsernamePlain,
+            CONVERT(NVARCHAR(100), DecryptByKey(PasswordEncrypted)) AS PasswordPlain,
+            Role,
+            ClearanceLevel
+        FROM Candidates
+        WHERE Role = @Role
+    )
+    SELECT TOP 1 UserID, Role, ClearanceLevel
+    FROM U
+    WHERE UsernamePlain = @UsernamePlain
+      AND (
+            (@Role='Guest' AND (PasswordPlain = '' OR @PasswordPlain = '' OR @PasswordPlain IS NULL))
+            OR
+            (@Role<>'Guest' AND PasswordPlain = @PasswordPlain)
+          );
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+
+/* =========================================================
+   FIX #7: Role-agnostic login (one call instead of 4 role probes)
+   - Same matching rules as sp_AuthUser (Guest excluded: guest has its own route)
+   - Uses the UsernameHash blind index from FIX #6
+   - If a username exists under several roles, the old probe order wins:
+     Admin -> Instructor -> TA -> Student
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_AuthUserAnyRole
+    @UsernamePlain NVARCHAR(100),
+    @PasswordPlain NVARCHAR(100)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    DECLARE @Hash VARBINARY(32) = dbo.fn_UsernameHash(@UsernamePlain);
+
+    ;WITH Candidates AS (
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash = @Hash
+        UNION ALL
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash IS NULL
+    ),
+    U AS (
+        SELECT
+            UserID,
+            CONVERT(NVARCHAR(100), DecryptByKey(UsernameEncrypted)) AS UsernamePlain,
+            CONVERT(NVARCHAR(100), DecryptByKey(PasswordEncrypted)) AS PasswordPlain,
+            Role,
+            ClearanceLevel
+        FROM Candidates
+        WHERE Role IN ('Admin','Instructor','TA','Student')
+    )
+    SELECT TOP 1 UserID, Role, ClearanceLevel
+    FROM U
+    WHERE UsernamePlain = @UsernamePlain
+      AND PasswordPlain = @PasswordPlain
+    ORDER BY
+        CASE Role WHEN 'Admin' THEN 1 WHEN 'Instructor' THEN 2 WHEN 'TA' THEN 3 ELSE 4 END,
+        UserID;
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_AuthUserAnyRole TO Admin;
+GRANT EXECUTE ON dbo.sp_AuthUserAnyRole TO Instructor;
+GRANT EXECUTE ON dbo.sp_AuthUserAnyRole TO TA;
+GRANT EXECUTE ON dbo.sp_AuthUserAnyRole TO Student;
+GRANT EXECUTE ON dbo.sp_AuthUserAnyRole TO Guest;
+GO
+
+
+/* =========================================================
+   FIX #8: Keyset pagination for the big listings
+   - @AfterID = last ID of the previous page (NULL = first page)
+   - @Limit   = page size (NULL = no limit, old behaviour)
+   - Grades/Attendance are newest-first (seek ID < @AfterID),
+     Users are oldest-first (seek UserID > @AfterID)
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_ListUsers
+    @UserRole NVARCHAR(50),
+    @AfterID INT = NULL,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 0);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    SELECT TOP (@Limit) UserID, Role, ClearanceLevel, StudentID, InstructorID
+    FROM dbo.USERS
+    WHERE UserID > @AfterID
+    ORDER BY UserID;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewGrades
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @AfterID INT = NULL,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','Student')
+    BEGIN
+        RAISERROR('Access Denied: Grades not allowed for this role.',16,1);
+        RETURN;
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    IF @UserRole IN ('Admin','Instructor')
+    BEGIN
+        SELECT TOP (@Limit)
+            GradeID,
+            StudentID,
+            CourseID,
+            CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+            IsPublished,
+            DateEntered,
+            PublishedDate
+        FROM dbo.GRADES
+        WHERE GradeID < @AfterID
+        ORDER BY GradeID DESC;
+    END
+    ELSE
+    BEGIN
+        DECLARE @SID INT;
+        SELECT @SID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @SID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            CLOSE SYMMETRIC KEY SRMS_SymKey;
+            RETURN;
+        END
+
+        SELECT TOP (@Limit)
+            GradeID,
+            StudentID,
+            CourseID,
+            CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+            IsPublished,
+            DateEntered,
+            PublishedDate
+        FROM dbo.GRADES
+        WHERE StudentID = @SID
+          AND IsPublished = 1
+          AND GradeID < @AfterID
+        ORDER BY GradeID DESC;
+    END
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendance
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @AfterID INT = NULL,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    ;WITH Allowed AS (
+        SELECT a.*
+        FROM dbo.ATTENDANCE a
+        JOIN dbo.STUDENT s ON s.StudentID = a.StudentID
+        WHERE s.ClearanceLevel <= @UserClearance
+          AND a.AttendanceID < @AfterID
+          AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+          AND (@CourseID  IS NULL OR a.CourseID  = @CourseID)
+    )
+    SELECT TOP (@Limit) AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+    FROM Allowed
+    WHERE
+        (@UserRole <> 'TA')
+        OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=Allowed.CourseID)
+    ORDER BY AttendanceID DESC;
+END
+GO
+
+
+/* =========================================================
+   FIX #9: Bulk attendance for a whole roster in one call
+   - roster comes in as a table-valued parameter
+   - role / course / TA-assignment checked once for the batch
+   - student + enrollment checked set-based per row
+   - valid rows inserted in one transaction, one result row per input row
+   ========================================================= */
+
+IF TYPE_ID('dbo.AttendanceRosterType') IS NULL
+BEGIN
+    CREATE TYPE dbo.AttendanceRosterType AS TABLE (
+        RowNo      INT NOT NULL PRIMARY KEY,
+        StudentID  INT NOT NULL,
+        Status     BIT NOT NULL
+    );
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_RecordAttendanceBatch
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @CourseID INT,
+    @Roster dbo.AttendanceRosterType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA')
+    BEGIN
+        RAISERROR('Access Denied: cannot edit attendance.',16,1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM dbo.COURSE WHERE CourseID=@CourseID)
+    BEGIN
+        RAISERROR('Course not found.',16,1);
+        RETURN;
+    END
+
+    IF @UserRole='TA'
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM dbo.TA_COURSE WHERE TAUserID=@UserID AND CourseID=@CourseID)
+        BEGIN
+            RAISERROR('Access Denied: TA not assigned to this course.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @Result TABLE (
+        RowNo      INT PRIMARY KEY,
+        StudentID  INT NOT NULL,
+        Status     BIT NOT NULL,
+        Error      NVARCHAR(100) NULL
+    );
+
+    INSERT INTO @Result (RowNo, StudentID, Status, Error)
+    SELECT
+        r.RowNo,
+        r.StudentID,
+        r.Status,
+        CASE
+            WHEN s.StudentID IS NULL THEN N'Student not found.'
+            WHEN e.StudentID IS NULL THEN N'Student is not enrolled in this course.'
+            WHEN ROW_NUMBER() OVER (PARTITION BY r.StudentID ORDER BY r.RowNo) > 1 THEN N'Duplicate student in roster.'
+        END
+    FROM @Roster r
+    LEFT JOIN dbo.STUDENT s    ON s.StudentID = r.StudentID
+    LEFT JOIN dbo.ENROLLMENT e ON e.StudentID = r.StudentID AND e.CourseID = @CourseID;
+
+    BEGIN TRANSACTION;
+
+    INSERT INTO dbo.ATTENDANCE (StudentID, CourseID, Status, RecordedByUserID)
+    SELECT StudentID, @CourseID, Status, @UserID
+    FROM @Result
+    WHERE Error IS NULL
+    ORDER BY RowNo;
+
+    COMMIT TRANSACTION;
+
+    SELECT RowNo, StudentID, CAST(CASE WHEN Error IS NULL THEN 1 ELSE 0 END AS BIT) AS Recorded, Error
+    FROM @Result
+    ORDER BY RowNo;
+END
+GO
+
+GRANT EXECUTE ON TYPE::dbo.AttendanceRosterType TO Admin;
+GRANT EXECUTE ON TYPE::dbo.AttendanceRosterType TO Instructor;
+GRANT EXECUTE ON TYPE::dbo.AttendanceRosterType TO TA;
+GRANT EXECUTE ON dbo.sp_RecordAttendanceBatch TO Admin;
+GRANT EXECUTE ON dbo.sp_RecordAttendanceBatch TO Instructor;
+GRANT EXECUTE ON dbo.sp_RecordAttendanceBatch TO TA;
+GO
+
+
+/* =========================================================
+   FIX #10: Bulk grade import + publish a whole course
+   - one key-open, one INSERT ... SELECT, one transaction per batch
+   - same checks as sp_InsertGrade per row (student, course, No Write Down)
+   ========================================================= */
+
+IF TYPE_ID('dbo.GradeImportType') IS NULL
+BEGIN
+    CREATE TYPE dbo.GradeImportType AS TABLE (
+        RowNo      INT NOT NULL PRIMARY KEY,
+        StudentID  INT NOT NULL,
+        CourseID   INT NOT NULL,
+        Grade      DECIMAL(5,2) NOT NULL
+    );
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_InsertGradeBatch
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @Grades dbo.GradeImportType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor')
+    BEGIN
+        RAISERROR('Access Denied: Admin/Instructor only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @Result TABLE (
+        RowNo      INT PRIMARY KEY,
+        StudentID  INT NOT NULL,
+        CourseID   INT NOT NULL,
+        Grade      DECIMAL(5,2) NOT NULL,
+        Error      NVARCHAR(100) NULL
+    );
+
+    INSERT INTO @Result (RowNo, StudentID, CourseID, Grade, Error)
+    SELECT
+        g.RowNo,
+        g.StudentID,
+        g.CourseID,
+        g.Grade,
+        CASE
+            WHEN s.StudentID IS NULL THEN N'Student not found.'
+            WHEN c.CourseID IS NULL THEN N'Course not found.'
+            WHEN @UserClearance < s.ClearanceLevel THEN N'No Write Down violation: insufficient clearance.'
+        END
+    FROM @Grades g
+    LEFT JOIN dbo.STUDENT s ON s.StudentID = g.StudentID
+    LEFT JOIN dbo.COURSE c  ON c.CourseID = g.CourseID;
+
+    OPEN SYMMETRIC KEY SRMS_SymKey
+        DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+    BEGIN TRANSACTION;
+
+    INSERT INTO dbo.GRADES (StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished)
+    SELECT
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), StudentID)),
+        StudentID,
+        CourseID,
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), Grade)),
+        0
+    FROM @Result
+    WHERE Error IS NULL
+    ORDER BY RowNo;
+
+    COMMIT TRANSACTION;
+
+    CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    SELECT RowNo, StudentID, CourseID, CAST(CASE WHEN Error IS NULL THEN 1 ELSE 0 END AS BIT) AS Inserted, Error
+    FROM @Result
+    ORDER BY RowNo;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_PublishCourseGrades
+    @UserRole NVARCHAR(50),
+    @CourseID INT,
+    @Publish BIT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor')
+    BEGIN
+        RAISERROR('Access Denied: Admin/Instructor only.',16,1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM dbo.COURSE WHERE CourseID=@CourseID)
+    BEGIN
+        RAISERROR('Course not found.',16,1);
+        RETURN;
+    END
+
+    -- only rows whose flag actually changes (keeps PublishedDate of already-published grades)
+    UPDATE dbo.GRADES
+    SET IsPublished = @Publish,
+        PublishedDate = CASE WHEN @Publish=1 THEN SYSUTCDATETIME() ELSE NULL END
+    WHERE CourseID = @CourseID
+      AND IsPublished <> @Publish;
+
+    SELECT @@ROWCOUNT AS Updated;
+END
+GO
+
+GRANT EXECUTE ON TYPE::dbo.GradeImportType TO Admin;
+GRANT EXECUTE ON TYPE::dbo.GradeImportType TO Instructor;
+GRANT EXECUTE ON dbo.sp_InsertGradeBatch TO Admin;
+GRANT EXECUTE ON dbo.sp_InsertGradeBatch TO Instructor;
+GRANT EXECUTE ON dbo.sp_PublishCourseGrades TO Admin;
+GRANT EXECUTE ON dbo.sp_PublishCourseGrades TO Instructor;
+GO
+
+
+/* =========================================================
+   FIX #11: Public course catalog version (for app-side caching)
+   - any change to COURSE bumps CATALOG_VERSION.Version
+   - sp_Guest_CatalogVersion is a single-row read the app can poll
+     cheaply before deciding to re-run sp_Guest_ViewPublicCourses
+   ========================================================= */
+
+IF OBJECT_ID('dbo.CATALOG_VERSION', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.CATALOG_VERSION (
+        ID        INT NOT NULL PRIMARY KEY CHECK (ID = 1),
+        Version   BIGINT NOT NULL,
+        ChangedAt DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+    INSERT INTO dbo.CATALOG_VERSION (ID, Version) VALUES (1, 1);
+END
+GO
+
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.CATALOG_VERSION TO PUBLIC;
+GO
+
+CREATE OR ALTER TRIGGER dbo.trg_COURSE_CatalogVersion
+ON dbo.COURSE
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    UPDATE dbo.CATALOG_VERSION
+    SET Version = Version + 1,
+        ChangedAt = SYSUTCDATETIME()
+    WHERE ID = 1;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_Guest_CatalogVersion
+    @UserRole NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Guest','Student','TA','Instructor','Admin')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    SELECT Version
+    FROM dbo.CATALOG_VERSION
+    WHERE ID = 1;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_Guest_CatalogVersion TO Admin;
+GRANT EXECUTE ON dbo.sp_Guest_CatalogVersion TO Instructor;
+GRANT EXECUTE ON dbo.sp_Guest_CatalogVersion TO TA;
+GRANT EXECUTE ON dbo.sp_Guest_CatalogVersion TO Student;
+GRANT EXECUTE ON dbo.sp_Guest_CatalogVersion TO Guest;
+GO
+
+
+/* =========================================================
+   FIX #12: Incremental per-course grade aggregates
+   - GRADE_STATS keeps count / sum / min / max + a 10-bucket histogram
+     (Hist0 = 0-9.99 ... Hist9 = 90-100) per course
+   - trg_GRADES_Stats applies each insert/update/delete as a delta in
+     the same transaction (so sp_InsertGrade, sp_InsertGradeBatch and
+     cascaded deletes are all covered)
+   - min/max are recomputed for a course only when a deleted grade
+     was its current min or max
+   - vw_AvgGrades_Safe + sp_ViewCourseGradeStats read the aggregates,
+     still only for courses with COUNT >= 3 (inference control)
+   ========================================================= */
+
+IF OBJECT_ID('dbo.GRADE_STATS', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.GRADE_STATS (
+        CourseID     INT NOT NULL PRIMARY KEY,
+        GradeCount   INT NOT NULL DEFAULT 0,
+        GradeSum     DECIMAL(18,2) NOT NULL DEFAULT 0,
+        GradeMin     DECIMAL(5,2) NULL,
+        GradeMax     DECIMAL(5,2) NULL,
+        Hist0       INT NOT NULL DEFAULT 0,
+        Hist1       INT NOT NULL DEFAULT 0,
+        Hist2       INT NOT NULL DEFAULT 0,
+        Hist3       INT NOT NULL DEFAULT 0,
+        Hist4       INT NOT NULL DEFAULT 0,
+        Hist5       INT NOT NULL DEFAULT 0,
+        Hist6       INT NOT NULL DEFAULT 0,
+        Hist7       INT NOT NULL DEFAULT 0,
+        Hist8       INT NOT NULL DEFAULT 0,
+        Hist9       INT NOT NULL DEFAULT 0,
+        CONSTRAINT FK_GradeStats_Course FOREIGN KEY (CourseID) REFERENCES dbo.COURSE(CourseID) ON DELETE CASCADE
+    );
+END
+GO
+
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.GRADE_STATS TO PUBLIC;
+GO
+
+CREATE OR ALTER TRIGGER dbo.trg_GRADES_Stats
+ON dbo.GRADES
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+
+    -- publish/unpublish updates don't touch the aggregates
+    IF EXISTS (SELECT 1 FROM inserted) AND EXISTS (SELECT 1 FROM deleted)
+       AND NOT (UPDATE(GradeValueEncrypted) OR UPDATE(CourseID))
+        RETURN;
+
+    -- reuse the caller's open key; open (and later close) it only if needed
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    ;WITH Changes AS (
+        SELECT CourseID, CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade, 1 AS Sign
+        FROM inserted
+        UNION ALL
+        SELECT CourseID, CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade, -1 AS Sign
+        FROM deleted
+    ),
+    Bucketed AS (
+        SELECT
+            CourseID, Grade, Sign,
+            CASE WHEN Grade >= 90 THEN 9 WHEN Grade < 0 THEN 0 ELSE CAST(FLOOR(Grade / 10) AS INT) END AS Bucket
+        FROM Changes
+        WHERE Grade IS NOT NULL
+    )
+    SELECT
+        CourseID,
+        SUM(Sign) AS dCount,
+        SUM(Sign * Grade) AS dSum,
+        MIN(CASE WHEN Sign = 1 THEN Grade END) AS InsMin,
+        MAX(CASE WHEN Sign = 1 THEN Grade END) AS InsMax,
+        MIN(CASE WHEN Sign = -1 THEN Grade END) AS DelMin,
+        MAX(CASE WHEN Sign = -1 THEN Grade END) AS DelMax,
+        SUM(CASE WHEN Bucket = 0 THEN Sign ELSE 0 END) AS dHist0,
+        SUM(CASE WHEN Bucket = 1 THEN Sign ELSE 0 END) AS dHist1,
+        SUM(CASE WHEN Bucket = 2 THEN Sign ELSE 0 END) AS dHist2,
+        SUM(CASE WHEN Bucket = 3 THEN Sign ELSE 0 END) AS dHist3,
+        SUM(CASE WHEN Bucket = 4 THEN Sign ELSE 0 END) AS dHist4,
+        SUM(CASE WHEN Bucket = 5 THEN Sign ELSE 0 END) AS dHist5,
+        SUM(CASE WHEN Bucket = 6 THEN Sign ELSE 0 END) AS dHist6,
+        SUM(CASE WHEN Bucket = 7 THEN Sign ELSE 0 END) AS dHist7,
+        SUM(CASE WHEN Bucket = 8 THEN Sign ELSE 0 END) AS dHist8,
+        SUM(CASE WHEN Bucket = 9 THEN Sign ELSE 0 END) AS dHist9
+    INTO #Delta
+    FROM Bucketed
+    GROUP BY CourseID;
+
+    INSERT INTO dbo.GRADE_STATS (CourseID)
+    SELECT d.CourseID
+    FROM #Delta d
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.GRADE_STATS s WHERE s.CourseID = d.CourseID)
+      AND EXISTS (SELECT 1 FROM dbo.COURSE c WHERE c.CourseID = d.CourseID);
+
+    UPDATE s
+    SET GradeCount = s.GradeCount + d.dCount,
+        GradeSum = s.GradeSum + d.dSum,
+        GradeMin = CASE WHEN d.InsMin IS NOT NULL AND (s.GradeMin IS NULL OR d.InsMin < s.GradeMin) THEN d.InsMin ELSE s.GradeMin END,
+        GradeMax = CASE WHEN d.InsMax IS NOT NULL AND (s.GradeMax IS NULL OR d.InsMax > s.GradeMax) THEN d.InsMax ELSE s.GradeMax END,
+        Hist0 = s.Hist0 + d.dHist0,
+        Hist1 = s.Hist1 + d.dHist1,
+        Hist2 = s.Hist2 + d.dHist2,
+        Hist3 = s.Hist3 + d.dHist3,
+        Hist4 = s.Hist4 + d.dHist4,
+        Hist5 = s.Hist5 + d.dHist5,
+        Hist6 = s.Hist6 + d.dHist6,
+        Hist7 = s.Hist7 + d.dHist7,
+        Hist8 = s.Hist8 + d.dHist8,
+        Hist9 = s.Hist9 + d.dHist9
+    FROM dbo.GRADE_STATS s
+    JOIN #Delta d ON d.CourseID = s.CourseID;
+
+    -- a removed grade was the min or max: rescan just that course
+    UPDATE s
+    SET GradeMin = x.MinGrade,
+        GradeMax = x.MaxGrade
+    FROM dbo.GRADE_STATS s
+    JOIN #Delta d ON d.CourseID = s.CourseID
+    CROSS APPLY (
+        SELECT
+            MIN(CAST(DecryptByKey(g.GradeValueEncrypted) AS DECIMAL(5,2))) AS MinGrade,
+            MAX(CAST(DecryptByKey(g.GradeValueEncrypted) AS DECIMAL(5,2))) AS MaxGrade
+        FROM dbo.GRADES g
+        WHERE g.CourseID = s.CourseID
+    ) x
+    WHERE d.DelMin IS NOT NULL
+      AND (d.DelMin <= s.GradeMin OR d.DelMax >= s.GradeMax OR s.GradeCount = 0);
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+-- Migration: rebuild the aggregates from the current GRADES rows (safe to re-run)
+BEGIN TRANSACTION;
+
+OPEN SYMMETRIC KEY SRMS_SymKey
+    DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+DELETE FROM dbo.GRADE_STATS;
+
+;WITH G AS (
+    SELECT CourseID, CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade
+    FROM dbo.GRADES WITH (TABLOCKX, HOLDLOCK)
+),
+B AS (
+    SELECT
+        CourseID, Grade,
+        CASE WHEN Grade >= 90 THEN 9 WHEN Grade < 0 THEN 0 ELSE CAST(FLOOR(Grade / 10) AS INT) END AS Bucket
+    FROM G
+    WHERE Grade IS NOT NULL
+)
+INSERT INTO dbo.GRADE_STATS (CourseID, GradeCount, GradeSum, GradeMin, GradeMax, Hist0, Hist1, Hist2, Hist3, Hist4, Hist5, Hist6, Hist7, Hist8, Hist9)
+SELECT
+    CourseID, COUNT(*), SUM(Grade), MIN(Grade), MAX(Grade),
+    SUM(CASE WHEN Bucket = 0 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 1 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 2 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 3 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 4 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 5 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 6 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 7 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 8 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 9 THEN 1 ELSE 0 END)
+FROM B
+GROUP BY CourseID;
+
+CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+COMMIT TRANSACTION;
+GO
+
+-- Same contract as before (CourseID, AvgGrade, RecordsCount), now O(courses)
+CREATE OR ALTER VIEW dbo.vw_AvgGrades_Safe
+AS
+SELECT
+    CourseID,
+    CAST(GradeSum / GradeCount AS DECIMAL(5,2)) AS AvgGrade,
+    GradeCount AS RecordsCount
+FROM dbo.GRADE_STATS
+WHERE GradeCount >= 3;
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewCourseGradeStats
+    @UserRole NVARCHAR(50),
+    @CourseID INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor')
+    BEGIN
+        RAISERROR('Access Denied: Admin/Instructor only.',16,1);
+        RETURN;
+    END
+
+    SELECT
+        CourseID,
+        GradeCount AS RecordsCount,
+        CAST(GradeSum / GradeCount AS DECIMAL(5,2)) AS AvgGrade,
+        GradeMin AS MinGrade,
+        GradeMax AS MaxGrade,
+        Hist0,
+        Hist1,
+        Hist2,
+        Hist3,
+        Hist4,
+        Hist5,
+        Hist6,
+        Hist7,
+        Hist8,
+        Hist9
+    FROM dbo.GRADE_STATS
+    WHERE GradeCount >= 3
+      AND (@CourseID IS NULL OR CourseID = @CourseID)
+    ORDER BY CourseID;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_ViewCourseGradeStats TO Admin;
+GRANT EXECUTE ON dbo.sp_ViewCourseGradeStats TO Instructor;
+GO
+
+
+/* =========================================================
+   FIX #13: Index pack for the hot query paths
+   - every index is created only if missing (safe to re-run)
+   - ATTENDANCE: seeks for the StudentID / CourseID filters of
+     sp_ViewAttendance, keyed newest-first to match the keyset paging
+   - STUDENT: narrow (ClearanceLevel, StudentID) index for the MLS join
+   - GRADES: student view (StudentID, IsPublished) + per-course paths
+     (sp_PublishCourseGrades, trg_GRADES_Stats rescans)
+   - ROLE_REQUESTS: filtered index on the small Pending subset
+   - TA_COURSE needs nothing new: UQ_TACourse (TAUserID, CourseID)
+     already serves the per-row EXISTS check as a seek
+   - before/after timings: Queries/Benchmarks.sql section 3
+   ========================================================= */
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ATTENDANCE_Student' AND object_id = OBJECT_ID('dbo.ATTENDANCE'))
+BEGIN
+    CREATE INDEX IX_ATTENDANCE_Student
+        ON dbo.ATTENDANCE (StudentID, AttendanceID DESC)
+        INCLUDE (CourseID, Status, DateRecorded, RecordedByUserID);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ATTENDANCE_Course' AND object_id = OBJECT_ID('dbo.ATTENDANCE'))
+BEGIN
+    CREATE INDEX IX_ATTENDANCE_Course
+        ON dbo.ATTENDANCE (CourseID, AttendanceID DESC)
+        INCLUDE (StudentID, Status, DateRecorded, RecordedByUserID);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_STUDENT_Clearance' AND object_id = OBJECT_ID('dbo.STUDENT'))
+BEGIN
+    CREATE INDEX IX_STUDENT_Clearance
+        ON dbo.STUDENT (ClearanceLevel, StudentID);
+END
+GO
+
+-- covering for the student grade view (the included column is still ciphertext)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_GRADES_Student_Published' AND object_id = OBJECT_ID('dbo.GRADES'))
+BEGIN
+    CREATE INDEX IX_GRADES_Student_Published
+        ON dbo.GRADES (StudentID, IsPublished, GradeID DESC)
+        INCLUDE (CourseID, GradeValueEncrypted, DateEntered, PublishedDate);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_GRADES_Course' AND object_id = OBJECT_ID('dbo.GRADES'))
+BEGIN
+    CREATE INDEX IX_GRADES_Course
+        ON dbo.GRADES (CourseID)
+        INCLUDE (IsPublished);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ROLE_REQUESTS_Pending' AND object_id = OBJECT_ID('dbo.ROLE_REQUESTS'))
+BEGIN
+    CREATE INDEX IX_ROLE_REQUESTS_Pending
+        ON dbo.ROLE_REQUESTS (RequestDate DESC)
+        INCLUDE (UserID, CurrentRole, RequestedRole, Reason, Status)
+        WHERE Status = 'Pending';
+END
+GO
+
+
+/* =========================================================
+   FIX #14: Session-scoped symmetric key (optional, DB_SESSION_KEY=yes)
+   - sp_Session_OpenKey opens SRMS_SymKey for the calling session
+     only if it is not open yet (the pool calls it once per connection
+     and again in its reset, which is then a no-op)
+   - the key procs below open/close the key only when the session
+     does not already have it open, so a pooled connection skips the
+     certificate decrypt on every call; with the key closed they
+     behave exactly as before (open -> work -> close)
+   - keys are session state: the pool closes all other keys when a
+     connection is returned, and a dropped connection loses its keys
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_Session_OpenKey
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_Session_OpenKey TO Admin;
+GRANT EXECUTE ON dbo.sp_Session_OpenKey TO Instructor;
+GRANT EXECUTE ON dbo.sp_Session_OpenKey TO TA;
+GRANT EXECUTE ON dbo.sp_Session_OpenKey TO Student;
+GRANT EXECUTE ON dbo.sp_Session_OpenKey TO Guest;
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_AuthUser
+    @Role NVARCHAR(50),
+    @UsernamePlain NVARCHAR(100),
+    @PasswordPlain NVARCHAR(100)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    DECLARE @Hash VARBINARY(32) = dbo.fn_UsernameHash(@UsernamePlain);
+
+    ;WITH Candidates AS (
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash = @Hash
+        UNION ALL
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash IS NULL
+    ),
+    U AS (
+        SELECT
+            UserID,
+            CONVERT(NVARCHAR(100), DecryptByKey(UsernameEncrypted)) AS UsernamePlain,
+            CONVERT(NVARCHAR(100), DecryptByKey(PasswordEncrypted)) AS PasswordPlain,
+            Role,
+            ClearanceLevel
+        FROM Candidates
+        WHERE Role = @Role
+    )
+    SELECT TOP 1 UserID, Role, ClearanceLevel
+    FROM U
+    WHERE UsernamePlain = @UsernamePlain
+      AND (
+            (@Role='Guest' AND (PasswordPlain = '' OR @PasswordPlain = '' OR @PasswordPlain IS NULL))
+            OR
+            (@Role<>'Guest' AND PasswordPlain = @PasswordPlain)
+          );
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_AuthUserAnyRole
+    @UsernamePlain NVARCHAR(100),
+    @PasswordPlain NVARCHAR(100)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    DECLARE @Hash VARBINARY(32) = dbo.fn_UsernameHash(@UsernamePlain);
+
+    ;WITH Candidates AS (
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash = @Hash
+        UNION ALL
+        SELECT UserID, UsernameEncrypted, PasswordEncrypted, Role, ClearanceLevel
+        FROM dbo.USERS
+        WHERE UsernameHash IS NULL
+    ),
+    U AS (
+        SELECT
+            UserID,
+            CONVERT(NVARCHAR(100), DecryptByKey(UsernameEncrypted)) AS UsernamePlain,
+            CONVERT(NVARCHAR(100), DecryptByKey(PasswordEncrypted)) AS PasswordPlain,
+            Role,
+            ClearanceLevel
+        FROM Candidates
+        WHERE Role IN ('Admin','Instructor','TA','Student')
+    )
+    SELECT TOP 1 UserID, Role, ClearanceLevel
+    FROM U
+    WHERE UsernamePlain = @UsernamePlain
+      AND PasswordPlain = @PasswordPlain
+    ORDER BY
+        CASE Role WHEN 'Admin' THEN 1 WHEN 'Instructor' THEN 2 WHEN 'TA' THEN 3 ELSE 4 END,
+        UserID;
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewGrades
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @AfterID INT = NULL,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','Student')
+    BEGIN
+        RAISERROR('Access Denied: Grades not allowed for this role.',16,1);
+        RETURN;
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    IF @UserRole IN ('Admin','Instructor')
+    BEGIN
+        SELECT TOP (@Limit)
+            GradeID,
+            StudentID,
+            CourseID,
+            CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+            IsPublished,
+            DateEntered,
+            PublishedDate
+        FROM dbo.GRADES
+        WHERE GradeID < @AfterID
+        ORDER BY GradeID DESC;
+    END
+    ELSE
+    BEGIN
+        DECLARE @SID INT;
+        SELECT @SID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @SID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            IF @OpenedHere = 1
+                CLOSE SYMMETRIC KEY SRMS_SymKey;
+            RETURN;
+        END
+
+        SELECT TOP (@Limit)
+            GradeID,
+            StudentID,
+            CourseID,
+            CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+            IsPublished,
+            DateEntered,
+            PublishedDate
+        FROM dbo.GRADES
+        WHERE StudentID = @SID
+          AND IsPublished = 1
+          AND GradeID < @AfterID
+        ORDER BY GradeID DESC;
+    END
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_InsertGrade
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT,
+    @CourseID INT,
+    @Grade DECIMAL(5,2)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor')
+    BEGIN
+        RAISERROR('Access Denied: Admin/Instructor only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @StudentClearance INT;
+    SELECT @StudentClearance = ClearanceLevel
+    FROM dbo.STUDENT
+    WHERE StudentID = @StudentID;
+
+    IF @StudentClearance IS NULL
+    BEGIN
+        RAISERROR('Student not found.',16,1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM dbo.COURSE WHERE CourseID=@CourseID)
+    BEGIN
+        RAISERROR('Course not found.',16,1);
+        RETURN;
+    END
+
+    IF @UserClearance < @StudentClearance
+    BEGIN
+        RAISERROR('No Write Down violation: insufficient clearance.',16,1);
+        RETURN;
+    END
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    INSERT INTO dbo.GRADES (StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished)
+    VALUES (
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), @StudentID)),
+        @StudentID,
+        @CourseID,
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), @Grade)),
+        0
+    );
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_InsertGradeBatch
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @Grades dbo.GradeImportType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor')
+    BEGIN
+        RAISERROR('Access Denied: Admin/Instructor only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @Result TABLE (
+        RowNo      INT PRIMARY KEY,
+        StudentID  INT NOT NULL,
+        CourseID   INT NOT NULL,
+        Grade      DECIMAL(5,2) NOT NULL,
+        Error      NVARCHAR(100) NULL
+    );
+
+    INSERT INTO @Result (RowNo, StudentID, CourseID, Grade, Error)
+    SELECT
+        g.RowNo,
+        g.StudentID,
+        g.CourseID,
+        g.Grade,
+        CASE
+            WHEN s.StudentID IS NULL THEN N'Student not found.'
+            WHEN c.CourseID IS NULL THEN N'Course not found.'
+            WHEN @UserClearance < s.ClearanceLevel THEN N'No Write Down violation: insufficient clearance.'
+        END
+    FROM @Grades g
+    LEFT JOIN dbo.STUDENT s ON s.StudentID = g.StudentID
+    LEFT JOIN dbo.COURSE c  ON c.CourseID = g.CourseID;
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    BEGIN TRANSACTION;
+
+    INSERT INTO dbo.GRADES (StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished)
+    SELECT
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), StudentID)),
+        StudentID,
+        CourseID,
+        EncryptByKey(Key_GUID('SRMS_SymKey'), CONVERT(VARBINARY(16), Grade)),
+        0
+    FROM @Result
+    WHERE Error IS NULL
+    ORDER BY RowNo;
+
+    COMMIT TRANSACTION;
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    SELECT RowNo, StudentID, CourseID, CAST(CASE WHEN Error IS NULL THEN 1 ELSE 0 END AS BIT) AS Inserted, Error
+    FROM @Result
+    ORDER BY RowNo;
+END
+GO
+
+
+/* =========================================================
+   FIX #15: Student landing page in one round trip
+   - resolves UserID -> StudentID once, then returns three result sets:
+       1) profile     (same columns as sp_ViewStudent_Profile)
+       2) grades      (published only, same columns as sp_ViewGrades)
+       3) attendance  (same columns as sp_ViewAttendance)
+   - same clearance rule as the single procs (ClearanceLevel <= @UserClearance)
+   - @Limit caps grades + attendance (newest first); NULL = all
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_Student_Overview
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Student'
+    BEGIN
+        RAISERROR('Access Denied: Student only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @SID INT;
+    SELECT @SID = StudentID
+    FROM dbo.USERS
+    WHERE UserID = @UserID AND Role = 'Student';
+
+    IF @SID IS NULL
+    BEGIN
+        RAISERROR('Student identity not linked to this account.',16,1);
+        RETURN;
+    END
+
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    -- 1) profile
+    SELECT StudentID, FullName, Email, DOB, Department, ClearanceLevel
+    FROM dbo.STUDENT
+    WHERE StudentID = @SID
+      AND ClearanceLevel <= @UserClearance;
+
+    -- 2) published grades
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    SELECT TOP (@Limit)
+        GradeID,
+        StudentID,
+        CourseID,
+        CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+        IsPublished,
+        DateEntered,
+        PublishedDate
+    FROM dbo.GRADES
+    WHERE StudentID = @SID
+      AND IsPublished = 1
+    ORDER BY GradeID DESC;
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    -- 3) attendance
+    SELECT TOP (@Limit) a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID
+    FROM dbo.ATTENDANCE a
+    JOIN dbo.STUDENT s ON s.StudentID = a.StudentID
+    WHERE a.StudentID = @SID
+      AND s.ClearanceLevel <= @UserClearance
+    ORDER BY a.AttendanceID DESC;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_Student_Overview TO Student;
+GO
+
+
+/* =========================================================
+   FIX #16: Attendance delta feed (?since_id= and the live stream)
+   - rows with AttendanceID > @SinceID, oldest first, so the client
+     can keep the last ID it saw and ask again for only what is new
+   - same rules as sp_ViewAttendance: clearance filter, TAs only see
+     their TA_COURSE courses, Students only their own rows
+   - the per-course branch is what the live stream polls; it seeks
+     IX_ATTENDANCE_Course (FIX #13) instead of scanning
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendanceSince
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @SinceID INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @SinceID = ISNULL(@SinceID, 0);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    IF @CourseID IS NOT NULL
+    BEGIN
+        SELECT TOP (@Limit) a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID
+        FROM dbo.ATTENDANCE a
+        JOIN dbo.STUDENT s ON s.StudentID = a.StudentID
+        WHERE a.CourseID = @CourseID
+          AND a.AttendanceID > @SinceID
+          AND s.ClearanceLevel <= @UserClearance
+          AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+          AND (@UserRole <> 'TA'
+               OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=@CourseID))
+        ORDER BY a.AttendanceID;
+        RETURN;
+    END
+
+    SELECT TOP (@Limit) a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID
+    FROM dbo.ATTENDANCE a
+    JOIN dbo.STUDENT s ON s.StudentID = a.StudentID
+    WHERE a.AttendanceID > @SinceID
+      AND s.ClearanceLevel <= @UserClearance
+      AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+      AND (@UserRole <> 'TA'
+           OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=a.CourseID))
+    ORDER BY a.AttendanceID;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSince TO Admin;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSince TO Instructor;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSince TO TA;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSince TO Student;
+GO
+
+
+/* =========================================================
+   FIX #17: Role-request procs return the row they changed
+   - the app publishes these as live events to the admin queue
+     (/api/admin/role-requests/stream) instead of reloading the list
+   - sp_RequestRoleUpgrade: the new request (same columns as
+     sp_Admin_ListPendingRoleRequests)
+   - sp_Admin_ApproveRoleRequest: RequestID, UserID, NewRole
+     (lets every worker drop just that user's cached /api/me)
+   - access rules unchanged
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_RequestRoleUpgrade
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @RequestedRole NVARCHAR(50),
+    @Reason NVARCHAR(255)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Student','TA')
+    BEGIN
+        RAISERROR('Only Student/TA can submit upgrade requests.',16,1);
+        RETURN;
+    END
+
+    DECLARE @CurrentRole NVARCHAR(50);
+    SELECT @CurrentRole = Role FROM dbo.USERS WHERE UserID=@UserID;
+
+    INSERT INTO dbo.ROLE_REQUESTS (UserID, CurrentRole, RequestedRole, Reason)
+    VALUES (@UserID, @CurrentRole, @RequestedRole, @Reason);
+
+    SELECT RequestID, UserID, CurrentRole, RequestedRole, Reason, RequestDate, Status
+    FROM dbo.ROLE_REQUESTS
+    WHERE RequestID = SCOPE_IDENTITY();
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_ApproveRoleRequest
+    @UserRole NVARCHAR(50),
+    @RequestID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @UserID INT, @NewRole NVARCHAR(50);
+
+    SELECT @UserID=UserID, @NewRole=RequestedRole
+    FROM dbo.ROLE_REQUESTS
+    WHERE RequestID=@RequestID AND Status='Pending';
+
+    IF @UserID IS NULL
+    BEGIN
+        RAISERROR('Invalid RequestID or request not Pending.',16,1);
+        RETURN;
+    END
+
+    UPDATE dbo.USERS SET Role=@NewRole WHERE UserID=@UserID;
+    UPDATE dbo.ROLE_REQUESTS SET Status='Approved' WHERE RequestID=@RequestID;
+
+    SELECT @RequestID AS RequestID, @UserID AS UserID, @NewRole AS NewRole;
+END
+GO
+
+
+/* =========================================================
+   FIX #18: Attendance rollups per (StudentID, CourseID)
+   - ATTENDANCE_ROLLUP keeps present/absent counts, last seen
+     (newest Present), last recorded, current + longest present streak
+   - trg_ATTENDANCE_Rollup applies each insert as a delta in the same
+     transaction (sp_RecordAttendance and sp_RecordAttendanceBatch are
+     both covered); the cost depends on the inserted rows only
+   - updates/deletes (not done by the app, but cascades exist) rebuild
+     just the pairs they touched from fn_AttendanceRollup
+   - sp_ViewAttendanceSummary: same access rules as sp_ViewAttendance
+     (clearance, TA course assignment, Student = own rows), one row per
+     student/course however long the term gets
+   - sp_Student_Overview gets the student's rollups as a 4th result set
+   ========================================================= */
+
+IF OBJECT_ID('dbo.ATTENDANCE_ROLLUP', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ATTENDANCE_ROLLUP (
+        StudentID         INT NOT NULL,
+        CourseID          INT NOT NULL,
+        PresentCount      INT NOT NULL DEFAULT 0,
+        AbsentCount       INT NOT NULL DEFAULT 0,
+        CurrentStreak     INT NOT NULL DEFAULT 0,
+        LongestStreak     INT NOT NULL DEFAULT 0,
+        LastPresentAt     DATETIME2 NULL,
+        LastRecordedAt    DATETIME2 NULL,
+        LastAttendanceID  INT NULL,
+        CONSTRAINT PK_ATTENDANCE_ROLLUP PRIMARY KEY (StudentID, CourseID),
+        CONSTRAINT FK_AttRollup_Student FOREIGN KEY (StudentID) REFERENCES dbo.STUDENT(StudentID) ON DELETE CASCADE,
+        CONSTRAINT FK_AttRollup_Course  FOREIGN KEY (CourseID)  REFERENCES dbo.COURSE(CourseID) ON DELETE CASCADE
+    );
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ATTENDANCE_ROLLUP_Course' AND object_id = OBJECT_ID('dbo.ATTENDANCE_ROLLUP'))
+BEGIN
+    CREATE INDEX IX_ATTENDANCE_ROLLUP_Course
+        ON dbo.ATTENDANCE_ROLLUP (CourseID)
+        INCLUDE (PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastPresentAt, LastRecordedAt, LastAttendanceID);
+END
+GO
+
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.ATTENDANCE_ROLLUP TO PUBLIC;
+GO
+
+-- Rollup computed from scratch (migration + the update/delete path); inline, so a
+-- join on (StudentID, CourseID) only reads those pairs
+CREATE OR ALTER FUNCTION dbo.fn_AttendanceRollup()
+RETURNS TABLE
+AS
+RETURN
+    WITH A AS (
+        SELECT
+            StudentID, CourseID, AttendanceID, Status, DateRecorded,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID ORDER BY AttendanceID) AS rn,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID, Status ORDER BY AttendanceID) AS rs,
+            COUNT(*) OVER (PARTITION BY StudentID, CourseID) AS n
+        FROM dbo.ATTENDANCE
+    ),
+    Runs AS (
+        -- islands of consecutive Present rows
+        SELECT StudentID, CourseID, COUNT(*) AS Len, MAX(rn) AS LastRn, MAX(n) AS n
+        FROM A
+        WHERE Status = 1
+        GROUP BY StudentID, CourseID, rn - rs
+    ),
+    Streaks AS (
+        SELECT
+            StudentID, CourseID,
+            MAX(Len) AS LongestStreak,
+            MAX(CASE WHEN LastRn = n THEN Len ELSE 0 END) AS CurrentStreak
+        FROM Runs
+        GROUP BY StudentID, CourseID
+    ),
+    Totals AS (
+        SELECT
+            StudentID, CourseID,
+            SUM(CASE WHEN Status = 1 THEN 1 ELSE 0 END) AS PresentCount,
+            SUM(CASE WHEN Status = 0 THEN 1 ELSE 0 END) AS AbsentCount,
+            MAX(CASE WHEN Status = 1 THEN DateRecorded END) AS LastPresentAt,
+            MAX(DateRecorded) AS LastRecordedAt,
+            MAX(AttendanceID) AS LastAttendanceID
+        FROM A
+        GROUP BY StudentID, CourseID
+    )
+    SELECT
+        t.StudentID, t.CourseID, t.PresentCount, t.AbsentCount,
+        ISNULL(s.CurrentStreak, 0) AS CurrentStreak,
+        ISNULL(s.LongestStreak, 0) AS LongestStreak,
+        t.LastPresentAt, t.LastRecordedAt, t.LastAttendanceID
+    FROM Totals t
+    LEFT JOIN Streaks s ON s.StudentID = t.StudentID AND s.CourseID = t.CourseID;
+GO
+
+CREATE OR ALTER TRIGGER dbo.trg_ATTENDANCE_Rollup
+ON dbo.ATTENDANCE
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+
+    IF EXISTS (SELECT 1 FROM deleted)
+    BEGIN
+        -- rare path: rebuild the touched pairs
+        SELECT StudentID, CourseID INTO #Pairs FROM deleted
+        UNION
+        SELECT StudentID, CourseID FROM inserted;
+
+        DELETE r
+        FROM dbo.ATTENDANCE_ROLLUP r
+        JOIN #Pairs p ON p.StudentID = r.StudentID AND p.CourseID = r.CourseID;
+
+        INSERT INTO dbo.ATTENDANCE_ROLLUP
+            (StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+             LastPresentAt, LastRecordedAt, LastAttendanceID)
+        SELECT f.StudentID, f.CourseID, f.PresentCount, f.AbsentCount, f.CurrentStreak, f.LongestStreak,
+               f.LastPresentAt, f.LastRecordedAt, f.LastAttendanceID
+        FROM dbo.fn_AttendanceRollup() f
+        JOIN #Pairs p ON p.StudentID = f.StudentID AND p.CourseID = f.CourseID;
+        RETURN;
+    END
+
+    -- inserts: fold the new rows (in AttendanceID order) into each pair's rollup
+    ;WITH I AS (
+        SELECT
+            StudentID, CourseID, AttendanceID, Status, DateRecorded,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID ORDER BY AttendanceID) AS rn,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID, Status ORDER BY AttendanceID) AS rs,
+            COUNT(*) OVER (PARTITION BY StudentID, CourseID) AS n
+        FROM inserted
+    ),
+    Runs AS (
+        SELECT StudentID, CourseID, COUNT(*) AS Len, MIN(rn) AS FirstRn, MAX(rn) AS LastRn, MAX(n) AS n
+        FROM I
+        WHERE Status = 1
+        GROUP BY StudentID, CourseID, rn - rs
+    ),
+    RunAgg AS (
+        SELECT
+            StudentID, CourseID,
+            MAX(Len) AS MaxRun,
+            MAX(CASE WHEN FirstRn = 1 THEN Len ELSE 0 END) AS LeadRun,   -- continues the old streak
+            MAX(CASE WHEN LastRn = n THEN Len ELSE 0 END) AS TailRun      -- the new current streak
+        FROM Runs
+        GROUP BY StudentID, CourseID
+    ),
+    Totals AS (
+        SELECT
+            StudentID, CourseID,
+            SUM(CASE WHEN Status = 1 THEN 1 ELSE 0 END) AS dPresent,
+            SUM(CASE WHEN Status = 0 THEN 1 ELSE 0 END) AS dAbsent,
+            MAX(CASE WHEN Status = 1 THEN DateRecorded END) AS LastPresentAt,
+            MAX(DateRecorded) AS LastRecordedAt,
+            MAX(AttendanceID) AS LastAttendanceID
+        FROM I
+        GROUP BY StudentID, CourseID
+    )
+    SELECT t.*, ISNULL(r.MaxRun, 0) AS MaxRun, ISNULL(r.LeadRun, 0) AS LeadRun, ISNULL(r.TailRun, 0) AS TailRun
+    INTO #Delta
+    FROM Totals t
+    LEFT JOIN RunAgg r ON r.StudentID = t.StudentID AND r.CourseID = t.CourseID;
+
+    INSERT INTO dbo.ATTENDANCE_ROLLUP (StudentID, CourseID)
+    SELECT d.StudentID, d.CourseID
+    FROM #Delta d
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ROLLUP r WHERE r.StudentID = d.StudentID AND r.CourseID = d.CourseID);
+
+    UPDATE r
+    SET PresentCount = r.PresentCount + d.dPresent,
+        AbsentCount = r.AbsentCount + d.dAbsent,
+        CurrentStreak = x.NewCurrent,
+        LongestStreak = (SELECT MAX(v) FROM (VALUES (r.LongestStreak), (r.CurrentStreak + d.LeadRun), (d.MaxRun)) s(v)),
+        LastPresentAt = CASE WHEN d.LastPresentAt IS NOT NULL AND (r.LastPresentAt IS NULL OR d.LastPresentAt > r.LastPresentAt)
+                             THEN d.LastPresentAt ELSE r.LastPresentAt END,
+        LastRecordedAt = CASE WHEN r.LastRecordedAt IS NULL OR d.LastRecordedAt > r.LastRecordedAt
+                              THEN d.LastRecordedAt ELSE r.LastRecordedAt END,
+        LastAttendanceID = CASE WHEN r.LastAttendanceID IS NULL OR d.LastAttendanceID > r.LastAttendanceID
+                                THEN d.LastAttendanceID ELSE r.LastAttendanceID END
+    FROM dbo.ATTENDANCE_ROLLUP r
+    JOIN #Delta d ON d.StudentID = r.StudentID AND d.CourseID = r.CourseID
+    CROSS APPLY (
+        SELECT CASE WHEN d.dAbsent = 0 THEN r.CurrentStreak + d.dPresent ELSE d.TailRun END AS NewCurrent
+    ) x;
+END
+GO
+
+-- Migration: rebuild every rollup from the current ATTENDANCE rows (safe to re-run)
+BEGIN TRANSACTION;
+
+DELETE FROM dbo.ATTENDANCE_ROLLUP;
+
+INSERT INTO dbo.ATTENDANCE_ROLLUP
+    (StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+     LastPresentAt, LastRecordedAt, LastAttendanceID)
+SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+       LastPresentAt, LastRecordedAt, LastAttendanceID
+FROM dbo.fn_AttendanceRollup();
+
+COMMIT TRANSACTION;
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendanceSummary
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SELECT
+        r.StudentID,
+        r.CourseID,
+        r.PresentCount,
+        r.AbsentCount,
+        CAST(100.0 * r.PresentCount / NULLIF(r.PresentCount + r.AbsentCount, 0) AS DECIMAL(5,2)) AS AttendanceRate,
+        r.CurrentStreak,
+        r.LongestStreak,
+        r.LastPresentAt,
+        r.LastRecordedAt
+    FROM dbo.ATTENDANCE_ROLLUP r
+    JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+    WHERE s.ClearanceLevel <= @UserClearance
+      AND (@StudentID IS NULL OR r.StudentID = @StudentID)
+      AND (@CourseID  IS NULL OR r.CourseID  = @CourseID)
+      AND (@UserRole <> 'TA'
+           OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=r.CourseID))
+    ORDER BY r.CourseID, r.StudentID
+    OPTION (RECOMPILE);
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSummary TO Admin;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSummary TO Instructor;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSummary TO TA;
+GRANT EXECUTE ON dbo.sp_ViewAttendanceSummary TO Student;
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_Student_Overview
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @Limit INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Student'
+    BEGIN
+        RAISERROR('Access Denied: Student only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @SID INT;
+    SELECT @SID = StudentID
+    FROM dbo.USERS
+    WHERE UserID = @UserID AND Role = 'Student';
+
+    IF @SID IS NULL
+    BEGIN
+        RAISERROR('Student identity not linked to this account.',16,1);
+        RETURN;
+    END
+
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    -- 1) profile
+    SELECT StudentID, FullName, Email, DOB, Department, ClearanceLevel
+    FROM dbo.STUDENT
+    WHERE StudentID = @SID
+      AND ClearanceLevel <= @UserClearance;
+
+    -- 2) published grades
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    SELECT TOP (@Limit)
+        GradeID,
+        StudentID,
+        CourseID,
+        CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+        IsPublished,
+        DateEntered,
+        PublishedDate
+    FROM dbo.GRADES
+    WHERE StudentID = @SID
+      AND IsPublished = 1
+    ORDER BY GradeID DESC;
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    -- 3) attendance
+    SELECT TOP (@Limit) a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID
+    FROM dbo.ATTENDANCE a
+    JOIN dbo.STUDENT s ON s.StudentID = a.StudentID
+    WHERE a.StudentID = @SID
+      AND s.ClearanceLevel <= @UserClearance
+    ORDER BY a.AttendanceID DESC;
+
+    -- 4) attendance rollups (one row per course)
+    SELECT
+        r.StudentID,
+        r.CourseID,
+        r.PresentCount,
+        r.AbsentCount,
+        CAST(100.0 * r.PresentCount / NULLIF(r.PresentCount + r.AbsentCount, 0) AS DECIMAL(5,2)) AS AttendanceRate,
+        r.CurrentStreak,
+        r.LongestStreak,
+        r.LastPresentAt,
+        r.LastRecordedAt
+    FROM dbo.ATTENDANCE_ROLLUP r
+    JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+    WHERE r.StudentID = @SID
+      AND s.ClearanceLevel <= @UserClearance
+    ORDER BY r.CourseID;
+END
+GO
+
+
+
+/* =========================================================
+   FIX #19: Term archive (columnstore history for ATTENDANCE / GRADES)
+   - TERM: [StartDate, EndDate) ranges; a row belongs to the term its
+     DateRecorded / DateEntered falls in
+   - sp_Admin_ArchiveTerm moves an ended term's rows out of the hot
+     rowstore tables into ATTENDANCE_ARCHIVE / GRADES_ARCHIVE
+     (clustered columnstore, one term per insert so rowgroups line up
+     with TermID); sp_Admin_RestoreTerm moves them back, same IDs
+   - the archive tables need SQL Server 2017+ (VARBINARY(MAX) in a
+     columnstore)
+   - sp_ViewGrades / sp_ViewAttendance get @TermID: an open term reads
+     only the hot table (date range), an archived one only the archive;
+     NULL still returns everything, newest first
+   - moves are not changes: a row present in both tables at trigger
+     time is skipped by trg_ATTENDANCE_Rollup / trg_GRADES_Stats, so
+     rollups and grade stats keep covering the full history (they are
+     rebuilt from hot + archive below)
+   - sp_Student_Overview and sp_ViewAttendanceSince stay on the hot
+     tables (current terms / new rows only)
+   ========================================================= */
+
+IF OBJECT_ID('dbo.TERM', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.TERM (
+        TermID      INT IDENTITY(1,1) PRIMARY KEY,
+        TermName    NVARCHAR(50) NOT NULL,
+        StartDate   DATETIME2 NOT NULL,
+        EndDate     DATETIME2 NOT NULL,
+        IsArchived  BIT NOT NULL DEFAULT 0,
+        ArchivedAt  DATETIME2 NULL,
+        CONSTRAINT UQ_Term_Name UNIQUE (TermName),
+        CONSTRAINT CK_Term_Range CHECK (EndDate > StartDate)
+    );
+END
+GO
+
+IF OBJECT_ID('dbo.ATTENDANCE_ARCHIVE', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ATTENDANCE_ARCHIVE (
+        AttendanceID      INT NOT NULL,
+        StudentID         INT NOT NULL,
+        CourseID          INT NOT NULL,
+        Status            BIT NOT NULL,
+        DateRecorded      DATETIME2 NOT NULL,
+        RecordedByUserID  INT NULL,
+        TermID            INT NOT NULL,
+        CONSTRAINT PK_ATTENDANCE_ARCHIVE PRIMARY KEY NONCLUSTERED (AttendanceID),
+        CONSTRAINT FK_AttArchive_Student FOREIGN KEY (StudentID) REFERENCES dbo.STUDENT(StudentID) ON DELETE CASCADE,
+        CONSTRAINT FK_AttArchive_Course  FOREIGN KEY (CourseID)  REFERENCES dbo.COURSE(CourseID) ON DELETE CASCADE,
+        CONSTRAINT FK_AttArchive_User    FOREIGN KEY (RecordedByUserID) REFERENCES dbo.USERS(UserID),
+        CONSTRAINT FK_AttArchive_Term    FOREIGN KEY (TermID) REFERENCES dbo.TERM(TermID),
+        INDEX CCI_ATTENDANCE_ARCHIVE CLUSTERED COLUMNSTORE,
+        INDEX IX_ATTENDANCE_ARCHIVE_Student NONCLUSTERED (StudentID),
+        INDEX IX_ATTENDANCE_ARCHIVE_Course NONCLUSTERED (CourseID)
+    );
+END
+GO
+
+IF OBJECT_ID('dbo.GRADES_ARCHIVE', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.GRADES_ARCHIVE (
+        GradeID              INT NOT NULL,
+        StudentIDEncrypted   VARBINARY(MAX) NOT NULL,
+        StudentID            INT NOT NULL,
+        CourseID             INT NOT NULL,
+        GradeValueEncrypted  VARBINARY(MAX) NULL,
+        IsPublished          BIT NOT NULL,
+        DateEntered          DATETIME2 NOT NULL,
+        PublishedDate        DATETIME2 NULL,
+        TermID               INT NOT NULL,
+        CONSTRAINT PK_GRADES_ARCHIVE PRIMARY KEY NONCLUSTERED (GradeID),
+        CONSTRAINT FK_GradesArchive_Student FOREIGN KEY (StudentID) REFERENCES dbo.STUDENT(StudentID) ON DELETE CASCADE,
+        CONSTRAINT FK_GradesArchive_Course  FOREIGN KEY (CourseID)  REFERENCES dbo.COURSE(CourseID) ON DELETE CASCADE,
+        CONSTRAINT FK_GradesArchive_Term    FOREIGN KEY (TermID) REFERENCES dbo.TERM(TermID),
+        INDEX CCI_GRADES_ARCHIVE CLUSTERED COLUMNSTORE,
+        INDEX IX_GRADES_ARCHIVE_Student NONCLUSTERED (StudentID),
+        INDEX IX_GRADES_ARCHIVE_Course NONCLUSTERED (CourseID)
+    );
+END
+GO
+
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.TERM TO PUBLIC;
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.ATTENDANCE_ARCHIVE TO PUBLIC;
+DENY SELECT, INSERT, UPDATE, DELETE ON dbo.GRADES_ARCHIVE TO PUBLIC;
+GO
+
+-- Same as FIX #18, over hot + archived rows
+CREATE OR ALTER FUNCTION dbo.fn_AttendanceRollup()
+RETURNS TABLE
+AS
+RETURN
+    WITH R AS (
+        SELECT StudentID, CourseID, AttendanceID, Status, DateRecorded FROM dbo.ATTENDANCE
+        UNION ALL
+        SELECT StudentID, CourseID, AttendanceID, Status, DateRecorded FROM dbo.ATTENDANCE_ARCHIVE
+    ),
+    A AS (
+        SELECT
+            StudentID, CourseID, AttendanceID, Status, DateRecorded,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID ORDER BY AttendanceID) AS rn,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID, Status ORDER BY AttendanceID) AS rs,
+            COUNT(*) OVER (PARTITION BY StudentID, CourseID) AS n
+        FROM R
+    ),
+    Runs AS (
+        -- islands of consecutive Present rows
+        SELECT StudentID, CourseID, COUNT(*) AS Len, MAX(rn) AS LastRn, MAX(n) AS n
+        FROM A
+        WHERE Status = 1
+        GROUP BY StudentID, CourseID, rn - rs
+    ),
+    Streaks AS (
+        SELECT
+            StudentID, CourseID,
+            MAX(Len) AS LongestStreak,
+            MAX(CASE WHEN LastRn = n THEN Len ELSE 0 END) AS CurrentStreak
+        FROM Runs
+        GROUP BY StudentID, CourseID
+    ),
+    Totals AS (
+        SELECT
+            StudentID, CourseID,
+            SUM(CASE WHEN Status = 1 THEN 1 ELSE 0 END) AS PresentCount,
+            SUM(CASE WHEN Status = 0 THEN 1 ELSE 0 END) AS AbsentCount,
+            MAX(CASE WHEN Status = 1 THEN DateRecorded END) AS LastPresentAt,
+            MAX(DateRecorded) AS LastRecordedAt,
+            MAX(AttendanceID) AS LastAttendanceID
+        FROM A
+        GROUP BY StudentID, CourseID
+    )
+    SELECT
+        t.StudentID, t.CourseID, t.PresentCount, t.AbsentCount,
+        ISNULL(s.CurrentStreak, 0) AS CurrentStreak,
+        ISNULL(s.LongestStreak, 0) AS LongestStreak,
+        t.LastPresentAt, t.LastRecordedAt, t.LastAttendanceID
+    FROM Totals t
+    LEFT JOIN Streaks s ON s.StudentID = t.StudentID AND s.CourseID = t.CourseID;
+GO
+
+CREATE OR ALTER TRIGGER dbo.trg_ATTENDANCE_Rollup
+ON dbo.ATTENDANCE
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+
+    -- rows also in ATTENDANCE_ARCHIVE are being archived / restored: already counted
+    SELECT i.StudentID, i.CourseID, i.AttendanceID, i.Status, i.DateRecorded
+    INTO #Ins
+    FROM inserted i
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ARCHIVE x WHERE x.AttendanceID = i.AttendanceID);
+
+    SELECT d.StudentID, d.CourseID
+    INTO #Del
+    FROM deleted d
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ARCHIVE x WHERE x.AttendanceID = d.AttendanceID);
+
+    IF EXISTS (SELECT 1 FROM #Del)
+    BEGIN
+        -- rare path: rebuild the touched pairs
+        SELECT StudentID, CourseID INTO #Pairs FROM #Del
+        UNION
+        SELECT StudentID, CourseID FROM #Ins;
+
+        DELETE r
+        FROM dbo.ATTENDANCE_ROLLUP r
+        JOIN #Pairs p ON p.StudentID = r.StudentID AND p.CourseID = r.CourseID;
+
+        INSERT INTO dbo.ATTENDANCE_ROLLUP
+            (StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+             LastPresentAt, LastRecordedAt, LastAttendanceID)
+        SELECT f.StudentID, f.CourseID, f.PresentCount, f.AbsentCount, f.CurrentStreak, f.LongestStreak,
+               f.LastPresentAt, f.LastRecordedAt, f.LastAttendanceID
+        FROM dbo.fn_AttendanceRollup() f
+        JOIN #Pairs p ON p.StudentID = f.StudentID AND p.CourseID = f.CourseID;
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM #Ins)
+        RETURN;
+
+    -- inserts: fold the new rows (in AttendanceID order) into each pair's rollup
+    ;WITH I AS (
+        SELECT
+            StudentID, CourseID, AttendanceID, Status, DateRecorded,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID ORDER BY AttendanceID) AS rn,
+            ROW_NUMBER() OVER (PARTITION BY StudentID, CourseID, Status ORDER BY AttendanceID) AS rs,
+            COUNT(*) OVER (PARTITION BY StudentID, CourseID) AS n
+        FROM #Ins
+    ),
+    Runs AS (
+        SELECT StudentID, CourseID, COUNT(*) AS Len, MIN(rn) AS FirstRn, MAX(rn) AS LastRn, MAX(n) AS n
+        FROM I
+        WHERE Status = 1
+        GROUP BY StudentID, CourseID, rn - rs
+    ),
+    RunAgg AS (
+        SELECT
+            StudentID, CourseID,
+            MAX(Len) AS MaxRun,
+            MAX(CASE WHEN FirstRn = 1 THEN Len ELSE 0 END) AS LeadRun,   -- continues the old streak
+            MAX(CASE WHEN LastRn = n THEN Len ELSE 0 END) AS TailRun      -- the new current streak
+        FROM Runs
+        GROUP BY StudentID, CourseID
+    ),
+    Totals AS (
+        SELECT
+            StudentID, CourseID,
+            SUM(CASE WHEN Status = 1 THEN 1 ELSE 0 END) AS dPresent,
+            SUM(CASE WHEN Status = 0 THEN 1 ELSE 0 END) AS dAbsent,
+            MAX(CASE WHEN Status = 1 THEN DateRecorded END) AS LastPresentAt,
+            MAX(DateRecorded) AS LastRecordedAt,
+            MAX(AttendanceID) AS LastAttendanceID
+        FROM I
+        GROUP BY StudentID, CourseID
+    )
+    SELECT t.*, ISNULL(r.MaxRun, 0) AS MaxRun, ISNULL(r.LeadRun, 0) AS LeadRun, ISNULL(r.TailRun, 0) AS TailRun
+    INTO #Delta
+    FROM Totals t
+    LEFT JOIN RunAgg r ON r.StudentID = t.StudentID AND r.CourseID = t.CourseID;
+
+    INSERT INTO dbo.ATTENDANCE_ROLLUP (StudentID, CourseID)
+    SELECT d.StudentID, d.CourseID
+    FROM #Delta d
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ROLLUP r WHERE r.StudentID = d.StudentID AND r.CourseID = d.CourseID);
+
+    UPDATE r
+    SET PresentCount = r.PresentCount + d.dPresent,
+        AbsentCount = r.AbsentCount + d.dAbsent,
+        CurrentStreak = x.NewCurrent,
+        LongestStreak = (SELECT MAX(v) FROM (VALUES (r.LongestStreak), (r.CurrentStreak + d.LeadRun), (d.MaxRun)) s(v)),
+        LastPresentAt = CASE WHEN d.LastPresentAt IS NOT NULL AND (r.LastPresentAt IS NULL OR d.LastPresentAt > r.LastPresentAt)
+                             THEN d.LastPresentAt ELSE r.LastPresentAt END,
+        LastRecordedAt = CASE WHEN r.LastRecordedAt IS NULL OR d.LastRecordedAt > r.LastRecordedAt
+                              THEN d.LastRecordedAt ELSE r.LastRecordedAt END,
+        LastAttendanceID = CASE WHEN r.LastAttendanceID IS NULL OR d.LastAttendanceID > r.LastAttendanceID
+                                THEN d.LastAttendanceID ELSE r.LastAttendanceID END
+    FROM dbo.ATTENDANCE_ROLLUP r
+    JOIN #Delta d ON d.StudentID = r.StudentID AND d.CourseID = r.CourseID
+    CROSS APPLY (
+        SELECT CASE WHEN d.dAbsent = 0 THEN r.CurrentStreak + d.dPresent ELSE d.TailRun END AS NewCurrent
+    ) x;
+END
+GO
+
+-- Same as FIX #12, except archive moves are skipped and min/max rescans include GRADES_ARCHIVE
+CREATE OR ALTER TRIGGER dbo.trg_GRADES_Stats
+ON dbo.GRADES
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+
+    -- publish/unpublish updates don't touch the aggregates
+    IF EXISTS (SELECT 1 FROM inserted) AND EXISTS (SELECT 1 FROM deleted)
+       AND NOT (UPDATE(GradeValueEncrypted) OR UPDATE(CourseID))
+        RETURN;
+
+    -- reuse the caller's open key; open (and later close) it only if needed
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    ;WITH Changes AS (
+        -- rows also in GRADES_ARCHIVE are being archived / restored: already counted
+        SELECT i.CourseID, CAST(DecryptByKey(i.GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade, 1 AS Sign
+        FROM inserted i
+        WHERE NOT EXISTS (SELECT 1 FROM dbo.GRADES_ARCHIVE x WHERE x.GradeID = i.GradeID)
+        UNION ALL
+        SELECT d.CourseID, CAST(DecryptByKey(d.GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade, -1 AS Sign
+        FROM deleted d
+        WHERE NOT EXISTS (SELECT 1 FROM dbo.GRADES_ARCHIVE x WHERE x.GradeID = d.GradeID)
+    ),
+    Bucketed AS (
+        SELECT
+            CourseID, Grade, Sign,
+            CASE WHEN Grade >= 90 THEN 9 WHEN Grade < 0 THEN 0 ELSE CAST(FLOOR(Grade / 10) AS INT) END AS Bucket
+        FROM Changes
+        WHERE Grade IS NOT NULL
+    )
+    SELECT
+        CourseID,
+        SUM(Sign) AS dCount,
+        SUM(Sign * Grade) AS dSum,
+        MIN(CASE WHEN Sign = 1 THEN Grade END) AS InsMin,
+        MAX(CASE WHEN Sign = 1 THEN Grade END) AS InsMax,
+        MIN(CASE WHEN Sign = -1 THEN Grade END) AS DelMin,
+        MAX(CASE WHEN Sign = -1 THEN Grade END) AS DelMax,
+        SUM(CASE WHEN Bucket = 0 THEN Sign ELSE 0 END) AS dHist0,
+        SUM(CASE WHEN Bucket = 1 THEN Sign ELSE 0 END) AS dHist1,
+        SUM(CASE WHEN Bucket = 2 THEN Sign ELSE 0 END) AS dHist2,
+        SUM(CASE WHEN Bucket = 3 THEN Sign ELSE 0 END) AS dHist3,
+        SUM(CASE WHEN Bucket = 4 THEN Sign ELSE 0 END) AS dHist4,
+        SUM(CASE WHEN Bucket = 5 THEN Sign ELSE 0 END) AS dHist5,
+        SUM(CASE WHEN Bucket = 6 THEN Sign ELSE 0 END) AS dHist6,
+        SUM(CASE WHEN Bucket = 7 THEN Sign ELSE 0 END) AS dHist7,
+        SUM(CASE WHEN Bucket = 8 THEN Sign ELSE 0 END) AS dHist8,
+        SUM(CASE WHEN Bucket = 9 THEN Sign ELSE 0 END) AS dHist9
+    INTO #Delta
+    FROM Bucketed
+    GROUP BY CourseID;
+
+    INSERT INTO dbo.GRADE_STATS (CourseID)
+    SELECT d.CourseID
+    FROM #Delta d
+    WHERE NOT EXISTS (SELECT 1 FROM dbo.GRADE_STATS s WHERE s.CourseID = d.CourseID)
+      AND EXISTS (SELECT 1 FROM dbo.COURSE c WHERE c.CourseID = d.CourseID);
+
+    UPDATE s
+    SET GradeCount = s.GradeCount + d.dCount,
+        GradeSum = s.GradeSum + d.dSum,
+        GradeMin = CASE WHEN d.InsMin IS NOT NULL AND (s.GradeMin IS NULL OR d.InsMin < s.GradeMin) THEN d.InsMin ELSE s.GradeMin END,
+        GradeMax = CASE WHEN d.InsMax IS NOT NULL AND (s.GradeMax IS NULL OR d.InsMax > s.GradeMax) THEN d.InsMax ELSE s.GradeMax END,
+        Hist0 = s.Hist0 + d.dHist0,
+        Hist1 = s.Hist1 + d.dHist1,
+        Hist2 = s.Hist2 + d.dHist2,
+        Hist3 = s.Hist3 + d.dHist3,
+        Hist4 = s.Hist4 + d.dHist4,
+        Hist5 = s.Hist5 + d.dHist5,
+        Hist6 = s.Hist6 + d.dHist6,
+        Hist7 = s.Hist7 + d.dHist7,
+        Hist8 = s.Hist8 + d.dHist8,
+        Hist9 = s.Hist9 + d.dHist9
+    FROM dbo.GRADE_STATS s
+    JOIN #Delta d ON d.CourseID = s.CourseID;
+
+    -- a removed grade was the min or max: rescan just that course (hot + archived)
+    UPDATE s
+    SET GradeMin = x.MinGrade,
+        GradeMax = x.MaxGrade
+    FROM dbo.GRADE_STATS s
+    JOIN #Delta d ON d.CourseID = s.CourseID
+    CROSS APPLY (
+        SELECT
+            MIN(CAST(DecryptByKey(g.GradeValueEncrypted) AS DECIMAL(5,2))) AS MinGrade,
+            MAX(CAST(DecryptByKey(g.GradeValueEncrypted) AS DECIMAL(5,2))) AS MaxGrade
+        FROM (
+            SELECT GradeValueEncrypted FROM dbo.GRADES WHERE CourseID = s.CourseID
+            UNION ALL
+            SELECT GradeValueEncrypted FROM dbo.GRADES_ARCHIVE WHERE CourseID = s.CourseID
+        ) g
+    ) x
+    WHERE d.DelMin IS NOT NULL
+      AND (d.DelMin <= s.GradeMin OR d.DelMax >= s.GradeMax OR s.GradeCount = 0);
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+-- Migration: rebuild both aggregates from hot + archived rows (safe to re-run)
+BEGIN TRANSACTION;
+
+DELETE FROM dbo.ATTENDANCE_ROLLUP;
+
+INSERT INTO dbo.ATTENDANCE_ROLLUP
+    (StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+     LastPresentAt, LastRecordedAt, LastAttendanceID)
+SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak,
+       LastPresentAt, LastRecordedAt, LastAttendanceID
+FROM dbo.fn_AttendanceRollup();
+
+OPEN SYMMETRIC KEY SRMS_SymKey
+    DECRYPTION BY CERTIFICATE SRMS_Cert;
+
+DELETE FROM dbo.GRADE_STATS;
+
+;WITH G AS (
+    SELECT CourseID, CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade
+    FROM dbo.GRADES WITH (TABLOCKX, HOLDLOCK)
+    UNION ALL
+    SELECT CourseID, CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade
+    FROM dbo.GRADES_ARCHIVE WITH (TABLOCKX, HOLDLOCK)
+),
+B AS (
+    SELECT
+        CourseID, Grade,
+        CASE WHEN Grade >= 90 THEN 9 WHEN Grade < 0 THEN 0 ELSE CAST(FLOOR(Grade / 10) AS INT) END AS Bucket
+    FROM G
+    WHERE Grade IS NOT NULL
+)
+INSERT INTO dbo.GRADE_STATS (CourseID, GradeCount, GradeSum, GradeMin, GradeMax, Hist0, Hist1, Hist2, Hist3, Hist4, Hist5, Hist6, Hist7, Hist8, Hist9)
+SELECT
+    CourseID, COUNT(*), SUM(Grade), MIN(Grade), MAX(Grade),
+    SUM(CASE WHEN Bucket = 0 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 1 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 2 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 3 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 4 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 5 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 6 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 7 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 8 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN Bucket = 9 THEN 1 ELSE 0 END)
+FROM B
+GROUP BY CourseID;
+
+CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+COMMIT TRANSACTION;
+GO
+
+/* ---------- Terms ---------- */
+
+CREATE OR ALTER PROCEDURE dbo.sp_ListTerms
+    @UserRole NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    SELECT TermID, TermName, StartDate, EndDate, IsArchived, ArchivedAt
+    FROM dbo.TERM
+    ORDER BY StartDate DESC;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_CreateTerm
+    @UserRole NVARCHAR(50),
+    @TermName NVARCHAR(50),
+    @StartDate DATETIME2,
+    @EndDate DATETIME2
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    IF @StartDate IS NULL OR @EndDate IS NULL OR @EndDate <= @StartDate
+    BEGIN
+        RAISERROR('Term must end after it starts.',16,1);
+        RETURN;
+    END
+
+    IF EXISTS (SELECT 1 FROM dbo.TERM WHERE TermName = @TermName)
+    BEGIN
+        RAISERROR('Term name already exists.',16,1);
+        RETURN;
+    END
+
+    IF EXISTS (SELECT 1 FROM dbo.TERM WHERE StartDate < @EndDate AND EndDate > @StartDate)
+    BEGIN
+        RAISERROR('Term overlaps an existing term.',16,1);
+        RETURN;
+    END
+
+    INSERT INTO dbo.TERM (TermName, StartDate, EndDate)
+    VALUES (@TermName, @StartDate, @EndDate);
+
+    SELECT TermID, TermName, StartDate, EndDate, IsArchived, ArchivedAt
+    FROM dbo.TERM
+    WHERE TermID = SCOPE_IDENTITY();
+END
+GO
+
+-- EXECUTE AS OWNER: columnstore REORGANIZE needs ALTER on the archive tables
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_ArchiveTerm
+    @UserRole NVARCHAR(50),
+    @TermID INT
+WITH EXECUTE AS OWNER
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @Start DATETIME2, @End DATETIME2, @Archived BIT;
+    SELECT @Start = StartDate, @End = EndDate, @Archived = IsArchived
+    FROM dbo.TERM
+    WHERE TermID = @TermID;
+
+    IF @Start IS NULL
+    BEGIN
+        RAISERROR('Term not found.',16,1);
+        RETURN;
+    END
+
+    IF @Archived = 1
+    BEGIN
+        RAISERROR('Term is already archived.',16,1);
+        RETURN;
+    END
+
+    IF @End > SYSUTCDATETIME()
+    BEGIN
+        RAISERROR('Term has not ended yet.',16,1);
+        RETURN;
+    END
+
+    DECLARE @AttendanceRows INT, @GradeRows INT;
+
+    BEGIN TRANSACTION;
+
+    -- U-lock the term's rows so nothing changes them between the copy and the delete
+    SELECT AttendanceID INTO #Att
+    FROM dbo.ATTENDANCE WITH (UPDLOCK)
+    WHERE DateRecorded >= @Start AND DateRecorded < @End;
+
+    SELECT GradeID INTO #Grades
+    FROM dbo.GRADES WITH (UPDLOCK)
+    WHERE DateEntered >= @Start AND DateEntered < @End;
+
+    -- copy first: the triggers skip rows that are already in the archive
+    INSERT INTO dbo.ATTENDANCE_ARCHIVE WITH (TABLOCK)
+        (AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID, TermID)
+    SELECT a.AttendanceID, a.StudentID, a.CourseID, a.Status, a.DateRecorded, a.RecordedByUserID, @TermID
+    FROM dbo.ATTENDANCE a
+    JOIN #Att m ON m.AttendanceID = a.AttendanceID;
+
+    DELETE a
+    FROM dbo.ATTENDANCE a
+    JOIN #Att m ON m.AttendanceID = a.AttendanceID;
+    SET @AttendanceRows = @@ROWCOUNT;
+
+    INSERT INTO dbo.GRADES_ARCHIVE WITH (TABLOCK)
+        (GradeID, StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate, TermID)
+    SELECT g.GradeID, g.StudentIDEncrypted, g.StudentID, g.CourseID, g.GradeValueEncrypted, g.IsPublished,
+           g.DateEntered, g.PublishedDate, @TermID
+    FROM dbo.GRADES g
+    JOIN #Grades m ON m.GradeID = g.GradeID;
+
+    DELETE g
+    FROM dbo.GRADES g
+    JOIN #Grades m ON m.GradeID = g.GradeID;
+    SET @GradeRows = @@ROWCOUNT;
+
+    UPDATE dbo.TERM
+    SET IsArchived = 1,
+        ArchivedAt = SYSUTCDATETIME()
+    WHERE TermID = @TermID;
+
+    COMMIT TRANSACTION;
+
+    -- small terms land in the delta store; compress them now (not possible inside a caller's
+    -- transaction, so the app calls this proc with autocommit on: call_sp(..., autocommit=True))
+    IF @@TRANCOUNT = 0
+    BEGIN
+        ALTER INDEX CCI_ATTENDANCE_ARCHIVE ON dbo.ATTENDANCE_ARCHIVE REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON);
+        ALTER INDEX CCI_GRADES_ARCHIVE ON dbo.GRADES_ARCHIVE REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON);
+    END
+
+    SELECT @TermID AS TermID, @AttendanceRows AS AttendanceRows, @GradeRows AS GradeRows;
+END
+GO
+
+-- EXECUTE AS OWNER: IDENTITY_INSERT (rows go back with their original IDs) needs ALTER on the tables
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_RestoreTerm
+    @UserRole NVARCHAR(50),
+    @TermID INT
+WITH EXECUTE AS OWNER
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @Archived BIT;
+    SELECT @Archived = IsArchived FROM dbo.TERM WHERE TermID = @TermID;
+
+    IF @Archived IS NULL
+    BEGIN
+        RAISERROR('Term not found.',16,1);
+        RETURN;
+    END
+
+    IF @Archived = 0
+    BEGIN
+        RAISERROR('Term is not archived.',16,1);
+        RETURN;
+    END
+
+    DECLARE @AttendanceRows INT, @GradeRows INT;
+
+    BEGIN TRANSACTION;
+
+    -- copy back first, then delete: the triggers skip rows still in the archive
+    SET IDENTITY_INSERT dbo.ATTENDANCE ON;
+
+    INSERT INTO dbo.ATTENDANCE (AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID)
+    SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+    FROM dbo.ATTENDANCE_ARCHIVE
+    WHERE TermID = @TermID;
+    SET @AttendanceRows = @@ROWCOUNT;
+
+    SET IDENTITY_INSERT dbo.ATTENDANCE OFF;
+
+    DELETE FROM dbo.ATTENDANCE_ARCHIVE WHERE TermID = @TermID;
+
+    SET IDENTITY_INSERT dbo.GRADES ON;
+
+    INSERT INTO dbo.GRADES (GradeID, StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate)
+    SELECT GradeID, StudentIDEncrypted, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+    FROM dbo.GRADES_ARCHIVE
+    WHERE TermID = @TermID;
+    SET @GradeRows = @@ROWCOUNT;
+
+    SET IDENTITY_INSERT dbo.GRADES OFF;
+
+    DELETE FROM dbo.GRADES_ARCHIVE WHERE TermID = @TermID;
+
+    UPDATE dbo.TERM
+    SET IsArchived = 0,
+        ArchivedAt = NULL
+    WHERE TermID = @TermID;
+
+    COMMIT TRANSACTION;
+
+    SELECT @TermID AS TermID, @AttendanceRows AS AttendanceRows, @GradeRows AS GradeRows;
+END
+GO
+
+GRANT EXECUTE ON dbo.sp_ListTerms TO Admin;
+GRANT EXECUTE ON dbo.sp_ListTerms TO Instructor;
+GRANT EXECUTE ON dbo.sp_ListTerms TO TA;
+GRANT EXECUTE ON dbo.sp_ListTerms TO Student;
+GRANT EXECUTE ON dbo.sp_Admin_CreateTerm TO Admin;
+GRANT EXECUTE ON dbo.sp_Admin_ArchiveTerm TO Admin;
+GRANT EXECUTE ON dbo.sp_Admin_RestoreTerm TO Admin;
+GO
+
+/* ---------- Listings with @TermID ---------- */
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewGrades
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','Student')
+    BEGIN
+        RAISERROR('Access Denied: Grades not allowed for this role.',16,1);
+        RETURN;
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @SID INT;
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @SID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @SID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    -- RECOMPILE folds the @TermID / @SID branches away, so an open term never touches the archive
+    SELECT TOP (@Limit)
+        GradeID,
+        StudentID,
+        CourseID,
+        CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+        IsPublished,
+        DateEntered,
+        PublishedDate
+    FROM (
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES
+        WHERE GradeID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateEntered >= @TermStart AND DateEntered < @TermEnd))
+        UNION ALL
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES_ARCHIVE
+        WHERE GradeID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 1 AND TermID = @TermID))
+    ) g
+    WHERE (@SID IS NULL OR (StudentID = @SID AND IsPublished = 1))
+    ORDER BY GradeID DESC
+    OPTION (RECOMPILE);
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendance
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    ;WITH Src AS (
+        -- hot rows: every open term, or @TermID's date range
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE
+        WHERE AttendanceID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateRecorded >= @TermStart AND DateRecorded < @TermEnd))
+        UNION ALL
+        -- archived terms (columnstore, rowgroups eliminated by TermID)
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE_ARCHIVE
+        WHERE AttendanceID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 1 AND TermID = @TermID))
+    ),
+    Allowed AS (
+        SELECT r.*
+        FROM Src r
+        JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+        WHERE s.ClearanceLevel <= @UserClearance
+          AND (@StudentID IS NULL OR r.StudentID = @StudentID)
+          AND (@CourseID  IS NULL OR r.CourseID  = @CourseID)
+    )
+    SELECT TOP (@Limit) AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+    FROM Allowed
+    WHERE
+        (@UserRole <> 'TA')
+        OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=Allowed.CourseID)
+    ORDER BY AttendanceID DESC
+    OPTION (RECOMPILE);
+END
+GO
+
+
+
+/* =========================================================
+   FIX #20: Server-side filters for the grade / attendance / user listings
+   - new trailing params (NULL = no filter, old behaviour):
+       sp_ViewGrades      @StudentID, @CourseID, @IsPublished, @DateFrom, @DateTo
+       sp_ViewAttendance  @Status, @DateFrom, @DateTo  (@StudentID / @CourseID already there)
+       sp_Admin_ListUsers @Role, @ClearanceLevel
+   - dates are [@DateFrom, @DateTo) on the bare DateEntered / DateRecorded
+     column, and every filter compares a bare column to a parameter, so
+     with OPTION (RECOMPILE) the unused ones fold away and the rest are
+     index seeks: only matching rows are read, decrypted and returned
+   - role rules are unchanged: a student's grade filters only narrow
+     their own published rows, attendance keeps the clearance + TA
+     course checks
+   - indexes below cover the filters FIX #13 did not
+   ========================================================= */
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_GRADES_Course_GradeID' AND object_id = OBJECT_ID('dbo.GRADES'))
+BEGIN
+    CREATE INDEX IX_GRADES_Course_GradeID
+        ON dbo.GRADES (CourseID, GradeID DESC)
+        INCLUDE (StudentID, IsPublished, DateEntered, PublishedDate, GradeValueEncrypted);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_GRADES_DateEntered' AND object_id = OBJECT_ID('dbo.GRADES'))
+BEGIN
+    CREATE INDEX IX_GRADES_DateEntered
+        ON dbo.GRADES (DateEntered)
+        INCLUDE (StudentID, CourseID, IsPublished);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ATTENDANCE_DateRecorded' AND object_id = OBJECT_ID('dbo.ATTENDANCE'))
+BEGIN
+    CREATE INDEX IX_ATTENDANCE_DateRecorded
+        ON dbo.ATTENDANCE (DateRecorded)
+        INCLUDE (StudentID, CourseID, Status, RecordedByUserID);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_USERS_Role_Clearance' AND object_id = OBJECT_ID('dbo.USERS'))
+BEGIN
+    CREATE INDEX IX_USERS_Role_Clearance
+        ON dbo.USERS (Role, ClearanceLevel, UserID)
+        INCLUDE (StudentID, InstructorID);
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_Admin_ListUsers
+    @UserRole NVARCHAR(50),
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @Role NVARCHAR(50) = NULL,
+    @ClearanceLevel INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Admin'
+    BEGIN
+        RAISERROR('Access Denied: Admin only.',16,1);
+        RETURN;
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 0);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    SELECT TOP (@Limit) UserID, Role, ClearanceLevel, StudentID, InstructorID
+    FROM dbo.USERS
+    WHERE UserID > @AfterID
+      AND (@Role IS NULL OR Role = @Role)
+      AND (@ClearanceLevel IS NULL OR ClearanceLevel = @ClearanceLevel)
+    ORDER BY UserID
+    OPTION (RECOMPILE);
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewGrades
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @IsPublished BIT = NULL,
+    @DateFrom DATETIME2 = NULL,
+    @DateTo DATETIME2 = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','Student')
+    BEGIN
+        RAISERROR('Access Denied: Grades not allowed for this role.',16,1);
+        RETURN;
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @SID INT;
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @SID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @SID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    -- RECOMPILE folds the NULL filters away (an open term still never touches the archive);
+    -- DecryptByKey only runs on the rows that pass them
+    SELECT TOP (@Limit)
+        GradeID,
+        StudentID,
+        CourseID,
+        CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+        IsPublished,
+        DateEntered,
+        PublishedDate
+    FROM (
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES
+        WHERE GradeID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateEntered >= @TermStart AND DateEntered < @TermEnd))
+        UNION ALL
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES_ARCHIVE
+        WHERE GradeID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 1 AND TermID = @TermID))
+    ) g
+    WHERE (@SID IS NULL OR (StudentID = @SID AND IsPublished = 1))
+      AND (@StudentID IS NULL OR StudentID = @StudentID)
+      AND (@CourseID IS NULL OR CourseID = @CourseID)
+      AND (@IsPublished IS NULL OR IsPublished = @IsPublished)
+      AND (@DateFrom IS NULL OR DateEntered >= @DateFrom)
+      AND (@DateTo IS NULL OR DateEntered < @DateTo)
+    ORDER BY GradeID DESC
+    OPTION (RECOMPILE);
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendance
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL,
+    @Status BIT = NULL,
+    @DateFrom DATETIME2 = NULL,
+    @DateTo DATETIME2 = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    ;WITH Src AS (
+        -- hot rows: every open term, or @TermID's date range
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE
+        WHERE AttendanceID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateRecorded >= @TermStart AND DateRecorded < @TermEnd))
+        UNION ALL
+        -- archived terms (columnstore, rowgroups eliminated by TermID)
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE_ARCHIVE
+        WHERE AttendanceID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 1 AND TermID = @TermID))
+    ),
+    Allowed AS (
+        SELECT r.*
+        FROM Src r
+        JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+        WHERE s.ClearanceLevel <= @UserClearance
+          AND (@StudentID IS NULL OR r.StudentID = @StudentID)
+          AND (@CourseID  IS NULL OR r.CourseID  = @CourseID)
+          AND (@Status    IS NULL OR r.Status    = @Status)
+          AND (@DateFrom  IS NULL OR r.DateRecorded >= @DateFrom)
+          AND (@DateTo    IS NULL OR r.DateRecorded <  @DateTo)
+    )
+    SELECT TOP (@Limit) AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+    FROM Allowed
+    WHERE
+        (@UserRole <> 'TA')
+        OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=Allowed.CourseID)
+    ORDER BY AttendanceID DESC
+    OPTION (RECOMPILE);
+END
+GO
+
+
+
+/* =========================================================
+   FIX #21: Student landing page returns totals, not history
+   - the home page only shows counts + an average, so
+     sp_Student_Overview no longer sends every grade / attendance row:
+       1) profile
+       2) grade summary   (GradeCount, AvgGrade over published grades;
+                           decrypted inside the proc, one row out)
+       3) attendance rollups (one row per course, as in FIX #18)
+   - deviation from FIX #15 ("profile + grades + attendance"): the
+     grade and attendance sets are totals now, not rows; @Limit is gone
+     (nothing left to cap) and the full lists stay on sp_ViewGrades /
+     sp_ViewAttendance
+   - both totals cover every term: the rollups already count archived
+     sessions (FIX #19), so the grade summary reads GRADES_ARCHIVE too
+     and archiving a term changes neither number (same rows as
+     /api/student/grades?term_id=all)
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_Student_Overview
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole <> 'Student'
+    BEGIN
+        RAISERROR('Access Denied: Student only.',16,1);
+        RETURN;
+    END
+
+    DECLARE @SID INT;
+    SELECT @SID = StudentID
+    FROM dbo.USERS
+    WHERE UserID = @UserID AND Role = 'Student';
+
+    IF @SID IS NULL
+    BEGIN
+        RAISERROR('Student identity not linked to this account.',16,1);
+        RETURN;
+    END
+
+    -- 1) profile
+    SELECT StudentID, FullName, Email, DOB, Department, ClearanceLevel
+    FROM dbo.STUDENT
+    WHERE StudentID = @SID
+      AND ClearanceLevel <= @UserClearance;
+
+    -- 2) published grade count + average over all terms
+    --    (hot: IX_GRADES_Student_Published seek; archive: one student's rows from the columnstore)
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    SELECT
+        COUNT(*) AS GradeCount,
+        CAST(AVG(CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2))) AS DECIMAL(5,2)) AS AvgGrade
+    FROM (
+        SELECT GradeValueEncrypted
+        FROM dbo.GRADES
+        WHERE StudentID = @SID AND IsPublished = 1
+        UNION ALL
+        SELECT GradeValueEncrypted
+        FROM dbo.GRADES_ARCHIVE
+        WHERE StudentID = @SID AND IsPublished = 1
+    ) g;
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+
+    -- 3) attendance rollups (one row per course)
+    SELECT
+        r.StudentID,
+        r.CourseID,
+        r.PresentCount,
+        r.AbsentCount,
+        CAST(100.0 * r.PresentCount / NULLIF(r.PresentCount + r.AbsentCount, 0) AS DECIMAL(5,2)) AS AttendanceRate,
+        r.CurrentStreak,
+        r.LongestStreak,
+        r.LastPresentAt,
+        r.LastRecordedAt
+    FROM dbo.ATTENDANCE_ROLLUP r
+    JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+    WHERE r.StudentID = @SID
+      AND s.ClearanceLevel <= @UserClearance
+    ORDER BY r.CourseID;
+END
+GO
+
+
+
+/* =========================================================
+   FIX #22: Listings default to the open terms
+   - sp_ViewGrades / sp_ViewAttendance with @TermID NULL now read only
+     the hot tables (every term not archived yet); before, they also
+     scanned the whole columnstore archive on every default call
+   - new trailing @AllTerms BIT = 0: 1 = hot + archive (the old NULL
+     behaviour), for exports / history views that really want it
+   - @TermID still picks one term (hot or archived) and wins over
+     @AllTerms
+   - sp_Student_Overview (#21) is unaffected: its totals cover every
+     term, like the rollups, and are labelled that way on the page
+   ========================================================= */
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewGrades
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @IsPublished BIT = NULL,
+    @DateFrom DATETIME2 = NULL,
+    @DateTo DATETIME2 = NULL,
+    @AllTerms BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','Student')
+    BEGIN
+        RAISERROR('Access Denied: Grades not allowed for this role.',16,1);
+        RETURN;
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @SID INT;
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @SID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @SID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    DECLARE @OpenedHere BIT = 0;
+    IF NOT EXISTS (SELECT 1 FROM sys.openkeys WHERE key_name = 'SRMS_SymKey')
+    BEGIN
+        OPEN SYMMETRIC KEY SRMS_SymKey
+            DECRYPTION BY CERTIFICATE SRMS_Cert;
+        SET @OpenedHere = 1;
+    END
+
+    -- RECOMPILE folds the NULL filters away, so the archive branch is only read for
+    -- an archived @TermID or @AllTerms = 1; DecryptByKey only runs on the rows that pass them
+    SELECT TOP (@Limit)
+        GradeID,
+        StudentID,
+        CourseID,
+        CAST(DecryptByKey(GradeValueEncrypted) AS DECIMAL(5,2)) AS Grade,
+        IsPublished,
+        DateEntered,
+        PublishedDate
+    FROM (
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES
+        WHERE GradeID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateEntered >= @TermStart AND DateEntered < @TermEnd))
+        UNION ALL
+        SELECT GradeID, StudentID, CourseID, GradeValueEncrypted, IsPublished, DateEntered, PublishedDate
+        FROM dbo.GRADES_ARCHIVE
+        WHERE GradeID < @AfterID
+          AND ((@TermID IS NULL AND @AllTerms = 1) OR (@TermArchived = 1 AND TermID = @TermID))
+    ) g
+    WHERE (@SID IS NULL OR (StudentID = @SID AND IsPublished = 1))
+      AND (@StudentID IS NULL OR StudentID = @StudentID)
+      AND (@CourseID IS NULL OR CourseID = @CourseID)
+      AND (@IsPublished IS NULL OR IsPublished = @IsPublished)
+      AND (@DateFrom IS NULL OR DateEntered >= @DateFrom)
+      AND (@DateTo IS NULL OR DateEntered < @DateTo)
+    ORDER BY GradeID DESC
+    OPTION (RECOMPILE);
+
+    IF @OpenedHere = 1
+        CLOSE SYMMETRIC KEY SRMS_SymKey;
+END
+GO
+
+CREATE OR ALTER PROCEDURE dbo.sp_ViewAttendance
+    @UserRole NVARCHAR(50),
+    @UserID INT,
+    @UserClearance INT,
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @AfterID INT = NULL,
+    @Limit INT = NULL,
+    @TermID INT = NULL,
+    @Status BIT = NULL,
+    @DateFrom DATETIME2 = NULL,
+    @DateTo DATETIME2 = NULL,
+    @AllTerms BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @UserRole NOT IN ('Admin','Instructor','TA','Student')
+    BEGIN
+        RAISERROR('Access Denied',16,1);
+        RETURN;
+    END
+
+    IF @UserRole = 'Student'
+    BEGIN
+        SELECT @StudentID = StudentID
+        FROM dbo.USERS
+        WHERE UserID=@UserID AND Role='Student';
+
+        IF @StudentID IS NULL
+        BEGIN
+            RAISERROR('Student identity not linked to this account.',16,1);
+            RETURN;
+        END
+    END
+
+    DECLARE @TermStart DATETIME2, @TermEnd DATETIME2, @TermArchived BIT;
+    IF @TermID IS NOT NULL
+    BEGIN
+        SELECT @TermStart = StartDate, @TermEnd = EndDate, @TermArchived = IsArchived
+        FROM dbo.TERM
+        WHERE TermID = @TermID;
+
+        IF @TermStart IS NULL
+        BEGIN
+            RAISERROR('Term not found.',16,1);
+            RETURN;
+        END
+    END
+
+    SET @AfterID = ISNULL(@AfterID, 2147483647);
+    SET @Limit = ISNULL(@Limit, 2147483647);
+
+    ;WITH Src AS (
+        -- hot rows: every open term, or @TermID's date range
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE
+        WHERE AttendanceID < @AfterID
+          AND (@TermID IS NULL OR (@TermArchived = 0 AND DateRecorded >= @TermStart AND DateRecorded < @TermEnd))
+        UNION ALL
+        -- archived terms, only when asked for (columnstore, rowgroups eliminated by TermID)
+        SELECT AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+        FROM dbo.ATTENDANCE_ARCHIVE
+        WHERE AttendanceID < @AfterID
+          AND ((@TermID IS NULL AND @AllTerms = 1) OR (@TermArchived = 1 AND TermID = @TermID))
+    ),
+    Allowed AS (
+        SELECT r.*
+        FROM Src r
+        JOIN dbo.STUDENT s ON s.StudentID = r.StudentID
+        WHERE s.ClearanceLevel <= @UserClearance
+          AND (@StudentID IS NULL OR r.StudentID = @StudentID)
+          AND (@CourseID  IS NULL OR r.CourseID  = @CourseID)
+          AND (@Status    IS NULL OR r.Status    = @Status)
+          AND (@DateFrom  IS NULL OR r.DateRecorded >= @DateFrom)
+          AND (@DateTo    IS NULL OR r.DateRecorded <  @DateTo)
+    )
+    SELECT TOP (@Limit) AttendanceID, StudentID, CourseID, Status, DateRecorded, RecordedByUserID
+    FROM Allowed
+    WHERE
+        (@UserRole <> 'TA')
+        OR EXISTS (SELECT 1 FROM dbo.TA_COURSE tc WHERE tc.TAUserID=@UserID AND tc.CourseID=Allowed.CourseID)
+    ORDER BY AttendanceID DESC
+    OPTION (RECOMPILE);
+END
+GO
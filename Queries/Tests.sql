@@ -57,6 +57,46 @@ REVERT;
 GO
 
 
+-- Test 3 : Blind-index secret not readable directly
+PRINT 'Access Control Test 3';
+EXECUTE AS USER = 'u_student';
+BEGIN TRY
+    SELECT TOP 1 * FROM dbo.LOOKUP_KEY;
+    PRINT 'FAILED';
+END TRY
+BEGIN CATCH
+    PRINT 'PASSED';
+END CATCH
+REVERT;
+GO
+
+-- Test 4 : Student overview is Student-only (TA has no EXECUTE)
+PRINT 'Access Control Test 4';
+EXECUTE AS USER = 'u_ta';
+BEGIN TRY
+    EXEC dbo.sp_Student_Overview 'Student', 4, 2;
+    PRINT 'FAILED';
+END TRY
+BEGIN CATCH
+    PRINT 'PASSED';
+END CATCH
+REVERT;
+GO
+
+-- Test 5 : Attendance delta feed not executable by Guest
+PRINT 'Access Control Test 5';
+EXECUTE AS USER = 'u_guest';
+BEGIN TRY
+    EXEC dbo.sp_ViewAttendanceSince 'Admin', 1, 5, 0;
+    PRINT 'FAILED';
+END TRY
+BEGIN CATCH
+    PRINT 'PASSED';
+END CATCH
+REVERT;
+GO
+
+
 /* ===============================
    2) INFERENCE CONTROL
    =============================== */
@@ -170,6 +210,221 @@ CLOSE SYMMETRIC KEY SRMS_SymKey;
 GO
 
 
+
+/* ===============================
+   6) ATTENDANCE ROLLUPS
+   =============================== */
+
+-- Test 1 : Rollup table matches a full recount
+PRINT 'Rollup Test 1';
+IF EXISTS (
+    SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+    FROM dbo.ATTENDANCE_ROLLUP
+    EXCEPT
+    SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+    FROM dbo.fn_AttendanceRollup()
+) OR EXISTS (
+    SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+    FROM dbo.fn_AttendanceRollup()
+    EXCEPT
+    SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+    FROM dbo.ATTENDANCE_ROLLUP
+)
+    PRINT 'FAILED';
+ELSE
+    PRINT 'PASSED';
+GO
+
+-- Test 2 : Recording attendance updates the rollup in the same call
+PRINT 'Rollup Test 2';
+DECLARE @Before INT = ISNULL((SELECT PresentCount FROM dbo.ATTENDANCE_ROLLUP WHERE StudentID=1 AND CourseID=1), 0);
+DECLARE @Streak INT = ISNULL((SELECT CurrentStreak FROM dbo.ATTENDANCE_ROLLUP WHERE StudentID=1 AND CourseID=1), 0);
+
+EXEC dbo.sp_RecordAttendance 'Admin', 1, 1, 1, 1;
+
+IF EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ROLLUP
+           WHERE StudentID=1 AND CourseID=1 AND PresentCount=@Before+1 AND CurrentStreak=@Streak+1)
+    PRINT 'PASSED';
+ELSE
+    PRINT 'FAILED';
+GO
+
+
+/* ===============================
+   7) TERM ARCHIVE
+   =============================== */
+
+-- Test 1 : Archive tables not readable directly
+PRINT 'Archive Test 1';
+EXECUTE AS USER = 'u_student';
+BEGIN TRY
+    SELECT TOP 1 * FROM dbo.GRADES_ARCHIVE;
+    PRINT 'FAILED';
+END TRY
+BEGIN CATCH
+    PRINT 'PASSED';
+END CATCH
+REVERT;
+GO
+
+-- Test 2 : Archive + restore keeps the term's rows and the rollups (rolled back)
+PRINT 'Archive Test 2';
+DECLARE @End DATETIME2 = SYSUTCDATETIME();
+DECLARE @T INT, @Hot INT, @Archived INT, @Restored INT;
+DECLARE @Rows TABLE (AttendanceID INT, StudentID INT, CourseID INT, Status BIT, DateRecorded DATETIME2, RecordedByUserID INT);
+
+BEGIN TRY
+    BEGIN TRANSACTION;
+
+    INSERT INTO dbo.TERM (TermName, StartDate, EndDate) VALUES (N'Archive Test', '2000-01-01', @End);
+    SET @T = SCOPE_IDENTITY();
+
+    INSERT INTO @Rows EXEC dbo.sp_ViewAttendance 'Admin', 1, 5, NULL, NULL, NULL, NULL, @T;
+    SET @Hot = @@ROWCOUNT;
+
+    EXEC dbo.sp_Admin_ArchiveTerm 'Admin', @T;
+    DELETE FROM @Rows;
+    INSERT INTO @Rows EXEC dbo.sp_ViewAttendance 'Admin', 1, 5, NULL, NULL, NULL, NULL, @T;
+    SET @Archived = @@ROWCOUNT;
+
+    EXEC dbo.sp_Admin_RestoreTerm 'Admin', @T;
+    DELETE FROM @Rows;
+    INSERT INTO @Rows EXEC dbo.sp_ViewAttendance 'Admin', 1, 5, NULL, NULL, NULL, NULL, @T;
+    SET @Restored = @@ROWCOUNT;
+
+    IF @Hot > 0 AND @Archived = @Hot AND @Restored = @Hot
+       AND NOT EXISTS (SELECT 1 FROM dbo.ATTENDANCE_ARCHIVE WHERE TermID = @T)
+       AND NOT EXISTS (
+           SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+           FROM dbo.ATTENDANCE_ROLLUP
+           EXCEPT
+           SELECT StudentID, CourseID, PresentCount, AbsentCount, CurrentStreak, LongestStreak, LastAttendanceID
+           FROM dbo.fn_AttendanceRollup()
+       )
+        PRINT 'PASSED';
+    ELSE
+        PRINT 'FAILED';
+
+    ROLLBACK TRANSACTION;
+END TRY
+BEGIN CATCH
+    IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;
+    PRINT 'FAILED';
+END CATCH
+GO
+
+
+-- Test 3 : Default listing reads only open terms, @AllTerms = 1 adds the archive (rolled back)
+PRINT 'Archive Test 3';
+DECLARE @End DATETIME2 = SYSUTCDATETIME();
+DECLARE @T INT, @Default INT, @All INT, @Archived INT;
+DECLARE @Rows TABLE (AttendanceID INT, StudentID INT, CourseID INT, Status BIT, DateRecorded DATETIME2, RecordedByUserID INT);
+
+BEGIN TRY
+    BEGIN TRANSACTION;
+
+    INSERT INTO dbo.TERM (TermName, StartDate, EndDate) VALUES (N'Archive Test', '2000-01-01', @End);
+    SET @T = SCOPE_IDENTITY();
+    EXEC dbo.sp_Admin_ArchiveTerm 'Admin', @T;
+    SET @Archived = (SELECT COUNT(*) FROM dbo.ATTENDANCE_ARCHIVE WHERE TermID = @T);
+
+    INSERT INTO @Rows EXEC dbo.sp_ViewAttendance 'Admin', 1, 5;
+    SET @Default = @@ROWCOUNT;
+    DELETE FROM @Rows;
+    INSERT INTO @Rows EXEC dbo.sp_ViewAttendance 'Admin', 1, 5, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, 1;
+    SET @All = @@ROWCOUNT;
+
+    IF @Archived > 0
+       AND @Default = (SELECT COUNT(*) FROM dbo.ATTENDANCE)
+       AND @All = @Default + @Archived
+        PRINT 'PASSED';
+    ELSE
+        PRINT 'FAILED';
+
+    ROLLBACK TRANSACTION;
+END TRY
+BEGIN CATCH
+    IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;
+    PRINT 'FAILED';
+END CATCH
+GO
+
+
+-- Test 4 : Archiving outside a transaction (as the app calls it) leaves the archive compressed
+--          (not rolled back: the rowgroup compression only runs with no open transaction; restored after)
+PRINT 'Archive Test 4';
+DECLARE @T INT, @Open INT, @Compressed INT;
+
+BEGIN TRY
+    INSERT INTO dbo.TERM (TermName, StartDate, EndDate) VALUES (N'Archive Test', '2000-01-01', SYSUTCDATETIME());
+    SET @T = SCOPE_IDENTITY();
+
+    EXEC dbo.sp_Admin_ArchiveTerm 'Admin', @T;
+
+    SELECT
+        @Open = SUM(CASE WHEN state_desc IN ('OPEN','CLOSED') THEN 1 ELSE 0 END),
+        @Compressed = SUM(CASE WHEN state_desc = 'COMPRESSED' THEN 1 ELSE 0 END)
+    FROM sys.dm_db_column_store_row_group_physical_stats
+    WHERE object_id IN (OBJECT_ID('dbo.ATTENDANCE_ARCHIVE'), OBJECT_ID('dbo.GRADES_ARCHIVE'));
+
+    EXEC dbo.sp_Admin_RestoreTerm 'Admin', @T;
+    DELETE FROM dbo.TERM WHERE TermID = @T;
+
+    IF @Compressed > 0 AND @Open = 0
+        PRINT 'PASSED';
+    ELSE
+        PRINT 'FAILED';
+END TRY
+BEGIN CATCH
+    IF EXISTS (SELECT 1 FROM dbo.TERM WHERE TermID = @T AND IsArchived = 1)
+        EXEC dbo.sp_Admin_RestoreTerm 'Admin', @T;
+    DELETE FROM dbo.TERM WHERE TermID = @T;
+    PRINT 'FAILED';
+END CATCH
+GO
+
+
+/* ===============================
+   8) LISTING FILTERS
+   =============================== */
+
+-- Test 1 : Filtered listing = unfiltered listing filtered afterwards
+PRINT 'Filter Test 1';
+DECLARE @All TABLE (AttendanceID INT, StudentID INT, CourseID INT, Status BIT, DateRecorded DATETIME2, RecordedByUserID INT);
+DECLARE @Hit TABLE (AttendanceID INT, StudentID INT, CourseID INT, Status BIT, DateRecorded DATETIME2, RecordedByUserID INT);
+DECLARE @From DATETIME2 = DATEADD(DAY, -30, SYSUTCDATETIME());
+
+INSERT INTO @All EXEC dbo.sp_ViewAttendance 'Admin', 1, 5;
+INSERT INTO @Hit EXEC dbo.sp_ViewAttendance 'Admin', 1, 5, NULL, 1, NULL, NULL, NULL, 1, @From, NULL;
+
+IF NOT EXISTS (
+       SELECT AttendanceID FROM @All WHERE CourseID = 1 AND Status = 1 AND DateRecorded >= @From
+       EXCEPT
+       SELECT AttendanceID FROM @Hit
+   )
+   AND NOT EXISTS (SELECT 1 FROM @Hit WHERE CourseID <> 1 OR Status <> 1 OR DateRecorded < @From)
+    PRINT 'PASSED';
+ELSE
+    PRINT 'FAILED';
+GO
+
+-- Test 2 : A student's @StudentID filter cannot reach another student's grades
+PRINT 'Filter Test 2';
+DECLARE @Other INT = (
+    SELECT TOP 1 StudentID FROM dbo.STUDENT
+    WHERE StudentID <> ISNULL((SELECT StudentID FROM dbo.USERS WHERE UserID = 4), -1)
+);
+DECLARE @Grades TABLE (GradeID INT, StudentID INT, CourseID INT, Grade DECIMAL(5,2), IsPublished BIT, DateEntered DATETIME2, PublishedDate DATETIME2);
+
+INSERT INTO @Grades EXEC dbo.sp_ViewGrades 'Student', 4, NULL, NULL, NULL, @Other;
+
+IF NOT EXISTS (SELECT 1 FROM @Grades)
+    PRINT 'PASSED';
+ELSE
+    PRINT 'FAILED';
+GO
+
+
 PRINT '==============================';
 PRINT 'SECURITY TESTS COMPLETED';
 PRINT '==============================';